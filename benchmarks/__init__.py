@@ -0,0 +1 @@
+"""Benchmark package for teeplot."""
@@ -0,0 +1,353 @@
+'''
+Benchmarks for `teeplot` hot paths.
+'''
+
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+
+from matplotlib import pyplot as plt
+import numpy as np
+import pytest
+
+from teeplot import teeplot as tp
+
+
+def _sparkline():
+    plt.plot([0, 2, 1, 3], color="black")
+    plt.axis("off")
+
+
+@pytest.mark.benchmark(group="import")
+@pytest.mark.parametrize("module", ["teeplot.teeplot", "matplotlib.pyplot"])
+def test_import(benchmark, module):
+    # fresh interpreter per round, as imports are cached within a process
+    run = lambda: subprocess.run(
+        [sys.executable, "-c", f"import {module}"], check=True,
+    )
+    benchmark.pedantic(run, rounds=10, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group="overhead")
+def test_savefig_bare(benchmark, sparkline, tmp_path):
+    benchmark(
+        plt.savefig,
+        tmp_path / "sparkline.png",
+        bbox_inches='tight',
+        transparent=True,
+        dpi=300,
+    )
+
+
+@pytest.mark.benchmark(group="overhead")
+def test_tee(benchmark, sparkline, tmp_path):
+    benchmark(
+        tp.tee,
+        lambda: None,  # sparkline already plotted to current figure
+        teeplot_oncollision="ignore",
+        teeplot_outdir=str(tmp_path),
+        teeplot_save={".png"},
+        teeplot_show=False,
+        teeplot_verbose=False,
+    )
+
+
+@pytest.mark.benchmark(group="overhead")
+def test_tee_dedup(benchmark, sparkline, tmp_path):
+    benchmark(
+        tp.tee,
+        lambda: None,
+        teeplot_dedup=True,
+        teeplot_oncollision="ignore",
+        teeplot_outdir=str(tmp_path),
+        teeplot_save={".png"},
+        teeplot_show=False,
+        teeplot_verbose=False,
+    )
+
+
+@pytest.mark.benchmark(group="overhead")
+def test_tee_sink(benchmark, sparkline):
+    sink = tp.MemorySink()
+    benchmark(
+        tp.tee,
+        lambda: None,
+        teeplot_oncollision="ignore",
+        teeplot_save={".png"},
+        teeplot_show=False,
+        teeplot_sink=sink,
+        teeplot_verbose=False,
+    )
+
+
+@pytest.mark.benchmark(group="overhead")
+def test_tee_nosave(benchmark, sparkline):
+    benchmark(
+        tp.tee,
+        lambda: None,
+        teeplot_save=False,
+        teeplot_show=False,
+        teeplot_verbose=False,
+    )
+
+
+@pytest.mark.benchmark(group="overhead")
+@pytest.mark.parametrize("call", ["plot", "plot-savefig", "tee-nosave", "tee"])
+def test_call(benchmark, call, tmp_path):
+    # whole calls, from plotting a fresh figure through closing it, so that
+    # "tee" less "plot-savefig" is tee's overhead per call, and "tee-nosave"
+    # less "plot" is its overhead without encoding
+    def sparkline_figure():
+        fig = plt.figure(figsize=(1, 0.25))
+        _sparkline()
+        return fig
+
+    counter = itertools.count()
+
+    def run():
+        i = next(counter)
+        if call == "plot":
+            fig = sparkline_figure()
+        elif call == "plot-savefig":
+            fig = sparkline_figure()
+            fig.savefig(
+                tmp_path / f"{i}.png",
+                bbox_inches='tight',
+                transparent=True,
+                dpi=300,
+                metadata={},
+            )
+        else:
+            fig = tp.tee(
+                sparkline_figure,
+                teeplot_oncollision="ignore",
+                teeplot_outattrs={"i": str(i)},
+                teeplot_outdir=str(tmp_path),
+                teeplot_save={".png"} if call == "tee" else False,
+                teeplot_show=False,
+                teeplot_verbose=False,
+            )
+        plt.close(fig)
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group="lifecycle")
+@pytest.mark.parametrize("lifecycle", ["close", "recycle"])
+def test_lifecycle(benchmark, lifecycle, tmp_path):
+    def plotter():
+        if lifecycle == "close":
+            plt.figure(figsize=(1, 0.25))
+        _sparkline()
+
+    benchmark(
+        tp.tee,
+        plotter,
+        teeplot_close=lifecycle == "close",
+        teeplot_figsize=(1, 0.25),
+        teeplot_oncollision="ignore",
+        teeplot_outdir=str(tmp_path),
+        teeplot_recycle=lifecycle == "recycle",
+        teeplot_save={".png"},
+        teeplot_show=False,
+        teeplot_verbose=False,
+    )
+
+
+@pytest.mark.benchmark(group="frames")
+@pytest.mark.parametrize("mode", ["tee", "replot", "update"])
+def test_frames(benchmark, mode, tmp_path):
+    num_frames = 100
+
+    def plotter(y):
+        return plt.plot([0, 1, 2, 3], y, color="black")
+
+    def update(teed, y):
+        teed[0].set_ydata(y)
+
+    frames = [{"y": [0, i % 3, 1, 3]} for i in range(num_frames)]
+
+    def run():
+        if mode == "tee":  # frame per call, to be assembled separately
+            for i, frame in enumerate(frames):
+                plt.figure(figsize=(1, 0.25))
+                tp.tee(
+                    plotter,
+                    **frame,
+                    teeplot_dpi=100,
+                    teeplot_oncollision="ignore",
+                    teeplot_outattrs={"frame": str(i)},
+                    teeplot_outdir=str(tmp_path),
+                    teeplot_save={".png"},
+                    teeplot_show=False,
+                    teeplot_verbose=False,
+                )
+                plt.close("all")
+        else:
+            tp.tee_frames(
+                plotter,
+                frames,
+                teeplot_figsize=(1, 0.25),
+                teeplot_oncollision="ignore",
+                teeplot_outdir=str(tmp_path),
+                teeplot_update=update if mode == "update" else None,
+                teeplot_verbose=False,
+            )
+
+    benchmark.pedantic(run, rounds=3, iterations=1)
+    benchmark.extra_info["num_frames"] = num_frames
+
+
+@pytest.mark.benchmark(group="encode")
+@pytest.mark.parametrize("ext", [*tp.save])
+def test_encode(benchmark, ext, sparkline, tmp_path):
+    if ext == ".pgf" and not shutil.which("xelatex"):
+        pytest.skip("pgf output requires xelatex")
+    benchmark(
+        tp._savefig,
+        sparkline,
+        str(tmp_path / f"out{ext}"),
+        ext,
+        dpi=300,
+        transparent=True,
+    )
+
+
+@pytest.mark.benchmark(group="transform")
+@pytest.mark.parametrize(
+    "ext, transform",
+    [
+        (".png", None),
+        (".png", tp.png_zlib(level=9)),
+        (".svg", None),
+        (".svgz", None),
+        (".svgz", tp.svg_gzip(level=9)),
+    ],
+    ids=["png", "png-zlib", "svg", "svgz", "svgz-gzip"],
+)
+def test_transform(
+    benchmark, ext, transform, monkeypatch, sparkline, tmp_path,
+):
+    chain = [transform] if transform else []
+    monkeypatch.setattr(tp, "transforms", {ext: chain})
+    fname = str(tmp_path / f"out{ext}")
+    benchmark(
+        tp._savefig_serial,
+        sparkline,
+        [(fname, ext)],
+        lambda *args: None,
+        dpi=300,
+        transparent=True,
+    )
+    benchmark.extra_info["bytes"] = os.path.getsize(fname)
+
+
+@pytest.mark.benchmark(group="rasterize")
+@pytest.mark.parametrize("ext", [".pdf", ".svg"])
+@pytest.mark.parametrize("threshold", [None, 10_000])
+def test_rasterize(benchmark, ext, threshold, tmp_path):
+    x, y = np.random.default_rng(1).normal(size=(2, 100_000))
+    plt.figure()
+    plt.scatter(x, y, s=1)
+
+    benchmark.pedantic(
+        tp.tee,
+        args=(lambda: None,),  # scatter already plotted to current figure
+        kwargs=dict(
+            teeplot_oncollision="ignore",
+            teeplot_outdir=str(tmp_path),
+            teeplot_rasterize_threshold=threshold,
+            teeplot_save={ext},
+            teeplot_show=False,
+            teeplot_verbose=False,
+        ),
+        rounds=3,
+    )
+    benchmark.extra_info["bytes"] = os.path.getsize(
+        tmp_path / f"viz=lambda+ext={ext}",
+    )
+
+
+@pytest.mark.benchmark(group="filename")
+@pytest.mark.parametrize("num_kwargs", [1, 10, 100])
+def test_filename(benchmark, num_kwargs):
+    kwargs = {f"key{i}": f"Value {i}" for i in range(num_kwargs)}
+    benchmark(tp.plan, _sparkline, teeplot_save={".png"}, **kwargs)
+
+
+@pytest.mark.benchmark(group="filename")
+def test_filename_batch(benchmark):
+    kwargs_list = [
+        {"hue": f"hue{i % 10}", "x": f"x{i % 100}", "y": f"y{i}"}
+        for i in range(10_000)
+    ]
+    benchmark.pedantic(
+        tp.plan_many,
+        args=(_sparkline, kwargs_list),
+        kwargs=dict(teeplot_save={".png"}),
+        rounds=3,
+    )
+
+
+@pytest.fixture(params=["memory", "file"])
+def registry(request, tmp_path):
+    if request.param == "memory":
+        return tp.MemoryRegistry()
+    else:
+        return tp.FileRegistry(tmp_path / "registry")
+
+
+@pytest.mark.benchmark(group="collision")
+@pytest.mark.parametrize("num_registered", [0, 10_000, 1_000_000])
+def test_collision(benchmark, num_registered, registry, monkeypatch):
+    if isinstance(registry, tp.FileRegistry) and num_registered > 10_000:
+        pytest.skip("prefilling file registry is slow")
+    for i in range(num_registered):
+        registry.claim(f"teeplots/{i}")
+    monkeypatch.setattr(tp, "registry", registry)
+
+    benchmark(
+        tp._resolve_jobs,
+        tp.pathlib.Path("teeplots"),
+        lambda ext: f"viz=sparkline+ext={ext}",
+        teeplot_oncollision="fix",
+        teeplot_save={".png"},
+        teeplot_verbose=False,
+    )
+
+
+@pytest.mark.benchmark(group="memory")
+@pytest.mark.skipif(sys.platform == "win32", reason="requires resource")
+def test_rss_growth(benchmark, tmp_path):
+    import resource
+
+    num_calls = int(os.environ.get("TEEPLOT_BENCH_RSS_CALLS", 10_000))
+    # ru_maxrss is in kilobytes on Linux, but bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    plt.figure(figsize=(0.25, 0.25))
+
+    def run():
+        for i in range(num_calls):
+            plt.cla()
+            tp.tee(
+                _sparkline,
+                teeplot_dpi=10,
+                teeplot_oncollision="ignore",
+                teeplot_outattrs={"i": str(i)},
+                teeplot_outdir=str(tmp_path),
+                teeplot_save={".png"},
+                teeplot_show=False,
+                teeplot_verbose=False,
+            )
+
+    run()  # warm up, so growth reflects steady state
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    benchmark.pedantic(run, rounds=1, iterations=1)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    benchmark.extra_info["num_calls"] = num_calls
+    benchmark.extra_info["rss_growth_bytes"] = after - before
+    benchmark.extra_info["rss_growth_bytes_per_call"] = (
+        (after - before) / num_calls
+    )
@@ -0,0 +1,41 @@
+'''
+Shared fixtures for `teeplot` benchmarks.
+
+Run from repository root with
+
+    python -m pytest benchmarks
+
+Each run is saved under `benchmarks/.results` and compared against the
+previous saved run. Compare any two saved runs with
+
+    pytest-benchmark --storage benchmarks/.results compare 0001 0002
+'''
+
+import matplotlib
+matplotlib.use("agg")
+from matplotlib import pyplot as plt
+import pytest
+
+from teeplot import __version__
+from teeplot import teeplot as tp
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    output_json["teeplot_version"] = __version__
+    output_json["matplotlib_version"] = matplotlib.__version__
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(tp, "registry", tp.MemoryRegistry())
+    yield
+    plt.close("all")
+
+
+@pytest.fixture
+def sparkline():
+    fig = plt.figure(figsize=(1, 0.25))
+    plt.plot([0, 2, 1, 3], color="black")
+    plt.axis("off")
+    return fig
@@ -0,0 +1,217 @@
+"""Command line interface for teeplot archives, recorded calls, and figure
+snapshots.
+
+Usage::
+
+    python -m teeplot list ARCHIVE [PATTERN ...]
+    python -m teeplot extract [-C DIRECTORY] ARCHIVE [PATTERN ...]
+    python -m teeplot replay [-n] [-j JOBS] [-o OPTION=VALUE ...] OUTDIR [PATTERN ...]
+    python -m teeplot render [-j JOBS] [-q] OUTDIR FORMAT [FORMAT ...]
+"""
+
+import argparse
+import ast
+import fnmatch
+import os
+import sys
+import typing
+
+from ._archive import Archive
+
+
+def _open_archive(path: str) -> Archive:
+    archive = Archive(path)
+    if not os.path.exists(f"{path}.index.jsonl"):
+        archive.reindex()  # e.g., archive copied without its index
+    return archive
+
+
+def _match(
+    names: typing.Iterable[str], patterns: typing.Sequence[str],
+) -> typing.List[str]:
+    return [
+        name
+        for name in names
+        if not patterns
+        or any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    ]
+
+
+def _parse_option(text: str) -> typing.Tuple[str, typing.Any]:
+    """Parse "OPTION=VALUE" as teeplot option name, with "teeplot_" prefix
+    optional, and Python literal value, or string if not a literal."""
+    name, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected OPTION=VALUE, not {text}")
+    if not name.startswith("teeplot_"):
+        name = f"teeplot_{name}"
+    try:
+        return name, ast.literal_eval(value)
+    except (SyntaxError, ValueError):
+        return name, value
+
+
+def _replay(args: argparse.Namespace) -> None:
+    from . import teeplot as tp
+
+    if args.dry_run:
+        store = tp._get_replay_store(args.outdir)
+        for entry in store.entries(args.patterns):
+            print(entry["id"], entry["plotter"], *entry["paths"])
+        return
+
+    failed = 0
+    for result in tp.replay(
+        args.outdir,
+        args.patterns,
+        teeplot_max_workers=args.jobs,
+        **dict(args.options),
+    ):
+        if result.error is not None:
+            failed += 1
+            print(f"{result.id} failed: {result.error!r}", file=sys.stderr)
+        elif not args.quiet:
+            print(*result.paths, sep="\n")
+    if failed:
+        sys.exit(f"{failed} replayed calls failed")
+
+
+def _render(args: argparse.Namespace) -> None:
+    from . import teeplot as tp
+
+    try:
+        written = tp.render_missing(
+            args.formats,
+            teeplot_outdir=args.outdir,
+            teeplot_max_workers=args.jobs,
+        )
+    except ValueError as e:
+        sys.exit(str(e))
+    if not args.quiet:
+        for out_path in written:
+            print(out_path)
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m teeplot",
+        description="Read outputs stored by `tee` under `teeplot_archive`, "
+        "re-render plots of calls recorded under `teeplot_record`, or render "
+        "missing formats from snapshots saved under `teeplot_snapshot`.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list archived outputs")
+    extract_parser = commands.add_parser(
+        "extract", help="unpack archived outputs as files",
+    )
+    extract_parser.add_argument(
+        "-C",
+        "--directory",
+        default=".",
+        help="directory to unpack into, default current directory",
+    )
+    extract_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="don't print paths",
+    )
+    replay_parser = commands.add_parser(
+        "replay",
+        help="re-render plots of recorded calls",
+        description="Re-render plots of calls recorded under "
+        "`teeplot_record` within OUTDIR. Recorded calls are pickles, which "
+        "can run arbitrary code when replayed, so OUTDIR must be trusted.",
+    )
+    replay_parser.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="list selected calls, as id, plotter, and output paths, only",
+    )
+    replay_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes, default number of processors",
+    )
+    replay_parser.add_argument(
+        "-o",
+        "--option",
+        action="append",
+        default=[],
+        dest="options",
+        metavar="OPTION=VALUE",
+        type=_parse_option,
+        help="override teeplot option, e.g., dpi=600 or save=\"{'.pdf'}\"",
+    )
+    replay_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="don't print paths",
+    )
+    replay_parser.add_argument(
+        "outdir", help="output directory calls were recorded within",
+    )
+    replay_parser.add_argument(
+        "patterns",
+        nargs="*",
+        metavar="PATTERN",
+        help="glob patterns matching entry ids or output paths, default all",
+    )
+
+    render_parser = commands.add_parser(
+        "render",
+        help="render missing formats from figure snapshots",
+        description="Render formats missing from plots within OUTDIR, from "
+        "figure snapshots saved under `teeplot_snapshot`. Loading a snapshot "
+        "unpickles it, so OUTDIR must be trusted; only snapshots that "
+        "teeplot indexed when saving, unmodified since, are loaded.",
+    )
+    render_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes, default number of processors",
+    )
+    render_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="don't print paths",
+    )
+    render_parser.add_argument(
+        "outdir", help="output directory to search for snapshots",
+    )
+    render_parser.add_argument(
+        "formats",
+        nargs="+",
+        metavar="FORMAT",
+        help="file formats to render where missing, e.g., .svg or eps",
+    )
+
+    for command_parser in list_parser, extract_parser:
+        command_parser.add_argument("archive", help="path of archive")
+        command_parser.add_argument(
+            "patterns",
+            nargs="*",
+            metavar="PATTERN",
+            help="glob patterns matching output paths, default all",
+        )
+
+    args = parser.parse_args(argv)
+    if args.command == "replay":
+        _replay(args)
+        return
+    elif args.command == "render":
+        _render(args)
+        return
+
+    archive = _open_archive(args.archive)
+    names = _match(archive.names(), args.patterns)
+    if args.command == "list":
+        for name in names:
+            print(name)
+    elif args.command == "extract":
+        for out_path in archive.extract(args.directory, names):
+            if not args.quiet:
+                print(out_path)
+
+
+if __name__ == "__main__":
+    main()
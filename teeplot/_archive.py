@@ -0,0 +1,142 @@
+"""Tar archives of plot outputs, with an index for random access."""
+
+import os
+import pathlib
+import tarfile
+import threading
+import time
+import typing
+
+from ._jsonl import JsonlLog
+from ._registry import _locked
+
+_end_of_archive = b"\0" * (2 * tarfile.BLOCKSIZE)
+
+
+def _member_name(path: typing.Union[str, os.PathLike]) -> str:
+    # as tar does, drop leading "/" so absolute paths extract within dest
+    __, path = os.path.splitdrive(os.path.normpath(path))
+    return path.replace(os.sep, "/").lstrip("/")
+
+
+class Archive:
+    """Tar archive of saved plots, appended to by concurrent processes.
+
+    Outputs are stored as members named by the path `tee` would otherwise
+    have saved them to, less any leading "/", so the archive unpacks to the
+    usual output tree (e.g., via `tar -xf`). Each append writes one member
+    over the archive's end-of-archive blocks, under an exclusive lock on a
+    sibling ".lock" file, then records the member's data offset and size in
+    a sibling ".index.jsonl" file, so members can be read without scanning
+    the archive. Members re-saved later are superseded by their newest
+    copy.
+
+    Only archives created by `Archive` should be appended to, as appends
+    assume the archive ends with exactly two empty blocks.
+    """
+
+    def __init__(self, path: typing.Union[str, os.PathLike]) -> None:
+        self.path = pathlib.Path(path)
+        self._index = JsonlLog(f"{self.path}.index.jsonl")
+        self._entries: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        reset, entries = self._index.read_new()
+        if reset:
+            self._entries.clear()
+        for entry in entries:
+            self._entries.pop(entry["name"], None)  # move to end
+            self._entries[entry["name"]] = entry
+
+    def append(
+        self, path: typing.Union[str, os.PathLike], data: bytes,
+    ) -> None:
+        """Store `data` as member for output `path`."""
+        info = tarfile.TarInfo(_member_name(path))
+        info.size, info.mtime, info.mode = len(data), int(time.time()), 0o644
+        header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        padding = b"\0" * (-len(data) % tarfile.BLOCKSIZE)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            with self._lock, _locked(lock_fd):
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+                with open(fd, "r+b") as file:
+                    end = file.seek(0, os.SEEK_END)
+                    offset = max(end - len(_end_of_archive), 0)
+                    file.seek(offset)
+                    file.write(header + data + padding + _end_of_archive)
+                    file.flush()
+                self._index.append(
+                    {
+                        "name": info.name,
+                        "offset": offset + len(header),
+                        "size": len(data),
+                        "time": info.mtime,
+                    },
+                )
+        finally:
+            os.close(lock_fd)
+
+    def names(self) -> typing.List[str]:
+        """Get names of stored members, oldest first."""
+        self._refresh()
+        return [*self._entries]
+
+    def __contains__(self, path: typing.Union[str, os.PathLike]) -> bool:
+        self._refresh()
+        return _member_name(path) in self._entries
+
+    def size(self, path: typing.Union[str, os.PathLike]) -> int:
+        """Get size in bytes of member stored for output `path`."""
+        self._refresh()
+        return self._entries[_member_name(path)]["size"]
+
+    def read(self, path: typing.Union[str, os.PathLike]) -> bytes:
+        """Get contents of member stored for output `path`.
+
+        Raises `KeyError` if no such member is stored.
+        """
+        self._refresh()
+        entry = self._entries[_member_name(path)]
+        with open(self.path, "rb") as file:
+            file.seek(entry["offset"])
+            return file.read(entry["size"])
+
+    def extract(
+        self,
+        dest: typing.Union[str, os.PathLike] = ".",
+        names: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.List[str]:
+        """Write newest copy of members `names`, or all members, as files
+        within `dest`, returning paths written."""
+        if names is None:
+            names = self.names()
+        written = []
+        for name in map(_member_name, names):
+            if os.path.isabs(name) or name.split("/")[0] == "..":
+                raise ValueError(f"member {name} would extract outside dest")
+            out_path = os.path.join(dest, *name.split("/"))
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            with open(out_path, "wb") as file:
+                file.write(self.read(name))
+            written.append(out_path)
+        return written
+
+    def reindex(self) -> None:
+        """Rebuild index by scanning the archive, e.g., if it was lost."""
+        with tarfile.open(self.path, "r:") as tar:
+            entries = [
+                {
+                    "name": _member_name(info.name),
+                    "offset": info.offset_data,
+                    "size": info.size,
+                    "time": info.mtime,
+                }
+                for info in tar
+                if info.isfile()
+            ]
+        self._index.rewrite(entries)
+        self._refresh()
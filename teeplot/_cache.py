@@ -0,0 +1,223 @@
+"""Persistent cache of `tee` outputs keyed on a fingerprint of call inputs."""
+
+from collections import abc
+import functools
+import hashlib
+import pathlib
+import time
+import types
+import typing
+
+from ._jsonl import JsonlLog
+
+
+class Unfingerprintable(TypeError):
+    """Raised when an object can't be deterministically fingerprinted."""
+
+
+def _update_code(hasher: "hashlib._Hash", code: types.CodeType) -> None:
+    hasher.update(code.co_code)
+    hasher.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_code(hasher, const)
+        else:
+            hasher.update(repr(const).encode())
+
+
+def _is_stateless(obj: typing.Any) -> bool:
+    """Is `obj` an instance of a Python class, without instance state?"""
+    return (
+        isinstance(getattr(obj, "__dict__", None), dict)
+        and not obj.__dict__
+        and not any("__slots__" in vars(cls) for cls in type(obj).__mro__)
+    )
+
+
+def _update(
+    hasher: "hashlib._Hash",
+    obj: typing.Any,
+    opaque_ok: bool,
+    active: typing.Optional[typing.Set[int]] = None,
+) -> None:
+    """Feed a deterministic serialization of `obj` into `hasher`.
+
+    Raises `Unfingerprintable` for objects without a content-based
+    serialization, unless `opaque_ok` is set, in which case they contribute
+    only their type. Functions being fingerprinted are tracked in `active`,
+    so that recursive closures terminate.
+    """
+    if active is None:
+        active = set()
+    recurse = functools.partial(
+        _update, hasher, opaque_ok=opaque_ok, active=active,
+    )
+    cls = type(obj)
+    hasher.update(f"<{cls.__module__}.{cls.__qualname__}>".encode())
+
+    if obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        hasher.update(repr(obj).encode())
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        hasher.update(bytes(obj))
+    elif cls.__module__.split(".")[0] == "pandas" and hasattr(obj, "to_numpy"):
+        import pandas as pd
+
+        recurse([*getattr(obj, "columns", [getattr(obj, "name", None)])])
+        recurse(repr(getattr(obj, "dtypes", getattr(obj, "dtype", None))))
+        try:
+            hashed = pd.util.hash_pandas_object(obj, index=True)
+        except TypeError as e:  # e.g., unhashable cell values
+            raise Unfingerprintable(repr(e)) from e
+        hasher.update(hashed.to_numpy().tobytes())
+    elif cls.__module__ == "numpy" and hasattr(obj, "dtype"):
+        if obj.dtype.hasobject:
+            recurse(obj.shape)
+            for item in obj.flat:
+                recurse(item)
+        else:
+            hasher.update(f"{obj.dtype.str}{obj.shape}".encode())
+            hasher.update(obj.tobytes())
+    elif isinstance(obj, abc.Mapping):
+        for key in sorted(obj, key=repr):
+            recurse(key)
+            recurse(obj[key])
+    elif isinstance(obj, (list, tuple, range)):
+        hasher.update(str(len(obj)).encode())
+        for item in obj:
+            recurse(item)
+    elif isinstance(obj, (set, frozenset)):
+        for item in sorted(obj, key=repr):
+            recurse(item)
+    elif isinstance(obj, functools.partial):
+        recurse(obj.func)
+        recurse(obj.args)
+        recurse(obj.keywords)
+    elif isinstance(obj, types.MethodType):
+        recurse(obj.__func__)
+        recurse(obj.__self__)
+    elif isinstance(obj, (types.FunctionType, type, types.BuiltinFunctionType)):
+        hasher.update(
+            f"{getattr(obj, '__module__', None)}.{obj.__qualname__}".encode(),
+        )
+        if isinstance(obj, types.FunctionType):
+            _update_code(hasher, obj.__code__)
+            if id(obj) in active:  # e.g., closure referring to itself
+                return
+            active.add(id(obj))
+            # values bound at definition, e.g., by a plotter factory
+            bound = [*(obj.__defaults__ or ())]
+            for name, value in sorted((obj.__kwdefaults__ or {}).items()):
+                bound += [name, value]
+            for cell in obj.__closure__ or ():
+                try:
+                    bound.append(cell.cell_contents)
+                except ValueError:  # cell not yet filled
+                    bound.append(None)
+            hasher.update(f"<bound {len(bound)}>".encode())
+            for value in bound:
+                if _is_stateless(value):  # e.g., sentinel default values
+                    value = type(value)
+                recurse(value)
+            active.discard(id(obj))
+    elif isinstance(obj, types.ModuleType):
+        hasher.update(obj.__name__.encode())
+    elif not opaque_ok:
+        raise Unfingerprintable(
+            f"can't fingerprint {cls.__module__}.{cls.__qualname__} object",
+        )
+
+
+def fingerprint(obj: typing.Any, opaque_ok: bool = False) -> str:
+    """Compute stable hex digest of `obj`, consistent across processes.
+
+    Parameters
+    ----------
+    obj : Any
+        Object to fingerprint. Containers, numpy arrays, pandas objects,
+        primitives, and functions (by name, bytecode, defaults, and closure
+        cell contents) are supported. Module globals that functions refer
+        to aren't tracked.
+    opaque_ok : bool, default False
+        If True, otherwise unsupported objects are fingerprinted by type only.
+        Otherwise, they raise `Unfingerprintable`.
+    """
+    hasher = hashlib.sha256()
+    _update(hasher, obj, opaque_ok=opaque_ok)
+    return hasher.hexdigest()
+
+
+class PlotCache:
+    """Append-only JSON-lines record of cached `tee` outputs.
+
+    Each line records a fingerprint key, the output paths it produced, and
+    the time they were written. Later lines supersede earlier ones with the
+    same key.
+    """
+
+    filename: str = ".teeplot-cache.jsonl"
+
+    def __init__(self, outdir: str) -> None:
+        self._log = JsonlLog(pathlib.Path(outdir) / self.filename)
+        self._entries: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+
+    def _refresh(self) -> None:
+        reset, entries = self._log.read_new()
+        if reset:
+            self._entries.clear()
+        for entry in entries:
+            if entry.get("paths") is None:
+                self._entries.pop(entry["key"], None)
+            else:
+                self._entries[entry["key"]] = entry
+
+    def get(self, key: str) -> typing.Optional[typing.List[str]]:
+        """Get output paths recorded for `key`, if any."""
+        self._refresh()
+        entry = self._entries.get(key)
+        return None if entry is None else entry["paths"]
+
+    def put(self, key: str, paths: typing.Iterable[str]) -> None:
+        """Record output paths produced for `key`."""
+        self._log.append({"key": key, "paths": [*paths], "time": time.time()})
+
+    def invalidate(self, key: str) -> None:
+        """Forget output paths recorded for `key`."""
+        self._log.append({"key": key, "paths": None, "time": time.time()})
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._entries)
+
+    def evict(
+        self,
+        max_entries: typing.Optional[int] = None,
+        max_age: typing.Optional[float] = None,
+    ) -> int:
+        """Drop oldest entries beyond `max_entries` and entries older than
+        `max_age` seconds, compacting the backing file.
+
+        Returns
+        -------
+        int
+            Number of entries dropped.
+        """
+        self._refresh()
+        entries = sorted(self._entries.values(), key=lambda e: e["time"])
+        kept = [
+            entry
+            for entry in entries
+            if max_age is None or time.time() - entry["time"] <= max_age
+        ]
+        if max_entries is not None:
+            kept = kept[max(len(kept) - max_entries, 0):] if max_entries else []
+        if len(kept) == len(entries):
+            return 0
+
+        self._log.rewrite(kept)
+        self._refresh()
+        return len(entries) - len(kept)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._log.remove()
+        self._refresh()
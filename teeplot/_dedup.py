@@ -0,0 +1,208 @@
+"""Content-addressed writes of plot outputs, skipping unchanged files and
+linking identical ones."""
+
+import errno
+import hashlib
+import os
+import pathlib
+import threading
+import typing
+
+from ._jsonl import JsonlLog
+
+_FICLONE = 0x40049409  # Linux ioctl cloning file extents, i.e., reflink
+
+_outcomes = "written", "unchanged", "linked"
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Try to create `dst` as a copy-on-write clone of `src`."""
+    try:
+        import fcntl
+    except ImportError:  # e.g., on Windows
+        return False
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+            return True
+        except OSError as e:
+            if e.errno not in (
+                errno.EBADF,
+                errno.EINVAL,
+                errno.ENOTTY,
+                errno.EOPNOTSUPP,
+                errno.EXDEV,
+            ):
+                raise
+            return False
+
+
+class ContentStore:
+    """Index of output contents within an output directory, by digest.
+
+    Outputs whose bytes match what is already on disk are left untouched,
+    keeping their mtimes. Outputs whose bytes match another indexed output
+    are created as a reflink (copy-on-write clone) of it where the
+    filesystem supports it, or otherwise a hard link to it, rather than
+    written again. Files are always replaced, rather than overwritten in
+    place, so linked outputs aren't modified through one another.
+
+    Each write is recorded as a line of a JSON-lines file within the output
+    directory, with its path relative to the output directory, so stores in
+    concurrent processes share the index. Indexed files are only linked to
+    while their inode, size, and mtime are as recorded.
+    """
+
+    filename: str = ".teeplot-dedup.jsonl"
+
+    def __init__(self, outdir: str) -> None:
+        self._outdir = outdir
+        self._log = JsonlLog(pathlib.Path(outdir) / self.filename)
+        self._by_path: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._by_digest: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._totals: typing.Dict[str, int] = {}
+        self._linked_inodes: typing.Set[int] = set()
+        self._lock = threading.Lock()
+        self._reflinks = True  # until filesystem shows otherwise
+
+    def _refresh(self) -> None:
+        reset, entries = self._log.read_new()
+        if reset:
+            self._by_path.clear()
+            self._by_digest.clear()
+            self._totals.clear()
+            self._linked_inodes.clear()
+        for entry in entries:
+            self._by_path[entry["path"]] = entry
+            self._by_digest[entry["digest"]] = entry
+            outcome = entry["outcome"]
+            if outcome == "linked":
+                self._linked_inodes.add(entry["ino"])
+            self._totals[outcome] = self._totals.get(outcome, 0) + 1
+            key = "bytes_written" if outcome == "written" else "bytes_avoided"
+            self._totals[key] = self._totals.get(key, 0) + entry["size"]
+
+    @staticmethod
+    def _matches(entry: typing.Dict[str, typing.Any], path: str) -> bool:
+        """Is file at `path` as recorded in `entry`?"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns) == (
+            entry["ino"], entry["size"], entry["mtime_ns"],
+        )
+
+    def _link(self, src: str, dst: str) -> bool:
+        temp_path = f"{dst}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            if self._reflinks:
+                if _reflink(src, temp_path):
+                    os.replace(temp_path, dst)
+                    return True
+                self._reflinks = False
+                os.unlink(temp_path)
+            os.link(src, temp_path)
+            os.replace(temp_path, dst)
+            return True
+        except OSError:  # e.g., links unsupported or across devices
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            return False
+
+    def write(self, path: typing.Union[str, os.PathLike], data: bytes) -> str:
+        """Store `data` at `path`, unless already there or linkable from an
+        identical output.
+
+        Returns outcome, "written", "unchanged", or "linked".
+        """
+        path = os.fspath(path)
+        relpath = os.path.relpath(path, self._outdir)
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._lock:
+            self._refresh()
+            recorded = self._by_path.get(relpath)
+            source = self._by_digest.get(digest)
+        source_path = (
+            None if source is None
+            else os.path.join(self._outdir, source["path"])
+        )
+
+        if recorded is not None and recorded["digest"] == digest and (
+            self._matches(recorded, path)
+        ):
+            outcome = "unchanged"
+        elif recorded is None and _has_content(path, data):
+            outcome = "unchanged"  # e.g., written before dedup was enabled
+        elif (
+            source is not None
+            and source["path"] != relpath
+            and self._matches(source, source_path)
+            and self._link(source_path, path)
+        ):
+            outcome = "linked"
+        else:
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+            try:
+                file = open(temp_path, "wb")
+            except FileNotFoundError:
+                # output directory removed since `_makedirs` created it
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                file = open(temp_path, "wb")
+            with file:
+                file.write(data)
+            os.replace(temp_path, path)
+            outcome = "written"
+
+        stat = os.stat(path)
+        self._log.append(
+            {
+                "digest": digest,
+                "ino": stat.st_ino,
+                "mtime_ns": stat.st_mtime_ns,
+                "outcome": outcome,
+                "path": relpath,
+                "size": len(data),
+            },
+        )
+        return outcome
+
+    def unshare(self, path: typing.Union[str, os.PathLike]) -> None:
+        """Remove `path` if it is hard-linked by this store to other
+        outputs, so that writing to it in place doesn't modify them.
+
+        Hard links made otherwise, e.g., by the user, are left alone.
+        """
+        with self._lock:
+            self._refresh()
+            if not self._linked_inodes:
+                return
+            linked_inodes = frozenset(self._linked_inodes)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        if stat.st_nlink > 1 and stat.st_ino in linked_inodes:
+            os.unlink(path)
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Count outputs and bytes written, left unchanged, and linked."""
+        with self._lock:
+            self._refresh()
+            return {
+                key: self._totals.get(key, 0)
+                for key in (*_outcomes, "bytes_written", "bytes_avoided")
+            }
+
+
+def _has_content(path: str, data: bytes) -> bool:
+    """Does file at `path` hold exactly `data`?"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as file:
+            return file.read() == data
+    except FileNotFoundError:
+        return False
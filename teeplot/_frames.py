@@ -0,0 +1,122 @@
+"""Streaming encoders for frame series rendered by `tee_frames`."""
+
+import io
+import os
+import struct
+import typing
+
+if typing.TYPE_CHECKING:
+    from PIL import Image
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    """Get position just past sequence of GIF data sub-blocks at `pos`."""
+    while data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+
+def _splice_frame(data: bytes) -> bytes:
+    """Extract image block of single-frame GIF `data`, as image descriptor,
+    with its color table made local, followed by image data.
+
+    Extension blocks, e.g., Pillow's graphic control extension, are dropped.
+    """
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError("not a GIF")
+    flags = data[10]
+    pos = 13
+    color_table = b""
+    if flags & 0x80:  # global color table
+        table_size = 3 << ((flags & 0x07) + 1)
+        color_table = data[pos:pos + table_size]
+        pos += table_size
+
+    while data[pos] == 0x21:  # extension introducer
+        pos = _skip_sub_blocks(data, pos + 2)
+    if data[pos] != 0x2C:  # image separator
+        raise ValueError("GIF holds no image")
+
+    descriptor = bytearray(data[pos:pos + 10])
+    pos += 10
+    if not descriptor[9] & 0x80 and color_table:  # move table inline
+        descriptor[9] = (descriptor[9] & 0x78) | 0x80 | (flags & 0x07)
+    elif descriptor[9] & 0x80:
+        table_size = 3 << ((descriptor[9] & 0x07) + 1)
+        color_table = data[pos:pos + table_size]
+        pos += table_size
+    image_data_start = pos
+    pos = _skip_sub_blocks(data, pos + 1)  # past LZW minimum code size
+    return bytes(descriptor) + color_table + data[image_data_start:pos]
+
+
+class GifWriter:
+    """Animated GIF, written to disk frame by frame.
+
+    Each frame is encoded by Pillow as a standalone image, with its own
+    adaptive palette, and spliced into the animation as soon as it is
+    added, so memory use doesn't grow with the number of frames.
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, os.PathLike],
+        fps: float,
+        loop: typing.Optional[int] = 0,
+    ) -> None:
+        self.path = os.fspath(path)
+        self._delay = max(round(100 / fps), 1)  # in hundredths of a second
+        self._loop = loop
+        self._file: typing.Optional[typing.BinaryIO] = None
+        self.num_frames = 0
+
+    def _write_header(self, width: int, height: int) -> None:
+        self._file = open(self.path, "wb")
+        self._file.write(b"GIF89a")
+        # logical screen descriptor, without global color table
+        self._file.write(struct.pack("<HHBBB", width, height, 0, 0, 0))
+        if self._loop is not None:
+            self._file.write(
+                b"\x21\xff\x0bNETSCAPE2.0"
+                + struct.pack("<BBHB", 3, 1, self._loop, 0),
+            )
+
+    def add(self, image: "Image.Image") -> None:
+        """Append `image` as the animation's next frame."""
+        if self._file is None:
+            self._write_header(*image.size)
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="GIF")
+        # graphic control extension, leaving frame in place under the next
+        self._file.write(
+            b"\x21\xf9\x04"
+            + struct.pack("<BHBB", 0x04, self._delay, 0, 0),
+        )
+        self._file.write(_splice_frame(buffer.getvalue()))
+        self.num_frames += 1
+
+    def close(self) -> None:
+        """Write trailer, completing the animation."""
+        if self._file is not None:
+            self._file.write(b"\x3b")
+            self._file.close()
+            self._file = None
+
+
+class PngWriter:
+    """Series of numbered PNG images, written to disk frame by frame."""
+
+    def __init__(
+        self, pather: typing.Callable[[int], str],
+    ) -> None:
+        self._pather = pather
+        self.paths: typing.List[str] = []
+
+    def add(self, image: "Image.Image") -> None:
+        """Write `image` as the series' next frame."""
+        path = self._pather(len(self.paths))
+        image.save(path, format="PNG")
+        self.paths.append(path)
+
+    def close(self) -> None:
+        pass
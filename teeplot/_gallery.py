@@ -0,0 +1,98 @@
+"""Streaming HTML contact sheets of plots within an output directory."""
+
+import html
+import os
+import typing
+import urllib.parse
+
+from ._names import split_ext, thumbnail_ext
+from ._snapshot import ext as snapshot_ext
+
+# preferred image to preview, and to link to, for each plot
+_preview_exts = thumbnail_ext, ".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg"
+_full_exts = ".png", ".svg", ".jpg", ".jpeg", ".gif", ".webp", thumbnail_ext
+
+_header = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 1em; }}
+main {{ display: flex; flex-wrap: wrap; gap: 1em; }}
+figure {{ margin: 0; width: 16em; }}
+img {{ display: block; max-width: 100%; max-height: 16em; }}
+figcaption {{ font-size: small; overflow-wrap: anywhere; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<main>
+"""
+
+_footer = """</main>
+</body>
+</html>
+"""
+
+
+def _href(path: str, start: str) -> str:
+    relpath = os.path.relpath(path, start).replace(os.sep, "/")
+    return urllib.parse.quote(relpath, safe="/=+,")
+
+
+def _write_figure(
+    file: typing.TextIO,
+    dirpath: str,
+    stem: str,
+    filenames: typing.Mapping[str, str],
+    start: str,
+) -> bool:
+    preview = next((e for e in _preview_exts if e in filenames), None)
+    if preview is None:
+        return False
+    full = next(e for e in _full_exts if e in filenames)
+    href = lambda ext: html.escape(
+        _href(os.path.join(dirpath, filenames[ext]), start),
+    )
+    links = " ".join(
+        f'<a href="{href(ext)}">{html.escape(ext)}</a>'
+        for ext in sorted(filenames)
+        if ext not in (thumbnail_ext, snapshot_ext)
+    )
+    caption = html.escape(
+        os.path.normpath(os.path.join(os.path.relpath(dirpath, start), stem)),
+    ).replace("+", "+<wbr>")
+    file.write(
+        f'<figure><a href="{href(full)}">'
+        f'<img src="{href(preview)}" alt="{html.escape(stem)}" loading="lazy">'
+        f"</a><figcaption>{caption}<br>{links}</figcaption></figure>\n",
+    )
+    return True
+
+
+def write_contact_sheet(outdir: str, path: str, title: str) -> int:
+    """Write HTML gallery of plots within `outdir` to `path`, one directory
+    listing at a time.
+
+    Images are linked, rather than read, so memory use doesn't grow with the
+    number or size of plots. Returns number of plots written.
+    """
+    start = os.path.dirname(os.path.abspath(path))
+    temp_path = f"{path}.{os.getpid()}"
+    count = 0
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(_header.format(title=html.escape(title)))
+        for dirpath, dirnames, filenames in os.walk(outdir):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            dirpath = os.path.abspath(dirpath)
+            plots: typing.Dict[str, typing.Dict[str, str]] = {}
+            for filename in sorted(filenames):
+                if not filename.startswith("."):
+                    stem, ext = split_ext(filename)
+                    plots.setdefault(stem, {})[ext] = filename
+            for stem, exts in plots.items():
+                count += _write_figure(file, dirpath, stem, exts, start)
+        file.write(_footer)
+    os.replace(temp_path, path)
+    return count
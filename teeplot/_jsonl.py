@@ -0,0 +1,86 @@
+"""Append-only JSON-lines files shared between processes."""
+
+import json
+import os
+import pathlib
+import threading
+import typing
+
+
+class JsonlLog:
+    """Append-only JSON-lines file, read incrementally.
+
+    Appends are single `write` calls in append mode, so lines from concurrent
+    writers don't interleave. Readers track their offset into the file and
+    only parse lines appended since their last read.
+    """
+
+    def __init__(self, path: typing.Union[str, os.PathLike]) -> None:
+        self.path = pathlib.Path(path)
+        self._lock = threading.Lock()
+        self._offset = 0
+        self._inode = None
+
+    def append(self, entry: typing.Mapping[str, typing.Any]) -> None:
+        """Append `entry` as a line of JSON."""
+        line = json.dumps(entry, default=str).encode() + b"\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as file:
+            file.write(line)
+
+    def read_new(
+        self,
+    ) -> typing.Tuple[bool, typing.List[typing.Dict[str, typing.Any]]]:
+        """Read entries appended since the last call.
+
+        Returns
+        -------
+        Tuple[bool, List[Dict[str, Any]]]
+            Whether the file was rewritten or removed since the last call,
+            in which case previously read entries are stale and the returned
+            entries start from the beginning of the file, and the entries read.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                reset = self._inode is not None or self._offset != 0
+                self._offset, self._inode = 0, None
+                return reset, []
+
+            reset = False
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                reset = self._inode is not None or self._offset != 0
+                self._offset, self._inode = 0, stat.st_ino
+
+            entries = []
+            if stat.st_size > self._offset:
+                with open(self.path, "rb") as file:
+                    file.seek(self._offset)
+                    for line in file:
+                        if not line.endswith(b"\n"):
+                            break  # partially written line
+                        self._offset += len(line)
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue
+
+            return reset, entries
+
+    def rewrite(
+        self, entries: typing.Iterable[typing.Mapping[str, typing.Any]],
+    ) -> None:
+        """Atomically replace file contents with `entries`."""
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+        with open(temp_path, "wb") as file:
+            for entry in entries:
+                file.write(json.dumps(entry, default=str).encode() + b"\n")
+        os.replace(temp_path, self.path)
+
+    def remove(self) -> None:
+        """Delete the file, if it exists."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
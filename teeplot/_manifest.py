@@ -0,0 +1,74 @@
+"""Persistent, queryable index of plots saved by `tee`."""
+
+import os
+import pathlib
+import time
+import typing
+
+from ._jsonl import JsonlLog
+
+
+class Manifest:
+    """Append-only JSON-lines index of saved plots within an output directory.
+
+    Each line records a saved file's attrs, format, path relative to the
+    output directory, size in bytes, and timing. Paths re-saved later are
+    superseded by their newest entry.
+    """
+
+    filename: str = ".teeplot-manifest.jsonl"
+
+    def __init__(self, outdir: str) -> None:
+        self._outdir = pathlib.Path(outdir)
+        self._log = JsonlLog(self._outdir / self.filename)
+        self._entries: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+
+    def _refresh(self) -> None:
+        reset, entries = self._log.read_new()
+        if reset:
+            self._entries.clear()
+        for entry in entries:
+            self._entries.pop(entry["path"], None)  # move to end
+            self._entries[entry["path"]] = entry
+
+    def record(
+        self,
+        attrs: typing.Mapping[str, typing.Any],
+        ext: str,
+        path: str,
+        render_time: float,
+        save_time: float,
+        nbytes: typing.Optional[int] = None,
+    ) -> None:
+        """Append entry for a newly saved file at `path`.
+
+        Attrs with underscore-prefixed keys are omitted. If `nbytes` isn't
+        provided, the file's size is looked up.
+        """
+        self._log.append(
+            {
+                "attrs": {
+                    k: str(v) for k, v in attrs.items() if not k.startswith("_")
+                },
+                "bytes": os.path.getsize(path) if nbytes is None else nbytes,
+                "ext": ext,
+                "path": os.path.relpath(path, self._outdir),
+                "render_time": render_time,
+                "save_time": save_time,
+                "timestamp": time.time(),
+            },
+        )
+
+    def find(self, **attrs: str) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Get entries whose attrs match all of `attrs`, oldest first.
+
+        Entry paths are joined onto the output directory.
+        """
+        self._refresh()
+        return [
+            {**entry, "path": str(self._outdir / entry["path"])}
+            for entry in self._entries.values()
+            if all(
+                entry["attrs"].get(k) == str(v) for k, v in attrs.items()
+            )
+        ]
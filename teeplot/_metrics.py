@@ -0,0 +1,126 @@
+"""Timed events for each phase of `tee`, and their aggregation."""
+
+from collections import defaultdict, deque
+import threading
+import typing
+
+
+class PhaseEvent(typing.NamedTuple):
+    """Timing of one phase of a `tee` call, passed to `teeplot.hooks`.
+
+    Phases are "plot", "postprocess", "thumbnail", and "show", once per
+    call, and "layout" and "encode", once per saved format. Layout is the
+    `bbox_inches='tight'` pass of `savefig`, and encode is the remainder.
+    """
+
+    phase: str
+    """Name of phase."""
+
+    duration: float
+    """Wall time spent in phase, in seconds."""
+
+    attrs: typing.Dict[str, typing.Any]
+    """Output filename attrs of plot."""
+
+    ext: typing.Optional[str] = None
+    """Format extension, for per-format phases."""
+
+    path: typing.Optional[str] = None
+    """Output path, for per-format phases."""
+
+    nbytes: typing.Optional[int] = None
+    """Size of saved file, for "encode" phase."""
+
+
+def _quantile(ordered: typing.Sequence[float], q: float) -> float:
+    """Nearest-rank quantile of nonempty sorted values."""
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+class Metrics:
+    """Hook aggregating `PhaseEvent`s into per-phase, per-format summaries.
+
+    Register with `teeplot.hooks.append(metrics)`. Counts and totals cover
+    all events; quantiles cover the most recent `window` events for each
+    phase and format. Safe to call from multiple threads.
+    """
+
+    def __init__(self, window: int = 10_000) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+        self._totals = defaultdict(float)
+        self._nbytes = defaultdict(int)
+        self._recent = defaultdict(lambda: deque(maxlen=self.window))
+
+    def __call__(self, event: PhaseEvent) -> None:
+        key = event.phase, event.ext
+        with self._lock:
+            self._counts[key] += 1
+            self._totals[key] += event.duration
+            self._recent[key].append(event.duration)
+            if event.nbytes is not None:
+                self._nbytes[key] += event.nbytes
+
+    def summary(
+        self,
+    ) -> typing.Dict[
+        typing.Tuple[str, typing.Optional[str]], typing.Dict[str, float]
+    ]:
+        """Get "count", "total", "p50", "p95", and "bytes" for each
+        `(phase, ext)` observed, with ext None for per-call phases."""
+        with self._lock:
+            return {
+                key: {
+                    "count": self._counts[key],
+                    "total": self._totals[key],
+                    "p50": _quantile(sorted(self._recent[key]), 0.50),
+                    "p95": _quantile(sorted(self._recent[key]), 0.95),
+                    "bytes": self._nbytes[key],
+                }
+                for key in sorted(self._counts, key=repr)
+            }
+
+    def to_text(self) -> str:
+        """Export summary in Prometheus text exposition format."""
+        lines = [
+            "# HELP teeplot_phase_seconds Wall time spent in phase of tee.",
+            "# TYPE teeplot_phase_seconds summary",
+        ]
+        summary = self.summary()
+        for (phase, ext), stats in summary.items():
+            labels = f'phase="{_escape(phase)}",ext="{_escape(ext or "")}"'
+            for quantile in "0.5", "0.95":
+                value = stats["p50" if quantile == "0.5" else "p95"]
+                lines.append(
+                    f'teeplot_phase_seconds{{{labels},quantile="{quantile}"}} '
+                    f"{value!r}",
+                )
+            lines += [
+                f"teeplot_phase_seconds_sum{{{labels}}} {stats['total']!r}",
+                f"teeplot_phase_seconds_count{{{labels}}} {stats['count']}",
+            ]
+
+        lines += [
+            "# HELP teeplot_bytes_written_total Bytes written by tee.",
+            "# TYPE teeplot_bytes_written_total counter",
+        ]
+        for (phase, ext), stats in summary.items():
+            if phase == "encode":
+                lines.append(
+                    f'teeplot_bytes_written_total{{ext="{_escape(ext or "")}"}} '
+                    f"{stats['bytes']}",
+                )
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Drop all aggregated events."""
+        with self._lock:
+            self._counts.clear()
+            self._totals.clear()
+            self._nbytes.clear()
+            self._recent.clear()
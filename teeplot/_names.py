@@ -0,0 +1,100 @@
+"""Bounded-length output filenames, with full attrs kept in an index, and
+splitting of filenames into stem and format extension."""
+
+import hashlib
+import os
+import pathlib
+import threading
+import typing
+
+from ._jsonl import JsonlLog
+
+digest_sep: str = "~"
+
+thumbnail_ext: str = ".thumb.png"
+
+
+def split_ext(filename: str) -> typing.Tuple[str, str]:
+    """Split `filename` into stem shared by all formats of a plot and format
+    extension."""
+    head, sep, ext = filename.rpartition("ext=")
+    if sep and (not head or head.endswith("+")) and "+" not in ext:
+        return head[:-1], ext
+    elif filename.endswith(thumbnail_ext):
+        return filename[:-len(thumbnail_ext)], thumbnail_ext
+    else:
+        stem, ext = os.path.splitext(filename)
+        return stem, ext
+
+
+def _digest(text: str, digest_size: int) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=digest_size).hexdigest()
+
+
+def shorten(attrs: typing.Mapping[str, str], max_length: int) -> str:
+    """Join `attrs` into a filename stem, as "k1=v1+k2=v2", of at most
+    `max_length` characters.
+
+    Longest values are replaced first by their leading characters and a
+    digest of the full value (e.g., "sepal-le~3f9a0c21d4"), so names depend
+    only on `attrs` and are the same in every process. If replacing every
+    value doesn't suffice, the stem is replaced by a digest of all attrs.
+    """
+    attrs = dict(sorted(attrs.items()))
+    full_stem = "+".join(f"{k}={v}" for k, v in attrs.items())
+    length = len(full_stem)
+    # longest values first, ties broken by key
+    for key in sorted(attrs, key=lambda k: (-len(attrs[k]), k)):
+        if length <= max_length:
+            break
+        value = attrs[key]
+        short = f"{value[:8]}{digest_sep}{_digest(value, 5)}"
+        if len(short) < len(value):
+            attrs[key] = short
+            length -= len(value) - len(short)
+
+    if length <= max_length:
+        return "+".join(f"{k}={v}" for k, v in attrs.items())
+    else:
+        return f"attrs={digest_sep}{_digest(full_stem, 8)}"
+
+
+class NameIndex:
+    """Append-only JSON-lines index of full attrs of outputs within an
+    output directory, by filename stem.
+
+    Keeps attrs recoverable for filenames shortened under
+    `teeplot_max_name_length`.
+    """
+
+    filename: str = ".teeplot-names.jsonl"
+
+    def __init__(self, outdir: str) -> None:
+        self._log = JsonlLog(pathlib.Path(outdir) / self.filename)
+        self._attrs: typing.Dict[str, typing.Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        reset, entries = self._log.read_new()
+        if reset:
+            self._attrs.clear()
+        for entry in entries:
+            self._attrs[entry["name"]] = entry["attrs"]
+
+    def record(
+        self, name: str, attrs: typing.Mapping[str, typing.Any],
+    ) -> None:
+        """Index `attrs` under filename stem `name`, unless already indexed."""
+        attrs = {k: str(v) for k, v in attrs.items()}
+        with self._lock:
+            self._refresh()
+            if self._attrs.get(name) != attrs:
+                self._log.append({"attrs": attrs, "name": name})
+                self._attrs[name] = attrs
+
+    def lookup(self, name: str) -> typing.Optional[typing.Dict[str, str]]:
+        """Get attrs indexed under filename stem `name`, if any."""
+        with self._lock:
+            self._refresh()
+            attrs = self._attrs.get(name)
+        return None if attrs is None else {**attrs}
@@ -0,0 +1,131 @@
+"""Multi-page PDF documents collecting plots across `tee` calls."""
+
+import os
+import threading
+import typing
+import warnings
+
+if typing.TYPE_CHECKING:
+    from matplotlib.backends.backend_pdf import PdfFile, PdfPages
+
+T = typing.TypeVar("T")
+
+_outline_internals = (
+    "pageList", "pagesObject", "reserveObject", "rootObject", "writeObject",
+)
+"""Attributes of matplotlib's `PdfFile` that writing an outline relies on."""
+
+
+def _outline_file(pages: "PdfPages") -> typing.Optional["PdfFile"]:
+    """Get file underlying `pages`, if the running matplotlib exposes the
+    internals needed to write an outline into it, otherwise None.
+
+    These internals are private, so outlines are only written under
+    matplotlib major versions they are known from.
+    """
+    import matplotlib
+
+    if matplotlib.__version__.split(".")[0] != "3":
+        return None
+    ensure_file = getattr(pages, "_ensure_file", None)
+    if ensure_file is None:
+        return None
+    file = ensure_file()
+    if not all(hasattr(file, name) for name in _outline_internals):
+        return None
+    return file
+
+
+def _write_outline(file: "PdfFile", titles: typing.Sequence[str]) -> None:
+    """Write outline (i.e., bookmarks) entry `titles[i]` for each page `i` of
+    open `file`."""
+    from matplotlib.backends.backend_pdf import Name
+
+    outline = file.reserveObject("outline")
+    items = [file.reserveObject("outline item") for __ in titles]
+    pages = file.pageList
+    for i, (item, title, page) in enumerate(zip(items, titles, pages)):
+        entry = {
+            "Title": title, "Parent": outline, "Dest": [page, Name("Fit")],
+        }
+        if i > 0:
+            entry["Prev"] = items[i - 1]
+        if i + 1 < len(items):
+            entry["Next"] = items[i + 1]
+        file.writeObject(item, entry)
+    file.writeObject(
+        outline,
+        {
+            "Type": Name("Outlines"),
+            "First": items[0],
+            "Last": items[-1],
+            "Count": len(items),
+        },
+    )
+    # catalog was written when file was opened, so write an updated copy;
+    # the xref table points readers at the latest copy of each object
+    file.writeObject(
+        file.rootObject,
+        {
+            "Type": Name("Catalog"),
+            "Pages": file.pagesObject,
+            "Outlines": outline,
+            "PageMode": Name("UseOutlines"),
+        },
+    )
+
+
+class PdfBook:
+    """Multi-page PDF document with an outline entry titling each page.
+
+    Wraps `matplotlib.backends.backend_pdf.PdfPages`, so fonts and other
+    resources used by many pages are embedded once, when the book is
+    closed.
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, os.PathLike],
+        metadata: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    ) -> None:
+        from matplotlib.backends.backend_pdf import PdfPages
+
+        self.path = os.fspath(path)
+        self._pages = PdfPages(self.path, metadata=metadata)
+        self._titles: typing.List[str] = []
+        self._lock = threading.Lock()
+
+    def add_page(
+        self, title: str, save: typing.Callable[["PdfPages"], T],
+    ) -> typing.Tuple[int, T]:
+        """Add page saved by `save`, which is passed a `PdfPages` to
+        savefig to, under outline entry `title`.
+
+        Returns page number of added page, counting from 1, and result of
+        `save`.
+        """
+        with self._lock:
+            result = save(self._pages)
+            self._titles.append(title)
+            return self._pages.get_pagecount(), result
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def close(self) -> None:
+        """Write outline and shared resources, completing the document."""
+        with self._lock:
+            try:
+                file = _outline_file(self._pages) if self._titles else None
+                if file is not None:
+                    _write_outline(file, self._titles)
+                elif self._titles:
+                    import matplotlib
+
+                    warnings.warn(
+                        "teeplot can't write PDF outline under matplotlib "
+                        f"{matplotlib.__version__}, so {self.path} has no "
+                        "bookmarks",
+                    )
+            finally:
+                self._pages.close()
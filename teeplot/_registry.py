@@ -0,0 +1,203 @@
+"""Registries of saved output paths, used to detect filename collisions."""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import functools
+import hashlib
+import os
+import pathlib
+import sys
+import threading
+import typing
+
+import typing_extensions as typext
+
+
+@functools.lru_cache(maxsize=1024)
+def _normed_dir(cwd: str, dirname: str) -> str:
+    """Normalize `dirname`, relative to `cwd`, with trailing separator, so
+    that appending a normalized basename gives its joined path."""
+    return os.path.join(
+        os.path.normcase(os.path.abspath(os.path.join(cwd, dirname))), "",
+    )
+
+
+def _hash_path(path: typing.Union[str, os.PathLike]) -> int:
+    """Stable 64-bit key for `path`, consistent across processes."""
+    path = os.fspath(path)
+    dirname, __, basename = path.rpartition(os.sep)
+    # otherwise, os.path.split strips or keeps separators, or splits drive
+    if os.altsep is not None or not dirname or dirname.endswith(os.sep):
+        dirname, basename = os.path.split(path)
+    if basename in ("", ".", ".."):
+        normed = os.path.normcase(os.path.abspath(path))
+    else:  # cache normalization of directory, shared by many paths
+        normed = _normed_dir(os.getcwd(), dirname) + os.path.normcase(
+            basename,
+        )
+    return int.from_bytes(
+        hashlib.blake2b(normed.encode(), digest_size=8).digest(), "little",
+    )
+
+
+class CollisionRegistry(typext.Protocol):
+    """Interface for registries of saved output paths."""
+
+    def claim(self, path: typing.Union[str, os.PathLike]) -> int:
+        """Register a save to `path`, returning how many saves to `path` were
+        previously registered."""
+        ...
+
+    def count(self, path: typing.Union[str, os.PathLike]) -> int:
+        """Get how many saves to `path` have been registered."""
+        ...
+
+
+class MemoryRegistry:
+    """Bounded in-process registry of saved output paths.
+
+    Paths are stored as 64-bit hashes. Once `maxsize` distinct paths have been
+    registered, least recently used paths are forgotten.
+    """
+
+    def __init__(self, maxsize: int = 2 ** 20) -> None:
+        self.maxsize = maxsize
+        self._counts: typing.OrderedDict[int, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, path: typing.Union[str, os.PathLike]) -> int:
+        key = _hash_path(path)
+        with self._lock:
+            count = self._counts.pop(key, 0)
+            self._counts[key] = count + 1
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+        return count
+
+    def count(self, path: typing.Union[str, os.PathLike]) -> int:
+        with self._lock:
+            return self._counts.get(_hash_path(path), 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+@contextmanager
+def _locked(fd: int) -> typing.Iterator[None]:
+    """Hold an exclusive advisory lock on open file descriptor `fd`."""
+    if sys.platform == "win32":
+        import msvcrt
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.lockf(fd, fcntl.LOCK_UN)
+
+
+class FileRegistry:
+    """Registry of saved output paths shared between processes.
+
+    Each claim appends an 8-byte path hash to a log file at `path`, under an
+    exclusive lock on a sibling ".lock" file. Claims made by other processes
+    are picked up by reading only log records appended since the last claim.
+    Counts are cached in memory for up to `maxsize` distinct paths; counts for
+    paths that have been forgotten are recovered by rescanning the log.
+    """
+
+    _record_size = 8
+
+    def __init__(
+        self,
+        path: typing.Union[str, os.PathLike],
+        maxsize: int = 2 ** 20,
+    ) -> None:
+        self.path = pathlib.Path(path)
+        self._cache = MemoryRegistry(maxsize=maxsize)
+        self._offset = 0
+        self._forgetful = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _synced(self) -> typing.Iterator[typing.BinaryIO]:
+        """Hold cross-process lock, with log caught up and open for append."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_fd = os.open(
+            f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o666,
+        )
+        try:
+            with self._lock, _locked(lock_fd), open(self.path, "ab+") as log:
+                if log.seek(0, os.SEEK_END) < self._offset:
+                    # log was cleared by another process
+                    self._offset, self._forgetful = 0, False
+                    self._cache.clear()
+                log.seek(self._offset)
+                self._ingest(log.read())
+                yield log
+        finally:
+            os.close(lock_fd)
+
+    def _ingest(self, data: bytes) -> None:
+        data = data[:len(data) - len(data) % self._record_size]
+        self._offset += len(data)
+        counts = self._cache._counts
+        for key in memoryview(data).cast("Q"):
+            if key in counts:
+                counts[key] = counts.pop(key) + 1
+            elif not self._forgetful:  # else, rescan log if ever needed
+                counts[key] = 1
+        self._shrink()
+
+    def _shrink(self) -> None:
+        counts = self._cache._counts
+        while len(counts) > self._cache.maxsize:
+            counts.popitem(last=False)
+            self._forgetful = True
+
+    def _count(self, log: typing.BinaryIO, key: int) -> int:
+        counts = self._cache._counts
+        if key not in counts and self._forgetful:
+            log.seek(0)
+            data = log.read(self._offset)
+            counts[key] = sum(1 for k in memoryview(data).cast("Q") if k == key)
+        return counts.get(key, 0)
+
+    def claim(self, path: typing.Union[str, os.PathLike]) -> int:
+        key = _hash_path(path)
+        with self._synced() as log:
+            count = self._count(log, key)
+            log.seek(0, os.SEEK_END)
+            log.write(key.to_bytes(self._record_size, sys.byteorder))
+            log.flush()
+            self._offset += self._record_size
+            counts = self._cache._counts
+            counts.pop(key, None)
+            counts[key] = count + 1
+            self._shrink()
+        return count
+
+    def count(self, path: typing.Union[str, os.PathLike]) -> int:
+        with self._synced() as log:
+            return self._count(log, _hash_path(path))
+
+    def clear(self) -> None:
+        """Forget all registered paths, for all processes."""
+        with self._synced() as log:
+            log.truncate(0)
+            self._offset = 0
+            self._cache.clear()
+            self._forgetful = False
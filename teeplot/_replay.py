@@ -0,0 +1,253 @@
+"""Record of `tee` calls within an output directory, for re-rendering plots
+without recomputing their inputs.
+
+Recorded calls are pickles, and unpickling can execute arbitrary code. So,
+calls are only loaded from entries of the store's log, and side files only
+if referenced by the entry being loaded.
+"""
+
+import base64
+import fnmatch
+import hashlib
+import io
+import os
+import pathlib
+import pickle
+import re
+import threading
+import time
+import typing
+
+from . import _cache
+from ._jsonl import JsonlLog
+
+_inline_max_bytes = 1 << 16
+"""Arrays and pandas objects at least this large are stored as side files,
+rather than within pickled calls."""
+
+_side_exts = {"npy": ".npy", "pickle": ".pickle"}
+"""Side file extension for each kind of persistent id."""
+
+_side_name_re = re.compile(r"[0-9a-f]{32}\.(npy|pickle)")
+"""Side file names, as content digest and extension."""
+
+
+def _plotter_name(plotter: typing.Callable[..., typing.Any]) -> str:
+    module = getattr(plotter, "__module__", None)
+    qualname = getattr(plotter, "__qualname__", type(plotter).__qualname__)
+    return f"{module}.{qualname}" if module else qualname
+
+
+class _CallPickler(pickle.Pickler):
+    """Pickler storing numpy arrays and pandas objects as side files,
+    shared by content between calls, rather than inline."""
+
+    def __init__(self, file: typing.BinaryIO, store: "ReplayStore") -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._store = store
+        self.side_names: typing.Set[str] = set()
+
+    def _put_data(self, obj: typing.Any, ext: str) -> str:
+        name = self._store._put_data(obj, ext)
+        self.side_names.add(name)
+        return name
+
+    def persistent_id(self, obj: typing.Any) -> typing.Optional[tuple]:
+        cls = type(obj)
+        if cls.__module__ == "numpy" and cls.__name__ == "ndarray":
+            if obj.dtype.hasobject or obj.nbytes < _inline_max_bytes:
+                return None
+            return ("npy", self._put_data(obj, ".npy"))
+        elif cls.__module__.split(".")[0] == "pandas" and cls.__name__ in (
+            "DataFrame", "Series",
+        ):
+            nbytes = obj.memory_usage(index=True, deep=False)
+            if not isinstance(nbytes, int):  # per column, for DataFrame
+                nbytes = nbytes.sum()
+            if nbytes < _inline_max_bytes:
+                return None
+            try:
+                return ("pickle", self._put_data(obj, ".pickle"))
+            except _cache.Unfingerprintable:  # e.g., unhashable cell values
+                return None
+        return None
+
+
+class _CallUnpickler(pickle.Unpickler):
+    """Unpickler loading side files, only if among `side_names` recorded
+    with the call."""
+
+    def __init__(
+        self,
+        file: typing.BinaryIO,
+        store: "ReplayStore",
+        side_names: typing.Collection[str],
+    ) -> None:
+        super().__init__(file)
+        self._store = store
+        self._side_names = side_names
+
+    def persistent_load(self, pid: tuple) -> typing.Any:
+        kind, name = pid
+        if kind not in _side_exts:
+            raise pickle.UnpicklingError(
+                f"unknown replay side file kind {kind}",
+            )
+        if (
+            name not in self._side_names
+            or not _side_name_re.fullmatch(name)
+            or not name.endswith(_side_exts[kind])
+        ):
+            raise pickle.UnpicklingError(
+                f"replay side file {name!r} not recorded with call",
+            )
+        path = self._store.data_dir / name
+        if kind == "npy":
+            import numpy as np
+
+            return np.load(path, allow_pickle=False)
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+
+class ReplayStore:
+    """Append-only JSON-lines record of `tee` calls within an output
+    directory, as pickled plotter references, args, kwargs, and teeplot
+    options.
+
+    Large numpy arrays and pandas objects are stored as side files named by
+    a digest of their content, so data shared between calls (e.g., a
+    dataframe plotted many ways) is stored once. Identical calls saving to
+    the same paths are recorded once.
+
+    Loading a call unpickles it, which can execute arbitrary code, so only
+    load from output directories you trust.
+    """
+
+    dirname: str = ".teeplot-replay"
+
+    def __init__(self, outdir: str) -> None:
+        self.path = pathlib.Path(outdir) / self.dirname
+        self.data_dir = self.path / "data"
+        self._log = JsonlLog(self.path / "calls.jsonl")
+        self._entries: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        reset, entries = self._log.read_new()
+        if reset:
+            self._entries.clear()
+        for entry in entries:
+            self._entries.pop(entry["id"], None)  # keep latest last
+            self._entries[entry["id"]] = entry
+
+    def _put_data(self, obj: typing.Any, ext: str) -> str:
+        name = f"{_cache.fingerprint(obj)[:32]}{ext}"
+        path = self.data_dir / name
+        if not path.exists():
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(
+                f"{name}.{os.getpid()}.{threading.get_ident()}",
+            )
+            with open(temp_path, "wb") as file:
+                if ext == ".npy":
+                    import numpy as np
+
+                    np.save(file, obj, allow_pickle=False)
+                else:
+                    pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        return name
+
+    def record(
+        self,
+        plotter: typing.Callable[..., typing.Any],
+        args: typing.Sequence[typing.Any],
+        kwargs: typing.Mapping[str, typing.Any],
+        options: typing.Mapping[str, typing.Any],
+        paths: typing.Iterable[str],
+    ) -> str:
+        """Record a `tee` call and the output paths it saved to.
+
+        Raises an exception from pickling if the call can't be serialized,
+        e.g., with a lambda plotter.
+
+        Returns
+        -------
+        str
+            Id of recorded entry.
+        """
+        buffer = io.BytesIO()
+        pickler = _CallPickler(buffer, self)
+        pickler.dump((plotter, tuple(args), dict(kwargs), dict(options)))
+        payload = buffer.getvalue()
+        paths = [*paths]
+        # identical calls saving to distinct paths (e.g., renumbered under
+        # teeplot_oncollision "fix") are recorded separately
+        hasher = hashlib.blake2b(payload, digest_size=8)
+        hasher.update("\0".join(paths).encode())
+        entry_id = hasher.hexdigest()
+        with self._lock:
+            self._refresh()
+            if entry_id not in self._entries:
+                entry = {
+                    "call": base64.b64encode(payload).decode(),
+                    "id": entry_id,
+                    "paths": paths,
+                    "plotter": _plotter_name(plotter),
+                    "side_files": sorted(pickler.side_names),
+                    "time": time.time(),
+                }
+                self._log.append(entry)
+                self._entries.pop(entry_id, None)
+                self._entries[entry_id] = entry
+        return entry_id
+
+    def entries(
+        self, patterns: typing.Sequence[str] = (),
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Get recorded entries, in order recorded, with "id", "plotter",
+        and "paths" fields.
+
+        If `patterns` are given, only entries whose id or any output path
+        matches a glob pattern are included.
+        """
+        with self._lock:
+            self._refresh()
+            entries = [*self._entries.values()]
+        return [
+            {k: entry[k] for k in ("id", "plotter", "paths", "time")}
+            for entry in entries
+            if not patterns
+            or any(
+                fnmatch.fnmatchcase(name, pattern)
+                for name in (entry["id"], *entry["paths"])
+                for pattern in patterns
+            )
+        ]
+
+    def load(self, entry_id: str) -> typing.Tuple[
+        typing.Callable[..., typing.Any],
+        typing.Tuple[typing.Any, ...],
+        typing.Dict[str, typing.Any],
+        typing.Dict[str, typing.Any],
+    ]:
+        """Load `(plotter, args, kwargs, options)` of recorded call.
+
+        Only entries of the store's log are loaded, along with side files
+        they reference by name.
+
+        Raises
+        ------
+        KeyError
+            If no entry was recorded under `entry_id`.
+        pickle.UnpicklingError
+            If call references side files not recorded with it.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._entries[entry_id]
+        payload = base64.b64decode(entry["call"])
+        return _CallUnpickler(
+            io.BytesIO(payload), self, frozenset(entry.get("side_files", ())),
+        ).load()
@@ -0,0 +1,47 @@
+"""In-memory targets for plot outputs, for use without a filesystem."""
+
+import os
+import threading
+import typing
+
+Encoded = typing.Union[bytes, memoryview]
+
+
+class MemorySink(typing.MutableMapping[str, Encoded]):
+    """Mapping of output path to encoded bytes, filled by `tee` in place of
+    writing files.
+
+    Keys are the paths `tee` would otherwise have saved to, named and
+    deduplicated under the usual `teeplot_oncollision` handling. Values are
+    `bytes`, or a zero-copy `memoryview` of the encoder's buffer for formats
+    without `transforms`; use `bytes(value)` for an independent copy.
+
+    Outputs accumulate across calls until removed, e.g., via `pop` or
+    `clear`, so a sink per request (or per batch) keeps memory bounded.
+    """
+
+    def __init__(self) -> None:
+        self._outputs: typing.Dict[str, Encoded] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, path: typing.Union[str, os.PathLike]) -> Encoded:
+        return self._outputs[os.fspath(path)]
+
+    def __setitem__(
+        self, path: typing.Union[str, os.PathLike], data: Encoded,
+    ) -> None:
+        with self._lock:  # written to from transform pool threads
+            self._outputs[os.fspath(path)] = data
+
+    def __delitem__(self, path: typing.Union[str, os.PathLike]) -> None:
+        with self._lock:
+            del self._outputs[os.fspath(path)]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter([*self._outputs])
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({[*self._outputs]!r})"
@@ -0,0 +1,112 @@
+"""Serialized snapshots of saved figures, for rendering further formats
+later without re-running `tee`.
+
+Snapshots are pickles, and unpickling can execute arbitrary code. So,
+only snapshots recorded in the index of the output directory they were
+written to are loaded, and only if unchanged since.
+"""
+
+import gzip
+import hashlib
+import os
+import pickle
+import threading
+import typing
+
+from ._jsonl import JsonlLog
+
+ext: str = ".mplfig.gz"
+"""Extension of snapshot files, saved alongside outputs as if another
+format, e.g., "viz=lineplot+ext=.mplfig.gz"."""
+
+index_filename: str = ".teeplot-snapshots.jsonl"
+"""JSON-lines index of snapshots written into an output directory, recording
+each one's path relative to the directory and SHA-256 digest."""
+
+
+def path_prefix(out_path: str, out_ext: str) -> typing.Optional[str]:
+    """Get output path shared by all formats of a plot, sans extension, or
+    None if `out_path` isn't named by its extension `out_ext`."""
+    if out_path.endswith(f"ext={out_ext}"):
+        return out_path[:-len(out_ext)]
+    return None
+
+
+def dump(
+    outdir: str,
+    path: str,
+    figure: bytes,
+    rc: typing.Mapping[str, typing.Any],
+    savefig_kwargs: typing.Mapping[str, typing.Any],
+) -> None:
+    """Write snapshot of pickled `figure`, with rcParams and savefig kwargs
+    it was saved under, to `path`, and record it in the index of `outdir`."""
+    import matplotlib
+
+    payload = pickle.dumps(
+        {
+            "figure": figure,
+            "matplotlib": matplotlib.__version__,
+            "rc": dict(rc),
+            "savefig_kwargs": dict(savefig_kwargs),
+        },
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+    data = gzip.compress(payload, compresslevel=6)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+    JsonlLog(os.path.join(outdir, index_filename)).append(
+        {
+            "path": os.path.relpath(path, outdir),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        },
+    )
+
+
+def load(path: str, sha256: str) -> typing.Dict[str, typing.Any]:
+    """Read snapshot at `path`, as "figure" (pickled), "rc",
+    "savefig_kwargs", and "matplotlib" (version) fields.
+
+    Contents are checked against `sha256`, the digest indexed when the
+    snapshot was written, before being unpickled.
+
+    Raises
+    ------
+    ValueError
+        If snapshot was modified since written.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if hashlib.sha256(data).hexdigest() != sha256:
+        raise ValueError(f"snapshot {path} modified since written")
+    return pickle.loads(gzip.decompress(data))
+
+
+def find(outdir: str) -> typing.Iterator[typing.Tuple[str, str]]:
+    """Walk `outdir` for indexed snapshots that exist, as path and digest
+    pairs, skipping hidden directories.
+
+    Unindexed files named like snapshots aren't yielded, nor are indexed
+    paths outside the directory of their index.
+    """
+    for dirpath, dirnames, filenames in os.walk(outdir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        if index_filename not in filenames:
+            continue
+        root = os.path.abspath(dirpath)
+        index = JsonlLog(os.path.join(dirpath, index_filename))
+        __, entries = index.read_new()
+        indexed = {}  # newest entry for each path wins
+        for entry in entries:
+            relpath, digest = entry.get("path"), entry.get("sha256")
+            if not isinstance(relpath, str) or not isinstance(digest, str):
+                continue
+            path = os.path.normpath(os.path.join(dirpath, relpath))
+            inside = os.path.commonpath([root, os.path.abspath(path)]) == root
+            if inside and path.endswith(ext):
+                indexed[path] = digest
+        for path, digest in sorted(indexed.items()):
+            if os.path.isfile(path):
+                yield path, digest
@@ -0,0 +1,89 @@
+"""Built-in transforms of encoded plot bytes, for use with
+`teeplot.transforms`."""
+
+import functools
+import gzip
+import re
+import struct
+import typing
+import zlib
+
+_gzip_magic = b"\x1f\x8b"
+_png_signature = b"\x89PNG\r\n\x1a\n"
+_png_metadata_chunks = frozenset({b"tEXt", b"zTXt", b"iTXt", b"tIME"})
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return b"".join(
+        (
+            struct.pack(">I", len(data)),
+            kind,
+            data,
+            struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))),
+        ),
+    )
+
+
+def _png_recompress(data: bytes, level: int, strip_metadata: bool) -> bytes:
+    if not data.startswith(_png_signature):
+        raise ValueError("not a PNG file")
+
+    chunks, idat = [], []
+    pos = len(_png_signature)
+    while pos < len(data):
+        length, kind = struct.unpack_from(">I4s", data, pos)
+        body = data[pos + 8:pos + 8 + length]
+        pos += length + 12
+        if kind == b"IDAT":
+            if not idat:
+                chunks.append((b"IDAT", None))  # placeholder for merged data
+            idat.append(body)
+        elif not (strip_metadata and kind in _png_metadata_chunks):
+            chunks.append((kind, body))
+
+    # re-deflate filtered scanlines as is, so pixels are untouched
+    pixels = zlib.compress(zlib.decompress(b"".join(idat)), level)
+    return _png_signature + b"".join(
+        _png_chunk(kind, pixels if body is None else body)
+        for kind, body in chunks
+    )
+
+
+def png_zlib(
+    level: int = 9, strip_metadata: bool = True,
+) -> typing.Callable[[bytes], bytes]:
+    """Create transform losslessly recompressing PNG image data at zlib
+    compression `level`.
+
+    If `strip_metadata`, text and timestamp chunks (e.g., "Software") are
+    dropped.
+    """
+    return functools.partial(
+        _png_recompress, level=level, strip_metadata=strip_metadata,
+    )
+
+
+def _svg_gzip(data: bytes, level: int, strip_metadata: bool) -> bytes:
+    if not data.startswith(_gzip_magic):
+        raise ValueError(
+            "svg_gzip transforms gzip-compressed .svgz outputs, not plain SVG",
+        )
+    data = gzip.decompress(data)
+    if strip_metadata:
+        data = re.sub(rb"\s*<metadata>.*?</metadata>", b"", data, flags=re.S)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def svg_gzip(
+    level: int = 9, strip_metadata: bool = True,
+) -> typing.Callable[[bytes], bytes]:
+    """Create transform recompressing ".svgz" outputs, i.e., gzip-compressed
+    SVG documents, at compression `level`.
+
+    The gzip timestamp is zeroed, so unchanged plots encode to identical
+    bytes. If `strip_metadata`, the document's `<metadata>` element is
+    dropped. Raises ValueError if applied to plain ".svg" outputs.
+    """
+    return functools.partial(
+        _svg_gzip, level=level, strip_metadata=strip_metadata,
+    )
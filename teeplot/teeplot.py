@@ -1,20 +1,48 @@
-from collections import abc, Counter
-from contextlib import contextmanager
+import atexit
+from collections import abc, Counter, OrderedDict
+from concurrent import futures
+from contextlib import contextmanager, nullcontext
+import contextvars
 import copy
 import functools
+import inspect
+import io
 import os
 import pathlib
+import pickle
+import re
+import threading
+import time
 import types
 import typing
 import warnings
 import sys
 
-from keyname import keyname as kn
 import typing_extensions as typext
-import matplotlib
-import matplotlib.pyplot as plt
-from slugify import slugify
-from strtobool import strtobool
+
+from . import (
+    __version__,
+    _cache,
+    _dedup,
+    _frames,
+    _gallery,
+    _manifest,
+    _names,
+    _replay,
+    _snapshot,
+)
+from ._archive import Archive
+from ._metrics import Metrics, PhaseEvent
+from ._pdfbook import PdfBook
+from ._registry import CollisionRegistry, FileRegistry, MemoryRegistry
+from ._sink import MemorySink
+from ._transforms import png_zlib, svg_gzip
+
+if typing.TYPE_CHECKING:
+    import matplotlib.figure
+
+# matplotlib, keyname, slugify, and strtobool are imported on first use, so
+# that importing teeplot stays cheap for planning and configuration
 
 
 def _is_running_on_ci() -> bool:
@@ -23,6 +51,86 @@ def _is_running_on_ci() -> bool:
 
 draftmode: bool = False
 
+asyncmode: bool = False
+"""Should plot saves be dispatched to background workers by default?
+
+See `teeplot_async` kwarg."""
+
+async_max_pending: int = 64
+"""Maximum number of queued background saves before `tee` blocks.
+
+Read as each save is queued, so changes take effect immediately."""
+
+manifest: bool = False
+"""Should saved plots be recorded in an index within the output directory?
+
+See `teeplot_manifest` kwarg and `teeplot.find`."""
+
+cache: bool = False
+"""Should `tee` skip plotting if outputs from identical inputs exist?
+
+See `teeplot_cache` kwarg."""
+
+cache_max_entries: typing.Optional[int] = None
+"""Maximum number of entries retained in each output directory's cache.
+
+Oldest entries are evicted first. If None, entries are never evicted
+automatically."""
+
+dedup: bool = False
+"""Should `tee` skip writing outputs identical to those on disk, and link
+outputs identical to one another?
+
+See `teeplot_dedup` kwarg and `teeplot.dedup_stats`."""
+
+snapshot: bool = False
+"""Should `tee` save a snapshot of each figure alongside its outputs, so
+further formats can be rendered from it later?
+
+See `teeplot_snapshot` kwarg and `teeplot.render_missing`."""
+
+record: bool = False
+"""Should `tee` record its calls, so plots can be re-rendered without
+recomputing their inputs?
+
+See `teeplot_record` kwarg and `teeplot.replay`."""
+
+archive: typing.Optional[str] = None
+"""Path of tar archive to store outputs in, rather than as individual files,
+by default.
+
+See `teeplot_archive` kwarg."""
+
+max_name_length: typing.Optional[int] = None
+"""Length output filenames, sans "+ext=" suffix, are capped at by default.
+
+See `teeplot_max_name_length` kwarg."""
+
+rasterize_threshold: typing.Optional[int] = None
+"""Vertex count above which lines and collections are rasterized within
+vector outputs, by default.
+
+See `teeplot_rasterize_threshold` kwarg."""
+
+autoclose: bool = False
+"""Should `tee` close figures once saved (and shown)?
+
+See `teeplot_close` kwarg."""
+
+recycle: bool = False
+"""Should `tee` plot onto cleared figures kept from prior calls, rather than
+closing figures once saved?
+
+See `teeplot_recycle` kwarg."""
+
+recycle_max_figures: int = 4
+"""Maximum number of cleared figures kept open for reuse under `recycle`."""
+
+skipmode: bool = False
+"""Should `tee` skip calling the plotter if nothing would be saved or shown?
+
+See `teeplot_skip` kwarg."""
+
 oncollision: typext.Literal[
     "error", "fix", "ignore", "warn"
 ] = os.environ.get(
@@ -41,340 +149,3000 @@ save = {
     ".png": True,
     ".ps": None,
     ".svg": None,
+    ".svgz": None,
 }
 """Global format output defaults.
 
-True enables format globally and False disables.
-None defers to teeplot_save kwarg."""
+True enables format globally and False disables.
+None defers to teeplot_save kwarg."""
+
+registry: CollisionRegistry = (
+    FileRegistry(os.environ["TEEPLOT_REGISTRY"])
+    if os.environ.get("TEEPLOT_REGISTRY")
+    else MemoryRegistry()
+)
+"""Record of saved output paths, used to detect filename collisions.
+
+Defaults to a bounded in-process registry. Use a `FileRegistry` to detect
+collisions between processes saving to a shared output directory."""
+
+hooks: typing.List[typing.Callable[[PhaseEvent], None]] = []
+"""Callables to receive a timed `PhaseEvent` for each phase of `tee`.
+
+Events for background saves are delivered from a background thread. See
+`teeplot.Metrics` for aggregation."""
+
+transforms: typing.Dict[str, typing.List[typing.Callable[[bytes], bytes]]] = {}
+"""Chains of transforms applied in order to each format's encoded bytes
+before they're written, keyed by format (e.g., ".png").
+
+Transforms run on a pool of `transform_max_workers` threads, overlapping
+encoding of other formats. Under `teeplot_async` or
+`teeplot_parallel_formats`, transforms run in the encoding worker process
+instead, so must be picklable. See `teeplot.png_zlib` and
+`teeplot.svg_gzip`."""
+
+transform_max_workers: int = os.cpu_count() or 1
+"""Maximum number of threads running `transforms`."""
+
+_format_pool = None
+_transform_pool = None
+
+_async_lock = threading.Lock()
+_async_idle = threading.Condition(_async_lock)
+_async_pending = set()
+_async_errors = []
+
+_archives = {}
+_caches = {}
+_content_stores = {}
+_content_indexed = {}  # whether outdir has dedup index, as last known
+_manifests = {}
+_name_indexes = {}
+_replay_stores = {}
+
+# output paths to use in lieu of resolving them within `tee`, for workers
+_preresolved_jobs = contextvars.ContextVar("_preresolved_jobs", default=None)
+
+# book collecting PDF outputs as pages, within `pdf_book` context
+_pdf_book = contextvars.ContextVar("_pdf_book", default=None)
+
+
+def _get_format_pool() -> "futures.ProcessPoolExecutor":
+    """Lazily create worker pool used to encode formats in parallel."""
+    global _format_pool
+    if _format_pool is None:
+        _format_pool = futures.ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            initializer=_init_worker,
+        )
+    return _format_pool
+
+
+def _get_transform_pool() -> futures.ThreadPoolExecutor:
+    """Lazily create thread pool used to apply `transforms`."""
+    global _transform_pool
+    if _transform_pool is None:
+        _transform_pool = futures.ThreadPoolExecutor(
+            max_workers=transform_max_workers,
+            thread_name_prefix="teeplot-transform",
+        )
+    return _transform_pool
+
+
+def _init_worker() -> None:
+    # workers only ever encode to file, so never need a gui backend
+    import matplotlib
+
+    matplotlib.use("agg")
+
+
+def _is_headless() -> bool:
+    """Is there no display for a gui backend to open windows on?"""
+    if sys.platform in ("darwin", "win32"):
+        return False
+    return not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+@functools.lru_cache(maxsize=None)
+def _pyplot() -> types.ModuleType:
+    """Import pyplot on first use.
+
+    If no backend has been configured (e.g., via MPLBACKEND or matplotlibrc)
+    or resolved yet and no display is available, select the non-gui agg
+    backend up front rather than letting pyplot probe gui toolkits for one.
+    """
+    import matplotlib
+    from matplotlib import rcsetup
+
+    # backend remains unresolved until pyplot first needs it
+    backend = dict.get(matplotlib.rcParams, "backend")
+    auto_backend = getattr(rcsetup, "_auto_backend_sentinel", None)
+    if backend is auto_backend and _is_headless():
+        matplotlib.use("agg")
+
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+class _FigurePickler(pickle.Pickler):
+    """Pickles figures without flagging them for re-registration with pyplot
+    when unpickled."""
+
+    def reducer_override(self, obj: typing.Any) -> typing.Any:
+        import matplotlib.figure
+
+        if isinstance(obj, matplotlib.figure.Figure):
+            func, args, state, *rest = obj.__reduce_ex__(pickle.HIGHEST_PROTOCOL)
+            state.pop("_restore_to_pylab", None)
+            return (func, args, state, *rest)
+        return NotImplemented
+
+
+def _dump_figure(fig: "matplotlib.figure.Figure") -> bytes:
+    buffer = io.BytesIO()
+    _FigurePickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(fig)
+    return buffer.getvalue()
+
+
+def _load_figure(data: bytes) -> "matplotlib.figure.Figure":
+    return pickle.loads(data)
+
+
+def _savefig(
+    fig: "matplotlib.figure.Figure",
+    fname: typing.Union[str, typing.BinaryIO],
+    ext: str,
+    *,
+    dpi: int,
+    transparent: bool,
+) -> typing.Tuple[float, float]:
+    """Save `fig` to `fname`, a path or binary file, in format `ext`,
+    returning elapsed seconds overall and within `bbox_inches='tight'`
+    layout."""
+    start = time.perf_counter()
+    layout_end = None
+    thread_id = threading.get_ident()
+
+    # layout ends with the dry-run draw `bbox_inches='tight'` makes, the
+    # first draw of this save; draws by other threads are ignored
+    def on_draw(event):
+        nonlocal layout_end
+        if layout_end is None and threading.get_ident() == thread_id:
+            layout_end = time.perf_counter()
+
+    savefig = functools.partial(
+        fig.savefig,
+        fname,
+        bbox_inches='tight',
+        format=ext[1:],
+        transparent=transparent,
+        dpi=dpi,
+        # see https://matplotlib.org/2.1.1/users/whats_new.html#reproducible-ps-pdf-and-svg-output
+        **dict(
+            metadata={
+                key: None
+                for key in {
+                    ".png": [],
+                    ".pdf": ["CreationDate"],
+                    ".svg": ["Date"],
+                    ".svgz": ["Date"],
+                }.get(ext, [])
+            },
+        ) if ext != ".pgf" else {},
+    )
+    callback_id = fig.canvas.mpl_connect("draw_event", on_draw)
+    try:
+        savefig()
+    except FileNotFoundError:
+        # output directory removed since `_makedirs` created it
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        savefig()
+    finally:
+        fig.canvas.mpl_disconnect(callback_id)
+    end = time.perf_counter()
+    return end - start, (layout_end or start) - start
+
+
+def _transform_and_write(
+    data: bytes,
+    chain: typing.Sequence[typing.Callable[[bytes], bytes]],
+    fname: str,
+    archive: typing.Optional[str] = None,
+    sink: typing.Optional[MemorySink] = None,
+    dedup: typing.Optional[str] = None,
+) -> float:
+    """Apply `chain` of transforms to encoded `data` and write the result to
+    `fname`, or store it under `fname` in `sink` or as member `fname` of
+    `archive`, returning elapsed seconds.
+
+    If `dedup`, the output directory `fname` is within, writes are
+    skipped or replaced by links where `data` is already on disk.
+    """
+    start = time.perf_counter()
+    for transform in chain:
+        data = transform(data)
+    if sink is not None:
+        sink[fname] = data
+        return time.perf_counter() - start
+    if archive is not None:
+        _get_archive(archive).append(fname, data)
+        return time.perf_counter() - start
+    if dedup is not None:
+        _get_content_store(dedup).write(fname, data)
+        return time.perf_counter() - start
+    try:
+        file = open(fname, "wb")
+    except FileNotFoundError:
+        # output directory removed since `_makedirs` created it
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        file = open(fname, "wb")
+    with file:
+        file.write(data)
+    return time.perf_counter() - start
+
+
+def _savefig_worker(
+    data: bytes,
+    rc: typing.Mapping[str, typing.Any],
+    fname: str,
+    ext: str,
+    chain: typing.Sequence[typing.Callable[[bytes], bytes]] = (),
+    archive: typing.Optional[str] = None,
+    dedup: typing.Optional[str] = None,
+    **kwargs: typing.Any,
+) -> typing.Tuple[float, float]:
+    fig = _load_figure(data)
+    with _rc_context(rc):
+        if not chain and archive is None and dedup is None:
+            return _savefig(fig, fname, ext, **kwargs)
+        buffer = io.BytesIO()
+        save_time, layout_time = _savefig(fig, buffer, ext, **kwargs)
+    save_time += _transform_and_write(
+        buffer.getvalue(), chain, fname, archive, dedup=dedup,
+    )
+    return save_time, layout_time
+
+
+def _savefig_serial(
+    fig: "matplotlib.figure.Figure",
+    jobs: typing.Sequence[typing.Tuple[str, str]],
+    on_saved: typing.Callable[[str, str, float, float], None],
+    archive: typing.Optional[str] = None,
+    sink: typing.Optional[MemorySink] = None,
+    dedup: typing.Optional[str] = None,
+    **kwargs: typing.Any,
+) -> None:
+    """Encode each `(fname, ext)` job in-process, calling `on_saved` with
+    fname, ext, and elapsed seconds overall and within layout as each
+    completes.
+
+    Formats with `transforms`, or stored in `archive` or under `dedup`, are
+    encoded into memory and transformed and written on the transform pool,
+    while later formats are encoded. Formats without `transforms` are
+    stored in `sink` as views of the encoder's buffer, without copying.
+    """
+    transforming = []
+    for fname, ext in jobs:
+        chain = transforms.get(ext, [])
+        if not chain and archive is None and sink is None and dedup is None:
+            on_saved(fname, ext, *_savefig(fig, fname, ext, **kwargs))
+            continue
+        buffer = io.BytesIO()
+        save_time, layout_time = _savefig(fig, buffer, ext, **kwargs)
+        if not chain and sink is not None:
+            sink[fname] = buffer.getbuffer()
+            on_saved(fname, ext, save_time, layout_time)
+            continue
+        future = _get_transform_pool().submit(
+            _transform_and_write,
+            buffer.getvalue(),
+            [*chain],
+            fname,
+            archive,
+            sink,
+            dedup,
+        )
+        transforming.append((fname, ext, save_time, layout_time, future))
+
+    for fname, ext, save_time, layout_time, future in transforming:
+        on_saved(fname, ext, save_time + future.result(), layout_time)
+
+
+def _savefig_parallel(
+    fig: "matplotlib.figure.Figure",
+    jobs: typing.Sequence[typing.Tuple[str, str]],
+    on_saved: typing.Callable[[str, str, float, float], None],
+    archive: typing.Optional[str] = None,
+    dedup: typing.Optional[str] = None,
+    **kwargs: typing.Any,
+) -> None:
+    """Encode each `(fname, ext)` job from a pickled copy of `fig` in a
+    worker process, calling `on_saved` as each completes.
+
+    Falls back to encoding serially in-process if `fig` can't be pickled.
+    """
+    try:
+        data = _dump_figure(fig)
+    except (AttributeError, pickle.PicklingError, TypeError) as e:
+        warnings.warn(
+            f"teeplot could not pickle figure ({e!r}), "
+            "encoding formats serially",
+        )
+        _savefig_serial(
+            fig, jobs, on_saved, archive=archive, dedup=dedup, **kwargs,
+        )
+        return
+
+    rc = _rc_snapshot()
+    pool = _get_format_pool()
+    for (fname, ext), future in [
+        (
+            job,
+            pool.submit(
+                _savefig_worker,
+                data,
+                rc,
+                *job,
+                chain=[*transforms.get(job[1], ())],
+                archive=archive,
+                dedup=dedup,
+                **kwargs,
+            ),
+        )
+        for job in jobs
+    ]:
+        on_saved(fname, ext, *future.result())
+
+
+def _thumbnail_path(out_path: str, ext: str) -> str:
+    """Path of preview saved alongside output saved to `out_path`."""
+    if out_path.endswith(f"ext={ext}"):
+        return out_path[:-len(ext)] + _names.thumbnail_ext
+    else:  # ext excluded from filename
+        return out_path + _names.thumbnail_ext
+
+
+def _save_thumbnail(
+    fig: "matplotlib.figure.Figure",
+    fname: typing.Union[str, typing.BinaryIO],
+    size: int,
+) -> None:
+    """Save PNG preview of `fig` at most `size` pixels wide and tall to
+    `fname`, a path or binary file.
+
+    Draws `fig` at figure dpi, as `plt.savefig` does after saving, and
+    downsamples the canvas buffer, rather than rendering at output dpi.
+    """
+    canvas = fig.canvas
+    if not hasattr(canvas, "buffer_rgba"):  # not agg-based, so render anew
+        fig.savefig(fname, format="png", dpi=size / max(fig.get_size_inches()))
+        return
+
+    from PIL import Image
+
+    canvas.draw()
+    buffer = canvas.buffer_rgba()
+    height, width = buffer.shape[:2]
+    image = Image.frombuffer(
+        "RGBA", (width, height), buffer, "raw", "RGBA", 0, 1,
+    )
+    image.thumbnail((size, size), reducing_gap=2.0)
+    image.save(fname, format="png")
+
+
+_vector_exts = frozenset({".eps", ".pdf", ".pgf", ".ps", ".svg", ".svgz"})
+
+
+def _num_vertices(artist: "matplotlib.artist.Artist") -> int:
+    """Count vertices drawn by line or collection `artist`."""
+    from matplotlib.collections import QuadMesh
+    from matplotlib.lines import Line2D
+
+    if isinstance(artist, Line2D):
+        return len(artist.get_xdata(orig=True))
+    elif isinstance(artist, QuadMesh):  # skip generating a path per quad
+        return artist.get_coordinates().size // 2
+    else:
+        return len(artist.get_offsets()) + sum(
+            len(path.vertices) for path in artist.get_paths()
+        )
+
+
+def _rasterize_heavy_artists(
+    fig: "matplotlib.figure.Figure", threshold: int,
+) -> typing.List["matplotlib.artist.Artist"]:
+    """Flag lines and collections within `fig` with more than `threshold`
+    vertices to be rasterized, returning artists newly flagged."""
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+
+    flagged = []
+    for artist in fig.findobj(
+        lambda artist: isinstance(artist, (Collection, Line2D))
+        and not artist.get_rasterized()
+    ):
+        if _num_vertices(artist) > threshold:
+            artist.set_rasterized(True)
+            flagged.append(artist)
+    return flagged
+
+
+def _rc_snapshot() -> typing.Dict[str, typing.Any]:
+    # workers don't inherit our rc context, so ship the active params along
+    import matplotlib
+
+    return {
+        k: v for k, v in dict.items(matplotlib.rcParams) if k != "backend"
+    }
+
+
+@contextmanager
+def _rc_context(rc: typing.Mapping[str, typing.Any]) -> typing.Iterator[None]:
+    """As `matplotlib.rc_context`, but much cheaper to enter.
+
+    Snapshots rcParams as a raw dict copy, rather than by an item-by-item
+    copy through `RcParams` accessors. As with `matplotlib.rc_context`,
+    rcParams changed within the context, other than the backend, are reset
+    on exit.
+    """
+    import matplotlib
+
+    orig = _rc_snapshot()
+    try:
+        matplotlib.rcParams.update(rc)
+        yield
+    finally:
+        dict.update(matplotlib.rcParams, orig)
+
+
+def _maybe_rc_context(
+    rc: typing.Mapping[str, typing.Any],
+) -> typing.ContextManager[None]:
+    """Apply `rc` within context, skipping rcParams snapshot if `rc` is
+    empty, in which case `tee`'s own context resets rcParams instead."""
+    return _rc_context(rc) if rc else nullcontext()
+
+
+_figure_pool = {}  # maps (width, height, dpi) to cleared, open figures
+
+
+def _figure_key(
+    size: typing.Sequence[float], dpi: float,
+) -> typing.Tuple[float, float, float]:
+    width, height = size
+    return float(width), float(height), float(dpi)
+
+
+def _acquire_figure(
+    figsize: typing.Optional[typing.Tuple[float, float]],
+) -> "matplotlib.figure.Figure":
+    """Make a cleared figure of `figsize` current, reusing a pooled figure if
+    one is available."""
+    import matplotlib
+
+    plt = _pyplot()
+    if figsize is None:
+        figsize = matplotlib.rcParams["figure.figsize"]
+    key = _figure_key(figsize, matplotlib.rcParams["figure.dpi"])
+    pooled = _figure_pool.get(key, [])
+    while pooled:
+        fig = pooled.pop()
+        if plt.fignum_exists(fig.number):  # else, closed elsewhere
+            return plt.figure(fig.number)
+    return plt.figure(figsize=figsize)
+
+
+def _release_figure(fig: "matplotlib.figure.Figure") -> None:
+    """Clear `fig` and pool it for reuse, or close it if the pool is full."""
+    plt = _pyplot()
+    for pooled in _figure_pool.values():
+        pooled[:] = [f for f in pooled if plt.fignum_exists(f.number)]
+    num_pooled = sum(map(len, _figure_pool.values()))
+    if (
+        num_pooled < recycle_max_figures
+        and plt.fignum_exists(fig.number)
+        and not any(fig in pooled for pooled in _figure_pool.values())
+    ):
+        for ax in fig.axes:  # drop without clearing, which is slow
+            fig.delaxes(ax)
+        fig.clear()
+        key = _figure_key(fig.get_size_inches(), fig.dpi)
+        _figure_pool.setdefault(key, []).append(fig)
+    else:
+        plt.close(fig)
+
+
+_made_dirs = set()
+
+
+def _makedirs(path: str) -> None:
+    """Create directory `path`, skipping the filesystem if it was already
+    created by this process.
+
+    Directories removed since being created are recreated by `_savefig`.
+    """
+    if path not in _made_dirs:
+        os.makedirs(path, exist_ok=True)
+        _made_dirs.add(path)
+
+
+def _savefig_async(
+    fig: "matplotlib.figure.Figure",
+    jobs: typing.Sequence[typing.Tuple[str, str]],
+    on_saved: typing.Callable[[str, str, float, float], None],
+    archive: typing.Optional[str] = None,
+    dedup: typing.Optional[str] = None,
+    **kwargs: typing.Any,
+) -> None:
+    """Snapshot `fig` and queue each `(fname, ext)` job for encoding by a
+    background worker process, returning immediately. `on_saved` is called
+    from a background thread as each job completes.
+
+    Blocks while `async_max_pending` saves are already queued. Falls back to
+    encoding serially in-process if `fig` can't be pickled.
+    """
+    if async_max_pending < 1:
+        raise ValueError(
+            f"async_max_pending must be at least 1, not {async_max_pending}",
+        )
+    try:
+        data = _dump_figure(fig)
+    except (AttributeError, pickle.PicklingError, TypeError) as e:
+        warnings.warn(
+            f"teeplot could not pickle figure ({e!r}), "
+            "saving synchronously",
+        )
+        _savefig_serial(
+            fig, jobs, on_saved, archive=archive, dedup=dedup, **kwargs,
+        )
+        return
+
+    rc = _rc_snapshot()
+    pool = _get_format_pool()
+
+    def on_done(fname: str, ext: str, future: futures.Future) -> None:
+        try:
+            on_saved(fname, ext, *future.result())
+        except Exception as e:
+            with _async_lock:
+                _async_errors.append(e)
+        finally:
+            with _async_lock:
+                _async_pending.discard(future)
+                _async_idle.notify_all()
+
+    for fname, ext in jobs:
+        with _async_lock:
+            # limit is read afresh, so changes apply to later saves
+            while len(_async_pending) >= async_max_pending:
+                _async_idle.wait()
+            future = pool.submit(
+                _savefig_worker,
+                data,
+                rc,
+                fname,
+                ext,
+                chain=[*transforms.get(ext, ())],
+                archive=archive,
+                dedup=dedup,
+                **kwargs,
+            )
+            _async_pending.add(future)
+        # outside lock, as callback runs immediately if already done
+        future.add_done_callback(functools.partial(on_done, fname, ext))
+
+
+def _emit(
+    phase: str,
+    duration: float,
+    attrs: typing.Dict[str, typing.Any],
+    ext: typing.Optional[str] = None,
+    path: typing.Optional[str] = None,
+    nbytes: typing.Optional[int] = None,
+) -> None:
+    """Deliver phase event to each of `hooks`."""
+    event = PhaseEvent(phase, duration, attrs, ext, path, nbytes)
+    for hook in hooks:
+        hook(event)
+
+
+def _raise_async_errors() -> None:
+    """Re-raise the first error from a background save, if any occurred."""
+    with _async_lock:
+        errors = [*_async_errors]
+        _async_errors.clear()
+    if errors:
+        raise errors[0]
+
+
+def wait(timeout: typing.Optional[float] = None) -> bool:
+    """Block until all queued background saves have completed.
+
+    Parameters
+    ----------
+    timeout : float, optional
+        Maximum number of seconds to wait. Waits indefinitely if None.
+
+    Returns
+    -------
+    bool
+        True if all queued saves completed, False if `timeout` expired first.
+
+    Notes
+    -----
+    Errors from background saves are not raised; they are deferred to the
+    next call to `flush` or `tee`.
+    """
+    with _async_idle:
+        return _async_idle.wait_for(lambda: not _async_pending, timeout)
+
+
+def flush() -> None:
+    """Block until all queued background saves have been written, then
+    re-raise the first error encountered by any of them."""
+    wait()
+    _raise_async_errors()
+
+
+@atexit.register
+def _drain_async() -> None:
+    wait()
+    with _async_lock:
+        errors = [*_async_errors]
+        _async_errors.clear()
+    for error in errors:
+        warnings.warn(f"teeplot background save failed: {error!r}")
+
+
+def _get_cache(outdir: str) -> _cache.PlotCache:
+    key = os.path.abspath(outdir)
+    if key not in _caches:
+        _caches[key] = _cache.PlotCache(outdir)
+    return _caches[key]
+
+
+def _cache_key(
+    plotter: typing.Callable[..., typing.Any],
+    args: typing.Sequence[typing.Any],
+    kwargs: typing.Mapping[str, typing.Any],
+    teeplot_outattrs: typing.Mapping[str, typing.Any],
+    teeplot_postprocess: typing.Union[str, typing.Callable],
+    **options: typing.Any,
+) -> str:
+    """Fingerprint everything that affects plot output.
+
+    Raises `_cache.Unfingerprintable` if arguments can't be fingerprinted.
+    If `_datafordigest` is provided among `teeplot_outattrs`, it vouches for
+    plotted data so that otherwise opaque arguments are fingerprinted by type
+    alone.
+    """
+    import matplotlib
+
+    return _cache.fingerprint(
+        dict(
+            args=args,
+            kwargs=kwargs,
+            matplotlib=matplotlib.__version__,
+            options=options,
+            outattrs=teeplot_outattrs,
+            plotter=plotter,
+            postprocess=teeplot_postprocess,
+            rc={k: repr(v) for k, v in _rc_snapshot().items()},
+            teeplot=__version__,
+        ),
+        opaque_ok="_datafordigest" in teeplot_outattrs,
+    )
+
+
+def _get_archive(path: str) -> Archive:
+    key = os.path.abspath(path)
+    if key not in _archives:
+        _archives[key] = Archive(path)
+    return _archives[key]
+
+
+def _get_content_store(outdir: str) -> _dedup.ContentStore:
+    key = os.path.abspath(outdir)
+    if key not in _content_stores:
+        _content_stores[key] = _dedup.ContentStore(outdir)
+        _content_indexed[key] = True
+    return _content_stores[key]
+
+
+def _has_content_store(outdir: str) -> bool:
+    """Has dedup been used within `outdir`, by this process or by others
+    before this process first checked?
+
+    The filesystem is checked once per output directory, keeping it off the
+    path of plain saves.
+    """
+    key = os.path.abspath(outdir)
+    if key not in _content_indexed:
+        _content_indexed[key] = os.path.exists(
+            os.path.join(outdir, _dedup.ContentStore.filename),
+        )
+    return _content_indexed[key]
+
+
+def _get_manifest(outdir: str) -> _manifest.Manifest:
+    key = os.path.abspath(outdir)
+    if key not in _manifests:
+        _manifests[key] = _manifest.Manifest(outdir)
+    return _manifests[key]
+
+
+def _get_name_index(outdir: str) -> _names.NameIndex:
+    key = os.path.abspath(outdir)
+    if key not in _name_indexes:
+        _name_indexes[key] = _names.NameIndex(outdir)
+    return _name_indexes[key]
+
+
+def _get_replay_store(outdir: str) -> _replay.ReplayStore:
+    key = os.path.abspath(outdir)
+    if key not in _replay_stores:
+        _replay_stores[key] = _replay.ReplayStore(outdir)
+    return _replay_stores[key]
+
+
+def find(
+    teeplot_outdir: str = "teeplots", **attrs: typing.Any,
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Look up plots saved to `teeplot_outdir` with matching attrs.
+
+    Queries the index recorded under `teeplot_manifest`, rather than listing
+    the output directory.
+
+    Parameters
+    ----------
+    teeplot_outdir : str, default "teeplots"
+        Base directory plots were saved to.
+    **attrs : Any
+        Attribute values to match, as they appear in output filenames (e.g.,
+        `viz="lineplot"`, `ext=".png"`). Attributes excluded from filenames
+        via `teeplot_outexclude` can also be matched.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        Index entries for matching plots, oldest first. Each holds "attrs",
+        "bytes", "ext", "path", "render_time", "save_time", and "timestamp"
+        fields. If a path was saved more than once, only its newest entry is
+        returned.
+    """
+    return _get_manifest(teeplot_outdir).find(**attrs)
+
+
+def dedup_stats(teeplot_outdir: str = "teeplots") -> typing.Dict[str, int]:
+    """Tally outputs saved to `teeplot_outdir` under `teeplot_dedup`.
+
+    Parameters
+    ----------
+    teeplot_outdir : str, default "teeplots"
+        Base directory plots were saved to.
+
+    Returns
+    -------
+    Dict[str, int]
+        Counts of outputs "written", left "unchanged" as identical to the
+        file already on disk, and "linked" to an identical output, with
+        "bytes_written" and "bytes_avoided" totals. Counts accumulate across
+        processes and runs.
+    """
+    return _get_content_store(teeplot_outdir).stats()
+
+
+def lookup_attrs(
+    path: str, teeplot_outdir: str = "teeplots",
+) -> typing.Dict[str, str]:
+    """Get full attrs of output saved to `path`, including any shortened
+    under `teeplot_max_name_length`.
+
+    Parameters
+    ----------
+    path : str
+        Path, or filename, of output.
+    teeplot_outdir : str, default "teeplots"
+        Base directory plot was saved to, holding index of shortened names.
+
+    Returns
+    -------
+    Dict[str, str]
+        Attrs of plot, including "ext", as indexed if the filename was
+        shortened, or otherwise as parsed from the filename.
+    """
+    from keyname import keyname as kn
+
+    filename = os.path.basename(path)
+    stem, ext = _names.split_ext(filename)
+    attrs = _get_name_index(teeplot_outdir).lookup(stem)
+    if attrs is None:
+        attrs = kn.unpack(filename)
+        attrs.pop("_", None)
+        return attrs
+    return {**attrs, "ext": ext}
+
+
+def contact_sheet(
+    teeplot_outdir: str = "teeplots",
+    path: typing.Optional[str] = None,
+    title: str = "teeplots",
+) -> str:
+    """Write HTML gallery of plots saved within `teeplot_outdir`.
+
+    Each plot is shown by its ".thumb.png" preview, if saved under
+    `teeplot_thumbnail`, or otherwise by a full-resolution image, and links
+    to all its saved formats. The page is written while walking the output
+    directory, without reading any images.
+
+    Parameters
+    ----------
+    teeplot_outdir : str, default "teeplots"
+        Base directory plots were saved to.
+    path : Optional[str], optional
+        Where to write the page. If default, "index.html" within
+        `teeplot_outdir`.
+    title : str, default "teeplots"
+        Page title.
+
+    Returns
+    -------
+    str
+        Path of page written.
+    """
+    if path is None:
+        path = os.path.join(teeplot_outdir, "index.html")
+    _gallery.write_contact_sheet(teeplot_outdir, path, title)
+    return path
+
+
+@contextmanager
+def pdf_book(
+    path: str,
+    metadata: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+) -> typing.Iterator[PdfBook]:
+    """Collect PDF outputs of `tee` calls within context as pages of a
+    single document, rather than as individual files.
+
+    Other formats are saved as usual. Each page is titled by its plot's
+    output filename, sans extension, in the document outline. Fonts shared
+    between pages are embedded once, when the document is written upon
+    exiting the context.
+
+    Parameters
+    ----------
+    path : str
+        Where to write the document.
+    metadata : Optional[Mapping[str, Any]], optional
+        Document information, e.g., "Title" or "Author". See
+        `matplotlib.backends.backend_pdf.PdfPages`.
+
+    Yields
+    ------
+    PdfBook
+        Document pages are added to.
+    """
+    dirname = os.path.dirname(path)
+    if dirname:
+        _makedirs(dirname)
+    book = PdfBook(path, metadata=metadata)
+    token = _pdf_book.set(book)
+    try:
+        yield book
+    finally:
+        _pdf_book.reset(token)
+        with _rc_context({"pdf.fonttype": 42}):  # as pages were drawn by tee
+            book.close()
+
+
+def cache_clear(teeplot_outdir: str = "teeplots") -> None:
+    """Forget all cached outputs in `teeplot_outdir`, so that subsequent `tee`
+    calls re-plot.
+
+    Output files themselves are not removed.
+    """
+    _get_cache(teeplot_outdir).clear()
+
+
+def cache_evict(
+    teeplot_outdir: str = "teeplots",
+    max_entries: typing.Optional[int] = None,
+    max_age: typing.Optional[float] = None,
+) -> int:
+    """Forget oldest cached outputs in `teeplot_outdir`.
+
+    Parameters
+    ----------
+    teeplot_outdir : str, default "teeplots"
+        Output directory whose cache to evict from.
+    max_entries : int, optional
+        Retain at most this many most recently written entries.
+    max_age : float, optional
+        Forget entries written more than this many seconds ago.
+
+    Returns
+    -------
+    int
+        Number of entries evicted.
+    """
+    return _get_cache(teeplot_outdir).evict(
+        max_entries=max_entries, max_age=max_age,
+    )
+
+
+class _Config(typing.NamedTuple):
+    """Module-level settings, with environment variable overrides applied."""
+
+    formats: typing.Dict[str, typing.Optional[bool]]
+    draftmode: bool
+    asyncmode: bool
+    cache: bool
+    manifest: bool
+    skipmode: bool
+    autoclose: bool
+    recycle: bool
+    archive: typing.Optional[str]
+    dedup: bool
+    record: bool
+    snapshot: bool
+
+
+_config_snapshot = None  # as (inputs, _Config) tuple
+
+
+def _get_config() -> _Config:
+    """Resolve module-level settings and environment variable overrides,
+    reusing the previous resolution if none have changed."""
+    global _config_snapshot
+    inputs = (
+        tuple(save.items()),
+        draftmode,
+        asyncmode,
+        cache,
+        manifest,
+        skipmode,
+        autoclose,
+        recycle,
+        archive,
+        dedup,
+        record,
+        snapshot,
+        tuple(map(os.environ.get, _config_env_vars(tuple(save)))),
+    )
+    if _config_snapshot is None or _config_snapshot[0] != inputs:
+        _config_snapshot = inputs, _resolve_config()
+    return _config_snapshot[1]
+
+
+@functools.lru_cache(maxsize=None)
+def _config_env_vars(formats: typing.Tuple[str, ...]) -> typing.Tuple[str, ...]:
+    return (
+        "TEEPLOT_ASYNCMODE",
+        "TEEPLOT_CACHE",
+        "TEEPLOT_DRAFTMODE",
+        "TEEPLOT_MANIFEST",
+        "TEEPLOT_SKIPMODE",
+        "TEEPLOT_AUTOCLOSE",
+        "TEEPLOT_RECYCLE",
+        "TEEPLOT_ARCHIVE",
+        "TEEPLOT_DEDUP",
+        "TEEPLOT_RECORD",
+        "TEEPLOT_SNAPSHOT",
+        *(f"TEEPLOT_{format[1:].upper()}" for format in formats),
+    )
+
+
+def _resolve_config() -> _Config:
+    from strtobool import strtobool
+
+    formats = copy.copy(save)
+
+    # incorporate environment variable settings
+    for format in [*formats]:
+        format_env_var = f"TEEPLOT_{format[1:].upper()}"
+        if format_env_var in os.environ:  # strip leading .
+            format_env_value = os.environ[format_env_var]
+            if format_env_value.lower() in ("none", "defer"):
+                formats[format] = None
+            else:
+                formats[format] = strtobool(format_env_value)
+
+    return _Config(
+        formats=formats,
+        draftmode=bool(
+            strtobool(os.environ.get("TEEPLOT_DRAFTMODE", "F")) or draftmode,
+        ),
+        asyncmode=bool(
+            asyncmode or strtobool(os.environ.get("TEEPLOT_ASYNCMODE", "F")),
+        ),
+        cache=bool(cache or strtobool(os.environ.get("TEEPLOT_CACHE", "F"))),
+        manifest=bool(
+            manifest or strtobool(os.environ.get("TEEPLOT_MANIFEST", "F")),
+        ),
+        skipmode=bool(
+            skipmode or strtobool(os.environ.get("TEEPLOT_SKIPMODE", "F")),
+        ),
+        autoclose=bool(
+            autoclose or strtobool(os.environ.get("TEEPLOT_AUTOCLOSE", "F")),
+        ),
+        recycle=bool(
+            recycle or strtobool(os.environ.get("TEEPLOT_RECYCLE", "F")),
+        ),
+        archive=archive or os.environ.get("TEEPLOT_ARCHIVE") or None,
+        dedup=bool(dedup or strtobool(os.environ.get("TEEPLOT_DEDUP", "F"))),
+        record=bool(
+            record or strtobool(os.environ.get("TEEPLOT_RECORD", "F")),
+        ),
+        snapshot=bool(
+            snapshot or strtobool(os.environ.get("TEEPLOT_SNAPSHOT", "F")),
+        ),
+    )
+
+
+def _resolve_save(
+    teeplot_save: typing.Union[str, typing.Iterable[str], bool, None],
+    teeplot_verbose: bool,
+) -> typing.Set[str]:
+    """Determine which formats to save, accounting for module-level and
+    environment variable settings."""
+    config = _get_config()
+    formats = config.formats
+
+    if teeplot_save is False or config.draftmode:
+        # remove all outputs
+        teeplot_save = set()
+    elif teeplot_save is None or teeplot_save is True:
+        # default formats
+        teeplot_save = set(filter(formats.__getitem__, formats))
+    elif isinstance(teeplot_save, str):
+        if not teeplot_save in formats:
+            raise ValueError(
+                f"only {[*formats]} save formats are supported, "
+                f"not {teeplot_save}",
+            )
+        # remove explicitly disabled outputs
+        blacklist = set(k for k, v in formats.items() if v is False)
+        exclusions =  {teeplot_save} & blacklist
+        if teeplot_verbose and exclusions:
+            print(f"skipping {exclusions}")
+        teeplot_save = {teeplot_save} - exclusions
+
+    elif isinstance(teeplot_save, abc.Iterable):
+        if not {*teeplot_save} <= {*formats}:
+            raise ValueError(
+                f"only {[*formats]} save formats are supported, "
+                f"not {list({*teeplot_save} - {*formats})}",
+            )
+        # remove explicitly disabled outputs
+        blacklist = set(k for k, v in formats.items() if v is False)
+        exclusions =  set(teeplot_save) & blacklist
+        if teeplot_verbose and exclusions:
+            print(f"skipping {exclusions}")
+        teeplot_save = set(teeplot_save) - exclusions
+    else:
+        raise TypeError(
+            "teeplot_save kwarg must be str, bool, or iterable, "
+            f"not {type(teeplot_save)} {teeplot_save}",
+        )
+
+    return teeplot_save
+
+
+# in order of preference, teed= then ax= then no args then positional, as
+# arguments to bind against signature and invocation given postprocess, teed
+_postprocess_conventions = (
+    ((), {"teed": None}, lambda postprocess, teed: postprocess(teed=teed)),
+    ((), {"ax": None}, lambda postprocess, teed: postprocess(ax=teed)),
+    ((), {}, lambda postprocess, teed: postprocess()),
+    ((None,), {}, lambda postprocess, teed: postprocess(teed)),
+)
+
+_postprocess_convention_cache: typing.OrderedDict[
+    tuple, typing.Callable[[typing.Callable, typing.Any], typing.Any],
+] = OrderedDict()
+"""Resolved calling conventions of postprocess functions, keyed by what
+determines their signature rather than by function, so that cached entries
+don't keep lambdas and closures (or what they capture) alive.
+
+Least recently used entries are evicted beyond 256 entries."""
+
+
+def _resolve_postprocess_convention(
+    postprocess: typing.Callable[..., typing.Any],
+) -> typing.Callable[[typing.Callable, typing.Any], typing.Any]:
+    try:
+        signature = inspect.signature(postprocess)
+    except (TypeError, ValueError):  # e.g., some builtins
+        return _postprocess_conventions[-1][-1]
+
+    for bind_args, bind_kwargs, invoke in _postprocess_conventions:
+        try:
+            signature.bind(*bind_args, **bind_kwargs)
+        except TypeError:
+            continue
+        return invoke
+
+    raise TypeError(
+        f"teeplot_postprocess={postprocess} call signature incompatible with "
+        "supported invocations, teed=, ax=, no args, or one positional arg",
+    )
+
+
+def _postprocess_convention_key(
+    postprocess: typing.Callable[..., typing.Any],
+) -> typing.Optional[tuple]:
+    """Get what determines signature of plain or bound Python function
+    `postprocess`, as its code, which of its parameters have defaults, and
+    whether it is bound, or None for other callables."""
+    bound = isinstance(postprocess, types.MethodType)
+    func = postprocess.__func__ if bound else postprocess
+    if not isinstance(func, types.FunctionType) or (
+        # signature overridden, e.g., by functools.wraps
+        "__wrapped__" in vars(func) or "__signature__" in vars(func)
+    ):
+        return None
+    return (
+        func.__code__,
+        len(func.__defaults__ or ()),
+        frozenset(func.__kwdefaults__ or ()),
+        bound,
+    )
+
+
+def _postprocess_invoker(
+    postprocess: typing.Callable[..., typing.Any],
+) -> typing.Callable[[typing.Any], typing.Any]:
+    """Get function calling `postprocess` with plotter result `teed`.
+
+    Calling convention is resolved from its signature, once per function
+    definition, so postprocess runs exactly once and TypeErrors it raises
+    propagate.
+    """
+    key = _postprocess_convention_key(postprocess)
+    cache = _postprocess_convention_cache
+    if key is None:
+        invoke = _resolve_postprocess_convention(postprocess)
+    else:
+        invoke = cache.pop(key, None)  # reinserted as most recently used
+        if invoke is None:
+            invoke = _resolve_postprocess_convention(postprocess)
+        cache[key] = invoke
+        if len(cache) > 256:  # evict least recently used
+            cache.popitem(last=False)
+    return lambda teed: invoke(postprocess, teed)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_postprocess(source: str) -> types.CodeType:
+    """Compile string `teeplot_postprocess`, once per distinct source."""
+    return compile(source, "<teeplot_postprocess>", "exec")
+
+
+def _exec_postprocess(
+    source: str, names: typing.Mapping[str, typing.Any],
+) -> None:
+    """Run string `teeplot_postprocess` with module globals, overlaid by
+    `names` and seaborn, as a single namespace, so that nested scopes within
+    it (e.g., comprehensions) see them too."""
+    exec(
+        _compile_postprocess(source),
+        {**globals(), **names, **_seaborn_names()},
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _seaborn_names() -> typing.Dict[str, types.ModuleType]:
+    """Names seaborn is available under in string `teeplot_postprocess`, if
+    installed."""
+    try:
+        import seaborn
+    except ModuleNotFoundError:
+        return {}
+    return {"sns": seaborn, "seaborn": seaborn}
+
+
+# text slugify would leave unchanged
+_slug_pattern = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*\Z")
+
+
+@functools.lru_cache(maxsize=2 ** 16)
+def _slugify_uncommon(text: str) -> str:
+    from slugify import slugify
+
+    return slugify(text)
+
+
+def _slugify(text: str) -> str:
+    # skip slugify, and cache churn, for text already a slug, e.g., most
+    # kwarg names and many per-call values
+    if _slug_pattern.match(text):
+        return text
+    return _slugify_uncommon(text)
+
+
+def _make_namer_factory(
+    plotter: typing.Callable[..., typing.Any],
+    teeplot_outattrs: typing.Mapping[str, typing.Any],
+    teeplot_outexclude: typing.Iterable[str],
+    teeplot_outinclude: typing.Iterable[str],
+    teeplot_postprocess: typing.Union[str, typing.Callable],
+    teeplot_max_name_length: typing.Optional[int] = None,
+) -> typing.Callable[
+    [typing.Mapping[str, typing.Any]],
+    typing.Tuple[
+        typing.Callable[[str], typing.Dict[str, typing.Any]],
+        typing.Callable[[str], str],
+    ],
+]:
+    """Create function mapping plotter kwargs to output attr and filename
+    functions, as `_make_namers`, with work shared between calls done once
+    up front."""
+    if isinstance(teeplot_outinclude, str):
+        teeplot_outinclude = [teeplot_outinclude]
+    if isinstance(teeplot_outexclude, str):
+        teeplot_outexclude = [teeplot_outexclude]
+
+    incl = {*teeplot_outinclude}
+    excl = {*teeplot_outexclude}
+    static_attrs = {
+        **{
+            'viz' : _slugify(plotter.__name__),
+            'ext' : None,
+        },
+        **(
+            {"post": teeplot_postprocess.__name__}
+            if teeplot_postprocess and isinstance(teeplot_postprocess, abc.Callable)
+            else {"post": _slugify(teeplot_postprocess)}
+            if teeplot_postprocess and not teeplot_postprocess.endswith(";")
+            else {}
+        ),
+        **teeplot_outattrs,
+    }
+    fixed_ext = 'ext' in teeplot_outattrs
+    if teeplot_max_name_length is None:
+        teeplot_max_name_length = max_name_length
+
+    layouts = {}  # by names of kwargs within attrs
+
+    def make_layout(
+        keys: typing.Tuple[str, ...],
+    ) -> typing.Tuple[typing.List[str], typing.List[str], str, typing.List[int]]:
+        """Plan attrs and output filename stem for kwargs named `keys`.
+
+        Returns attr names of `keys`, names of attrs within stem in order,
+        stem as format string with fields for kwarg values, and indices of
+        kwarg values filling fields.
+        """
+        slug_keys = [*map(_slugify, keys)]
+        # later kwargs, then static attrs, take precedence
+        positions = {k: i for i, k in enumerate(slug_keys)}
+        named_keys = sorted(
+            k
+            for k in {**positions, **static_attrs}
+            if k != 'ext' and not k.startswith('_') and not k in excl
+        )
+        escape = lambda text: text.replace("{", "{{").replace("}", "}}")
+        template = '+'.join(
+            escape(f"{k}={static_attrs[k]!s}")
+            if k in static_attrs
+            else f"{escape(k)}={{}}"
+            for k in named_keys
+        )
+        fields = [positions[k] for k in named_keys if k not in static_attrs]
+        # no '=' or '+' within keys or values, which are slugs if not static
+        stem = template.format(*("" for __ in fields))
+        assert stem.count('=') == len(named_keys)
+        assert stem.count('+') == max(len(named_keys) - 1, 0)
+        return slug_keys, named_keys, template, fields
+
+    def make_namers(
+        kwargs: typing.Mapping[str, typing.Any],
+    ) -> typing.Tuple[
+        typing.Callable[[str], typing.Dict[str, typing.Any]],
+        typing.Callable[[str], str],
+    ]:
+        keys = tuple(
+            [k for k, v in kwargs.items() if isinstance(v, str) or k in incl]
+        )
+        if keys not in layouts:
+            layouts[keys] = make_layout(keys)
+        slug_keys, named_keys, template, fields = layouts[keys]
+        values = [_slugify(str(kwargs[k])) for k in keys]
+        base_attrs = lambda: {**dict(zip(slug_keys, values)), **static_attrs}
+        attr_maker = lambda ext: (
+            base_attrs() if fixed_ext else {**base_attrs(), 'ext': ext}
+        )
+
+        # pack attrs once, as only ext differs between formats
+        # equivalent to kn.pack, which is comparatively slow, given that
+        # underscore-prefixed keys are excluded and ext is always last
+        stem = template.format(*[values[i] for i in fields])
+        if (
+            teeplot_max_name_length is not None
+            and len(stem) > teeplot_max_name_length
+        ):
+            attrs = base_attrs()
+            stem = _names.shorten(
+                {k: str(attrs[k]) for k in named_keys},
+                teeplot_max_name_length,
+            )
+        if 'ext' in excl:
+            out_filenamer = lambda ext: stem
+        elif fixed_ext:
+            filename = "+".join(filter(None, (stem, f"ext={static_attrs['ext']}")))
+            out_filenamer = lambda ext: filename
+        elif stem:
+            out_filenamer = lambda ext: f"{stem}+ext={ext}"
+        else:
+            out_filenamer = lambda ext: f"ext={ext}"
+
+        return attr_maker, out_filenamer
+
+    return make_namers
+
+
+def _make_namers(
+    plotter: typing.Callable[..., typing.Any],
+    kwargs: typing.Mapping[str, typing.Any],
+    teeplot_outattrs: typing.Mapping[str, typing.Any],
+    teeplot_outexclude: typing.Iterable[str],
+    teeplot_outinclude: typing.Iterable[str],
+    teeplot_postprocess: typing.Union[str, typing.Callable],
+    teeplot_max_name_length: typing.Optional[int] = None,
+) -> typing.Tuple[
+    typing.Callable[[str], typing.Dict[str, typing.Any]],
+    typing.Callable[[str], str],
+]:
+    """Create functions mapping format extension to output attrs and output
+    filename."""
+    return _make_namer_factory(
+        plotter,
+        teeplot_outattrs=teeplot_outattrs,
+        teeplot_outexclude=teeplot_outexclude,
+        teeplot_outinclude=teeplot_outinclude,
+        teeplot_postprocess=teeplot_postprocess,
+        teeplot_max_name_length=teeplot_max_name_length,
+    )(kwargs)
+
+
+def _make_pather(
+    out_folder: pathlib.Path, mkdir: bool,
+) -> typing.Callable[[str], str]:
+    """Create function mapping output filename to its path within
+    `out_folder`, chopped into subdirectories as by `kn.chop`.
+
+    Filenames short enough not to need chopping skip `kn.chop`, which is
+    comparatively slow, and land directly in `out_folder`, which the caller
+    is responsible for creating.
+    """
+    chunk_size = int(os.environ.get("KEYNAME_CHOP_CHUNK_SIZE", 200))
+    altsep = os.altsep or os.sep
+
+    def slow_pather(filename: str) -> str:
+        from keyname import keyname as kn
+
+        return kn.chop(str(out_folder / filename), mkdir=mkdir)
+
+    if chunk_size <= 1 or any(
+        len(part) > chunk_size for part in out_folder.parts
+    ):
+        return slow_pather
+
+    prefix = str(out_folder / "_")[:-1]  # handles out_folder "."
+    return lambda filename: (
+        prefix + filename
+        if 0 < len(filename) <= chunk_size
+        and os.sep not in filename
+        and altsep not in filename
+        else slow_pather(filename)
+    )
+
+
+def _handle_collision(
+    out_path: str, ext: str, count: int, teeplot_oncollision: str,
+) -> str:
+    """Apply `teeplot_oncollision` strategy to an output path previously
+    saved to `count` times, returning path to save to."""
+    if teeplot_oncollision == "error":
+        raise RuntimeError(f"teeplot already created file {out_path}")
+    elif teeplot_oncollision == "fix":
+        suffix = f"ext={ext}"
+        assert out_path.endswith(suffix)
+        return out_path[:-len(suffix)] + f"#={count}+" + suffix
+    elif teeplot_oncollision == "ignore":
+        return out_path
+    elif teeplot_oncollision == "warn":
+        warnings.warn(
+            f"teeplot already created file {out_path}, overwriting it",
+        )
+        return out_path
+    else:
+        raise ValueError(
+            "teeplot_oncollision must be one of 'error', 'fix', "
+            f"'ignore', or 'warn', not {teeplot_oncollision}",
+        )
+
+
+def _resolve_jobs(
+    out_folder: pathlib.Path,
+    out_filenamer: typing.Callable[[str], str],
+    teeplot_oncollision: str,
+    teeplot_save: typing.Set[str],
+    teeplot_verbose: bool,
+    mkdir: bool = True,
+    claim: bool = True,
+) -> typing.List[typing.Tuple[str, str]]:
+    """Determine `(path, ext)` of each output, registering paths and handling
+    collisions.
+
+    If not `claim`, paths are neither registered nor checked for collisions.
+    """
+    pather = _make_pather(out_folder, mkdir=mkdir)
+    jobs = []
+    for ext in save:
+
+        if ext not in teeplot_save:
+            if teeplot_verbose > 1:
+                print(f"skipping {ext}")
+            continue
+
+        out_path = pather(out_filenamer(ext))
+        count = registry.claim(out_path) if claim else 0
+        if count:
+            out_path = _handle_collision(
+                out_path, ext, count, teeplot_oncollision,
+            )
+
+        if teeplot_verbose:
+            print(out_path)
+        jobs.append((out_path, ext))
+    return jobs
+
+
+class SkippedPlot:
+    """Stand-in for plotter return value when `tee` skips plotting.
+
+    Attribute access, calls, and indexing return the stand-in itself, so
+    method chains like `tee(...).set_title("...")` are no-ops. Iterates as
+    empty and is falsy, so tuple unpacking (e.g., `fig, ax = tee(...)`) is
+    not supported.
+    """
+
+    def __getattr__(self, name: str) -> "SkippedPlot":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self
+
+    def __call__(self, *args: typing.Any, **kwargs: typing.Any) -> "SkippedPlot":
+        return self
+
+    def __getitem__(self, key: typing.Any) -> "SkippedPlot":
+        return self
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        return iter(())
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "<teeplot skipped plot>"
+
+
+_skipped_plot = SkippedPlot()
+
+
+# enable TrueType fonts
+# see https://gecco-2021.sigevo.org/Paper-Submission-Instructions
+@_rc_context(
+    {
+        'pdf.fonttype': 42,
+        'ps.fonttype': 42,
+    },
+)
+def tee(
+    plotter: typing.Callable[..., typing.Any],
+    *args: typing.Any,
+    teeplot_archive: typing.Optional[str] = None,
+    teeplot_async: typing.Optional[bool] = None,
+    teeplot_cache: typing.Optional[bool] = None,
+    teeplot_callback: bool = False,
+    teeplot_close: typing.Optional[bool] = None,
+    teeplot_dedup: typing.Optional[bool] = None,
+    teeplot_dpi: int = 300,
+    teeplot_figsize: typing.Optional[typing.Tuple[float, float]] = None,
+    teeplot_manifest: typing.Optional[bool] = None,
+    teeplot_max_name_length: typing.Optional[int] = None,
+    teeplot_oncollision: typing.Optional[
+        typext.Literal["error", "fix", "ignore", "warn"]] = None,
+    teeplot_outattrs: typing.Mapping[str, str] = types.MappingProxyType({}),
+    teeplot_outdir: str = "teeplots",
+    teeplot_outinclude: typing.Iterable[str] = tuple(),
+    teeplot_outexclude: typing.Iterable[str] = tuple(),
+    teeplot_parallel_formats: bool = False,
+    teeplot_postprocess: typing.Union[str, typing.Callable] = "",
+    teeplot_rc_context: typing.Mapping[str, typing.Any] = types.MappingProxyType({}),
+    teeplot_rasterize_threshold: typing.Optional[int] = None,
+    teeplot_record: typing.Optional[bool] = None,
+    teeplot_recycle: typing.Optional[bool] = None,
+    teeplot_save: typing.Union[typing.Iterable[str], bool] = True,
+    teeplot_show: typing.Optional[bool] = None,
+    teeplot_sink: typing.Optional[MemorySink] = None,
+    teeplot_skip: typing.Optional[bool] = None,
+    teeplot_snapshot: typing.Optional[bool] = None,
+    teeplot_subdir: str = '',
+    teeplot_thumbnail: typing.Optional[int] = None,
+    teeplot_transparent: bool = True,
+    teeplot_verbose: bool = True,
+    **kwargs: typing.Any
+) -> typing.Any:
+    """Executes a plotting function and saves the resulting plot to specified
+    formats using a descriptive filename automatically generated from plotting
+    function arguments.
+
+    Parameters
+    ----------
+    plotter : Callable[..., Any]
+        The plotting function to execute.
+    *args : Any
+        Positional arguments forwarded to the plotting function.
+    teeplot_archive : Optional[str], optional
+        Path of tar archive to store outputs in, as members named by the
+        paths they would otherwise be saved to, rather than as individual
+        files.
+
+        Avoids creating a file per plot per format, e.g., on filesystems with
+        inode quotas. Appends from concurrent processes are safe. See
+        `teeplot.Archive` for reading archived outputs and `python -m teeplot
+        extract` for unpacking them. If default, use module-level `archive`
+        config or `TEEPLOT_ARCHIVE` environment variable.
+    teeplot_async : Optional[bool], optional
+        Should plot save be dispatched to a background worker process?
+
+        If True, a snapshot of the figure is queued for encoding and writing
+        and `tee` returns without waiting for files to be written. Use `flush`
+        or `wait` to block until queued saves complete. Errors from background
+        saves are raised by the next call to `flush` or `tee`. If default,
+        defers to module-level `asyncmode` and `TEEPLOT_ASYNCMODE` env var.
+    teeplot_cache : Optional[bool], optional
+        Should plotting be skipped if outputs already exist from a prior call
+        with identical inputs?
+
+        Inputs are fingerprinted from plotter, args, kwargs, teeplot options,
+        `teeplot_postprocess`, rcParams, and teeplot and matplotlib versions.
+        Functions are fingerprinted by name, bytecode, defaults, and closure
+        cell contents, but not by module globals they refer to.
+        Fingerprints are recorded in a cache file within `teeplot_outdir`. On
+        a hit, neither the plotter nor save is run, output paths aren't
+        registered, and a `teeplot.SkippedPlot` stand-in is returned. Calls
+        with arguments that can't be fingerprinted are never cached, unless a
+        `_datafordigest` entry in `teeplot_outattrs` identifies plotted data.
+        Not applied under `teeplot_callback`, as later tweaks to the plot can't
+        be fingerprinted. If default, defers to module-level `cache` and
+        `TEEPLOT_CACHE` env var.
+    teeplot_callback : bool, default False
+        If True, return a tuple with callback to dispatch plot save instead of
+        immediately saving plot after running plotter.
+    teeplot_close : Optional[bool], optional
+        Should the figure be closed once saved (and shown)?
+
+        Closing keeps pyplot from accumulating open figures over repeated
+        calls. If default, use module-level `autoclose` config or
+        `TEEPLOT_AUTOCLOSE` environment variable.
+    teeplot_dedup : Optional[bool], optional
+        Should outputs be hashed once encoded, to skip rewriting files whose
+        bytes are unchanged and to link outputs identical to one another?
+
+        Unchanged files keep their mtimes, so don't retrigger downstream
+        build rules or syncs. Outputs identical to another output within
+        `teeplot_outdir` are created as a reflink of it where supported, or
+        otherwise a hard link. See `teeplot.dedup_stats` for bytes avoided.
+        If default, use module-level `dedup` config or `TEEPLOT_DEDUP`
+        environment variable.
+    teeplot_dpi : int, default 300
+        Resolution for rasterized components of the saved plot in dots per inch.
+
+        Default is publication-quality 300 dpi.
+    teeplot_figsize : Tuple[float, float], optional
+        Size of the saved plot in inches as (width, height).
+
+        If provided, the current figure is resized after the plotter runs.
+    teeplot_manifest : Optional[bool], optional
+        Should saved files be recorded in an index within `teeplot_outdir`?
+
+        Entries hold filename attrs, format, path, size in bytes, render and
+        save times, and a timestamp, and can be queried with `teeplot.find`. If
+        default, defers to module-level `manifest` and `TEEPLOT_MANIFEST` env
+        var.
+    teeplot_max_name_length : Optional[int], optional
+        Maximum length of output filenames, excluding the "+ext=" suffix.
+
+        Longer names have their longest attr values replaced by a short,
+        stable digest, rather than being chopped into nested directories.
+        Full attrs are recorded in an index within `teeplot_outdir`, for
+        outputs saved as files, and can be looked up with
+        `teeplot.lookup_attrs`. If default, use module-level
+        `max_name_length` config.
+    teeplot_oncollision : Literal["error", "fix", "ignore", "warn"], optional
+        Strategy for handling collisions between generated filenames.
+
+        Default "ignore" if executing in interactive mode, else default "warn".
+    teeplot_outattrs : Mapping[str, str], optional
+        Additional attributes to include in the output filename.
+    teeplot_outdir : str, default "teeplots"
+        Base directory for saving plots.
+    teeplot_outexclude : Iterable[str], default tuple()
+        Attributes to always exclude, if present, from the output filename.
+
+        Under default settings, all kwargs with string values are included in
+        the output filename.
+    teeplot_outinclude : Iterable[str], default tuple()
+        Attributes to always include, if present, in the output filename.
+
+        Under default settings, all kwargs with string values are included in
+        the output filename.
+    teeplot_parallel_formats : bool, default False
+        Encode output formats concurrently in a pool of worker processes.
+
+        The figure is pickled once and each worker encodes one format from its
+        own copy, so output is identical to serial encoding. Falls back to
+        serial encoding if the figure can't be pickled. Most beneficial when
+        saving several formats of figures with many artists.
+    teeplot_postprocess : Union[str, Callable], default ""
+        Actions to perform on plot result before saving.
+
+        A `str` kwarg will be `exec`'ed, with `plt` and `sns` (if installed)
+        available, as well as the plotter return value as `teed`. If `str` value
+        ends with ';', the postprocess step will not be included in output filename.
+
+        A Callable kwarg will be invoked exactly once, with the first calling
+        convention its signature accepts: the plotter return value as the
+        `teed` kwarg, the plotter return value as the `ax` kwarg, no args, or
+        the plotter return value as a positional arg.
+    teeplot_rc_context : Mapping[str, Any], optional
+        Mapping of matplotlib rcParams to apply via `matplotlib.rc_context`
+        around the plotter, postprocess, and save steps.
+    teeplot_rasterize_threshold : Optional[int], optional
+        If set, lines and collections (e.g., scatter points) with more than
+        this many vertices are rasterized at `teeplot_dpi` within vector
+        outputs, while axes and text remain vectors.
+
+        Keeps plots of very many points from producing huge, slow PDF, SVG,
+        and (E)PS files. Raster outputs are unaffected. If default, use
+        module-level `rasterize_threshold` config.
+    teeplot_record : Optional[bool], optional
+        Should the call be recorded within `teeplot_outdir`, so its plot can
+        be re-rendered by `teeplot.replay` (e.g., at another dpi or in other
+        formats) without recomputing plotter arguments?
+
+        The plotter (by reference), args, kwargs, and teeplot options are
+        pickled, with large numpy arrays and pandas objects stored once as
+        side files shared between calls. Calls that can't be pickled (e.g.,
+        with a lambda plotter) warn and aren't recorded. If default, use
+        module-level `record` config or `TEEPLOT_RECORD` environment
+        variable.
+    teeplot_recycle : Optional[bool], optional
+        Should the plotter draw onto a cleared figure kept from a prior call
+        with the same figure size, and the figure be cleared and kept for
+        reuse once saved, rather than closed?
+
+        Saves allocating a new figure and canvas each call. Up to module-level
+        `recycle_max_figures` cleared figures are kept open; figures beyond
+        that, or that were shown, are closed. If default, use module-level
+        `recycle` config or `TEEPLOT_RECYCLE` environment variable.
+    teeplot_save : Union[str, Iterable[str], bool], default True
+        File formats to save the plots in.
+
+        If `True`, defaults to global settings. If `False`, suppresses output
+        to all file formats.
+    teeplot_show : Optional[bool], optional
+        Should `plt.show()` be called?
+
+        If default, call `plt.show()` if interactive environment detected (e.g.,
+        notebook).
+    teeplot_sink : Optional[MemorySink], optional
+        In-memory target to store encoded outputs in, keyed by the paths they
+        would otherwise be saved to, rather than writing files.
+
+        Output naming and collision handling are unchanged, but no filesystem
+        I/O is performed, e.g., for serving plots from a web service. Formats
+        are encoded in-process, and `teeplot_archive`, `teeplot_async`,
+        `teeplot_cache`, and `teeplot_manifest` are ignored.
+    teeplot_skip : Optional[bool], optional
+        Should the plotter not be called at all if no formats would be saved
+        and the plot would not be shown?
+
+        If so, no filesystem I/O is performed and a `teeplot.SkippedPlot`
+        stand-in is returned in place of the plotter return value. If
+        default, use module-level `skipmode` config or `TEEPLOT_SKIPMODE`
+        environment variable.
+    teeplot_snapshot : Optional[bool], optional
+        Should a compressed, pickled snapshot of the figure as saved (after
+        postprocess, figsize, and rc context), with rcParams and savefig
+        settings, be written alongside outputs, as "+ext=.mplfig.gz"?
+
+        Lets formats not saved now (e.g., SVG for web, or EPS for a journal)
+        be rendered later via `teeplot.render_missing`, without re-running
+        `tee`. Only applies when saving to files. If default, use
+        module-level `snapshot` config or `TEEPLOT_SNAPSHOT` environment
+        variable.
+    teeplot_subdir : str, default ""
+        Subdirectory within `teeplot_outdir` to save plots.
+    teeplot_thumbnail : Optional[int], optional
+        If set, also save a PNG preview at most this many pixels wide and
+        tall alongside saved outputs, with ext ".thumb.png".
+
+        The preview is downsampled from the figure as drawn on its canvas,
+        rather than rendered again. See `teeplot.contact_sheet`.
+    teeplot_transparent : bool, default True
+        Save the plot with a transparent background.
+    teeplot_verbose : bool, default True
+        Print saved filenames if True.
+    **kwargs : Any
+        Additional keyword arguments forwarded to the plotting function.
+
+    Returns
+    -------
+    Union[Any, Tuple[Callable, Any]]
+        The result from the `plotter` function.
+
+    Raises
+    ------
+    RuntimeError
+        If a file collision occurs and `teeplot_oncollision` is "error".
+    ValueError
+        For invalid format or `teeplot_oncollision` settings.
+
+    Notes
+    -----
+    - The output filename is generated based on the `plotter` function name and
+      provided attributes.
+    - Directories are created as needed based on specified output paths.
+    - Enforces TrueType fonts for PDF and PS formats.
+    """
+    _raise_async_errors()
+
+    if teeplot_record is None:
+        teeplot_record = _get_config().record
+    # capture options as passed, before they are resolved
+    recorded_options = _recorded_options(locals()) if teeplot_record else None
+
+    teeplot_save = _resolve_save(teeplot_save, teeplot_verbose)
+
+    if teeplot_oncollision is None:
+        teeplot_oncollision = oncollision
+
+    config = _get_config()
+    if teeplot_async is None:
+        teeplot_async = config.asyncmode
+
+    if teeplot_cache is None:
+        teeplot_cache = config.cache
+
+    if teeplot_manifest is None:
+        teeplot_manifest = config.manifest
+
+    if teeplot_archive is None:
+        teeplot_archive = config.archive
+
+    if teeplot_dedup is None:
+        teeplot_dedup = config.dedup
+
+    if teeplot_sink is not None:  # outputs stay in memory, in-process
+        teeplot_archive = teeplot_async = None
+        teeplot_cache = teeplot_manifest = False
+
+    if teeplot_show is None:
+        teeplot_show = hasattr(sys, 'ps1')
+
+    if teeplot_skip is None:
+        teeplot_skip = config.skipmode
+
+    if teeplot_snapshot is None:
+        teeplot_snapshot = config.snapshot
+
+    if teeplot_close is None:
+        teeplot_close = config.autoclose
+
+    if teeplot_recycle is None:
+        teeplot_recycle = config.recycle
+
+    if teeplot_rasterize_threshold is None:
+        teeplot_rasterize_threshold = rasterize_threshold
+
+    if teeplot_max_name_length is None:
+        teeplot_max_name_length = max_name_length
+
+    if teeplot_skip and not teeplot_save and not teeplot_show:
+        # nothing would be saved or shown, so don't plot at all
+        if teeplot_callback:
+            return (lambda: _skipped_plot), _skipped_plot
+        else:
+            return _skipped_plot
+
+    book = _pdf_book.get()
+    book_page = book is not None and ".pdf" in teeplot_save
+    if book_page:  # add page to book, rather than saving pdf file
+        teeplot_save = teeplot_save - {".pdf"}
+        teeplot_cache = False  # so page is added on every call
+
+    if isinstance(teeplot_outinclude, str):
+        teeplot_outinclude = [teeplot_outinclude]
+    if isinstance(teeplot_outexclude, str):
+        teeplot_outexclude = [teeplot_outexclude]
+
+    # ----- end argument parsing
+    # ----- begin output naming
+
+    attr_maker, out_filenamer = _make_namers(
+        plotter,
+        kwargs,
+        teeplot_outattrs=teeplot_outattrs,
+        teeplot_outexclude=teeplot_outexclude,
+        teeplot_outinclude=teeplot_outinclude,
+        teeplot_postprocess=teeplot_postprocess,
+        teeplot_max_name_length=teeplot_max_name_length,
+    )
+    out_folder = pathlib.Path(teeplot_outdir, teeplot_subdir)
+    to_files = teeplot_sink is None and not teeplot_archive
+    if teeplot_save and to_files:  # else, leave filesystem be
+        _makedirs(str(out_folder))
+
+    def resolve_jobs():
+        preresolved = _preresolved_jobs.get()
+        if preresolved is not None:
+            return preresolved
+        return _resolve_jobs(
+            out_folder,
+            out_filenamer,
+            teeplot_oncollision=teeplot_oncollision,
+            teeplot_save=teeplot_save,
+            teeplot_verbose=teeplot_verbose,
+            mkdir=to_files,
+        )
+
+    def exists(out_path: str) -> bool:
+        if teeplot_archive:
+            return out_path in _get_archive(teeplot_archive)
+        return os.path.exists(out_path)
+
+    def getsize(out_path: str) -> int:
+        if teeplot_sink is not None:
+            return len(teeplot_sink[out_path])
+        elif teeplot_archive:
+            return _get_archive(teeplot_archive).size(out_path)
+        return os.path.getsize(out_path)
+
+    cache_key = None
+    if teeplot_cache and teeplot_save and not teeplot_callback:
+        try:
+            with _maybe_rc_context(teeplot_rc_context):
+                cache_key = _cache_key(
+                    plotter,
+                    args,
+                    kwargs,
+                    teeplot_outattrs,
+                    teeplot_postprocess,
+                    dpi=teeplot_dpi,
+                    figsize=teeplot_figsize,
+                    outexclude=sorted(teeplot_outexclude),
+                    outinclude=sorted(teeplot_outinclude),
+                    rasterize_threshold=teeplot_rasterize_threshold,
+                    save=sorted(teeplot_save),
+                    transparent=teeplot_transparent,
+                )
+        except _cache.Unfingerprintable as e:
+            if teeplot_verbose > 1:
+                print(f"not caching, {e}")
+        else:
+            # check for hit before registering paths, as nothing is saved
+            planned_jobs = _preresolved_jobs.get()
+            if planned_jobs is None:
+                planned_jobs = _resolve_jobs(
+                    out_folder,
+                    out_filenamer,
+                    teeplot_oncollision=teeplot_oncollision,
+                    teeplot_save=teeplot_save,
+                    teeplot_verbose=False,
+                    mkdir=False,
+                    claim=False,
+                )
+            cached_paths = _get_cache(teeplot_outdir).get(cache_key)
+            if cached_paths == [
+                out_path for out_path, __ in planned_jobs
+            ] and all(
+                map(exists, cached_paths),
+            ):
+                if teeplot_verbose:
+                    for out_path in cached_paths:
+                        print(f"{out_path} (cached)")
+                return _skipped_plot
+
+    # ----- begin plotting
+
+    plt = _pyplot()
+    render_start = time.perf_counter()
+    with _maybe_rc_context(teeplot_rc_context):
+        recycled_fig = (
+            _acquire_figure(teeplot_figsize) if teeplot_recycle else None
+        )
+        teed = plotter(*args, **{k: v for k, v in kwargs.items()})
+
+        if teeplot_figsize is not None:
+            plt.gcf().set_size_inches(*teeplot_figsize)
+        plot_end = time.perf_counter()
+
+        if isinstance(teeplot_postprocess, abc.Callable):
+            _postprocess_invoker(teeplot_postprocess)(teed)
+        elif teeplot_postprocess:
+            if not isinstance(teeplot_postprocess, str):
+                raise TypeError(
+                    "teeplot_postprocess must be str or Callable, "
+                    f"not {type(teeplot_postprocess)} {teeplot_postprocess}"
+                )
+            _exec_postprocess(teeplot_postprocess, locals())
+    render_end = time.perf_counter()
+    render_time = render_end - render_start
+
+    # attrs describing plot as a whole, for instrumentation
+    plot_attrs = lambda: {
+        k: v for k, v in attr_maker(None).items() if k != "ext"
+    }
+    if hooks:
+        _emit("plot", plot_end - render_start, plot_attrs())
+        if teeplot_postprocess:
+            _emit("postprocess", render_end - plot_end, plot_attrs())
+
+    # svg ids are otherwise salted randomly, so would differ between renders
+    # of an unchanged plot
+    dedup_rc = (
+        {"svg.hashsalt": "teeplot"}
+        if teeplot_dedup and plt.rcParams["svg.hashsalt"] is None
+        else {}
+    )
+
+    def save_callback():
+        with _maybe_rc_context({**dedup_rc, **teeplot_rc_context}):
+            jobs = resolve_jobs()
+            fig = plt.gcf()
+
+            def on_saved(
+                out_path: str, ext: str, save_time: float, layout_time: float,
+            ) -> None:
+                if hooks:
+                    attrs = attr_maker(ext)
+                    _emit("layout", layout_time, attrs, ext, out_path)
+                    _emit(
+                        "encode",
+                        save_time - layout_time,
+                        attrs,
+                        ext,
+                        out_path,
+                        getsize(out_path),
+                    )
+                if teeplot_manifest:
+                    _get_manifest(teeplot_outdir).record(
+                        attr_maker(ext),
+                        ext,
+                        out_path,
+                        render_time=render_time,
+                        save_time=save_time,
+                        nbytes=getsize(out_path),
+                    )
+
+            def save_page(fig: "matplotlib.figure.Figure") -> None:
+                title, __ = _names.split_ext(
+                    os.path.join(teeplot_subdir, out_filenamer(".pdf")),
+                )
+                page, (save_time, layout_time) = book.add_page(
+                    title,
+                    lambda pages: _savefig(
+                        fig,
+                        pages,
+                        ".pdf",
+                        dpi=teeplot_dpi,
+                        transparent=teeplot_transparent,
+                    ),
+                )
+                page_path = f"{book.path}#page={page}"
+                if teeplot_verbose:
+                    print(page_path)
+                if hooks:
+                    attrs = attr_maker(".pdf")
+                    _emit("layout", layout_time, attrs, ".pdf", page_path)
+                    _emit(
+                        "encode",
+                        save_time - layout_time,
+                        attrs,
+                        ".pdf",
+                        page_path,
+                    )
+
+            def save_snapshot(
+                fig: "matplotlib.figure.Figure", out_path: str, ext: str,
+            ) -> None:
+                prefix = _snapshot.path_prefix(out_path, ext)
+                if prefix is None:  # ext not in filename, so can't vary it
+                    if teeplot_verbose > 1:
+                        print(f"not snapshotting {out_path}")
+                    return
+                snapshot_path = prefix + _snapshot.ext
+                try:
+                    data = _dump_figure(fig)
+                except Exception as e:  # e.g., unpicklable artists
+                    warnings.warn(f"teeplot could not snapshot figure ({e!r})")
+                    return
+                _snapshot.dump(
+                    teeplot_outdir,
+                    snapshot_path,
+                    data,
+                    _rc_snapshot(),
+                    dict(dpi=teeplot_dpi, transparent=teeplot_transparent),
+                )
+                if teeplot_verbose:
+                    print(snapshot_path)
+
+            savefig_kwargs = dict(
+                archive=teeplot_archive,
+                dedup=teeplot_outdir if teeplot_dedup and to_files else None,
+                dpi=teeplot_dpi,
+                transparent=teeplot_transparent,
+            )
+            rasterized = (
+                _rasterize_heavy_artists(fig, teeplot_rasterize_threshold)
+                if teeplot_rasterize_threshold is not None
+                and (
+                    book_page or any(ext in _vector_exts for __, ext in jobs)
+                )
+                else ()
+            )  # flags only affect vector formats, so raster outputs unchanged
+            if (
+                to_files
+                and not teeplot_dedup
+                and _has_content_store(teeplot_outdir)
+            ):  # don't write through links made by earlier deduped saves
+                content_store = _get_content_store(teeplot_outdir)
+                for out_path, __ in jobs:
+                    content_store.unshare(out_path)
+            try:
+                if teeplot_sink is not None:
+                    _savefig_serial(
+                        fig,
+                        jobs,
+                        on_saved,
+                        sink=teeplot_sink,
+                        **savefig_kwargs,
+                    )
+                elif teeplot_async and jobs:
+                    _savefig_async(fig, jobs, on_saved, **savefig_kwargs)
+                elif teeplot_parallel_formats and len(jobs) > 1:
+                    _savefig_parallel(fig, jobs, on_saved, **savefig_kwargs)
+                else:
+                    _savefig_serial(fig, jobs, on_saved, **savefig_kwargs)
+                if book_page:
+                    save_page(fig)
+                if teeplot_snapshot and to_files and jobs:
+                    save_snapshot(fig, *jobs[0])
+            finally:
+                for artist in rasterized:
+                    artist.set_rasterized(False)
+            if jobs and teeplot_thumbnail:
+                thumb_start = time.perf_counter()
+                thumb_path = _thumbnail_path(*jobs[0])
+                if teeplot_sink is not None:
+                    buffer = io.BytesIO()
+                    _save_thumbnail(fig, buffer, teeplot_thumbnail)
+                    teeplot_sink[thumb_path] = buffer.getbuffer()
+                elif teeplot_archive:
+                    buffer = io.BytesIO()
+                    _save_thumbnail(fig, buffer, teeplot_thumbnail)
+                    _get_archive(teeplot_archive).append(
+                        thumb_path, buffer.getvalue(),
+                    )
+                else:
+                    _save_thumbnail(fig, thumb_path, teeplot_thumbnail)
+                if teeplot_verbose:
+                    print(thumb_path)
+                if hooks:
+                    _emit(
+                        "thumbnail",
+                        time.perf_counter() - thumb_start,
+                        plot_attrs(),
+                        _names.thumbnail_ext,
+                        thumb_path,
+                        getsize(thumb_path),
+                    )
+            elif jobs and not (teeplot_close or teeplot_recycle):
+                fig.canvas.draw_idle()  # as done by plt.savefig
+
+            if teeplot_max_name_length is not None and to_files:
+                for name in {
+                    _names.split_ext(os.path.basename(out_path))[0]
+                    for out_path, __ in jobs
+                }:
+                    if _names.digest_sep in name:  # shortened
+                        _get_name_index(teeplot_outdir).record(
+                            name, plot_attrs(),
+                        )
+
+            if cache_key is not None:
+                plot_cache = _get_cache(teeplot_outdir)
+                plot_cache.put(cache_key, [out_path for out_path, __ in jobs])
+                if (
+                    cache_max_entries is not None
+                    and len(plot_cache) > cache_max_entries
+                ):
+                    plot_cache.evict(max_entries=cache_max_entries)
+
+            if recorded_options is not None and teeplot_sink is None:
+                try:
+                    _get_replay_store(teeplot_outdir).record(
+                        plotter,
+                        args,
+                        kwargs,
+                        recorded_options,
+                        [out_path for out_path, __ in jobs],
+                    )
+                except Exception as e:  # e.g., unpicklable plotter
+                    warnings.warn(
+                        f"teeplot could not record call for replay ({e!r})",
+                    )
+
+            if teeplot_show:
+                show_start = time.perf_counter()
+                plt.show()
+                if hooks:
+                    _emit(
+                        "show", time.perf_counter() - show_start, plot_attrs(),
+                    )
+
+            if teeplot_recycle and not teeplot_show:
+                _release_figure(fig)
+                if recycled_fig is not None and recycled_fig is not fig:
+                    _release_figure(recycled_fig)  # plotter made own figure
+            elif teeplot_close or teeplot_recycle:
+                plt.close(fig)
+                if recycled_fig is not None:
+                    plt.close(recycled_fig)
+
+            return teed
+
+    if teeplot_callback:
+        return save_callback, teed
+    else:
+        return save_callback()
+
+
+class TeeResult(typing.NamedTuple):
+    """Outcome of a single plot dispatched by `teeplot.tee_many`."""
+
+    index: int
+    """Position of plot's kwargs within `kwargs_iterable`."""
+
+    kwargs: typing.Dict[str, typing.Any]
+    """Plot-specific kwargs, as provided within `kwargs_iterable`."""
+
+    paths: typing.List[str]
+    """Output paths written, or that would have been written on error."""
+
+    elapsed: float
+    """Wall time spent plotting and saving in worker process, in seconds."""
+
+    error: typing.Optional[BaseException]
+    """Exception raised while plotting or saving, if any."""
+
+
+@functools.lru_cache(maxsize=None)
+def _tee_defaults() -> typing.Dict[str, typing.Any]:
+    """Default values of `tee` teeplot options."""
+    return {
+        name: param.default
+        for name, param in inspect.signature(tee).parameters.items()
+        if name.startswith("teeplot_")
+    }
+
+
+_unrecorded_options = frozenset(
+    {
+        "teeplot_async",
+        "teeplot_callback",
+        "teeplot_record",
+        "teeplot_show",
+        "teeplot_sink",
+    },
+)
+
+
+def _recorded_options(
+    values: typing.Mapping[str, typing.Any],
+) -> typing.Dict[str, typing.Any]:
+    """Select `tee` teeplot options among `values` to record for replay,
+    those passed with other than their default value and that affect
+    outputs."""
+    return {
+        name: values[name]
+        for name, default in _tee_defaults().items()
+        if name not in _unrecorded_options and values[name] is not default
+        and values[name] != default
+    }
+
+
+def _split_kwargs(
+    kwargs: typing.Mapping[str, typing.Any],
+) -> typing.Tuple[typing.Dict[str, typing.Any], typing.Dict[str, typing.Any]]:
+    """Separate `tee` kwargs into teeplot options, with defaults filled in,
+    and plotter kwargs."""
+    options, plot_kwargs = {**_tee_defaults()}, {}
+    for k, v in kwargs.items():
+        (options if k.startswith("teeplot_") else plot_kwargs)[k] = v
+    return options, plot_kwargs
+
+
+def _plan_tee(
+    plotter: typing.Callable[..., typing.Any],
+    kwargs: typing.Mapping[str, typing.Any],
+    claim: bool = True,
+) -> typing.List[typing.Tuple[str, str]]:
+    """Resolve output `(path, ext)` jobs exactly as `tee(plotter, **kwargs)`
+    would, without plotting.
+
+    If not `claim`, paths aren't registered or renumbered for collisions.
+    """
+    options, plot_kwargs = _split_kwargs(kwargs)
+    __, out_filenamer = _make_namers(
+        plotter,
+        plot_kwargs,
+        teeplot_outattrs=options["teeplot_outattrs"],
+        teeplot_outexclude=options["teeplot_outexclude"],
+        teeplot_outinclude=options["teeplot_outinclude"],
+        teeplot_postprocess=options["teeplot_postprocess"],
+        teeplot_max_name_length=options["teeplot_max_name_length"],
+    )
+    return _resolve_jobs(
+        pathlib.Path(options["teeplot_outdir"], options["teeplot_subdir"]),
+        out_filenamer,
+        teeplot_oncollision=options["teeplot_oncollision"] or oncollision,
+        teeplot_save=_resolve_save(
+            options["teeplot_save"], options["teeplot_verbose"],
+        ),
+        teeplot_verbose=options["teeplot_verbose"],
+        mkdir=options["teeplot_sink"] is None and not (
+            options["teeplot_archive"] or _get_config().archive
+        ),
+        claim=claim,
+    )
+
+
+def _tee_many_worker(
+    plotter: typing.Callable[..., typing.Any],
+    args: typing.Sequence[typing.Any],
+    kwargs: typing.Mapping[str, typing.Any],
+    jobs: typing.List[typing.Tuple[str, str]],
+) -> float:
+    start = time.perf_counter()
+    token = _preresolved_jobs.set(jobs)
+    try:
+        tee(
+            plotter,
+            *args,
+            **{
+                **kwargs,
+                "teeplot_async": False,
+                "teeplot_callback": False,
+                "teeplot_show": False,
+                "teeplot_verbose": False,
+            },
+        )
+    finally:
+        _preresolved_jobs.reset(token)
+        _pyplot().close("all")
+    return time.perf_counter() - start
+
+
+def tee_many(
+    plotter: typing.Callable[..., typing.Any],
+    kwargs_iterable: typing.Iterable[typing.Mapping[str, typing.Any]],
+    *args: typing.Any,
+    teeplot_max_workers: typing.Optional[int] = None,
+    **kwargs: typing.Any,
+) -> typing.Iterator[TeeResult]:
+    """Dispatch `tee` calls over a parameter sweep to a pool of worker
+    processes, yielding results as plots complete.
+
+    Output filenames and collisions are resolved in the calling process, in
+    iteration order, so outputs are named exactly as if `tee` had been called
+    in a loop. Workers render with the headless "agg" backend.
+
+    Parameters
+    ----------
+    plotter : Callable[..., Any]
+        The plotting function to execute. Must be picklable (e.g., defined at
+        module level).
+    kwargs_iterable : Iterable[Mapping[str, Any]]
+        Plot-specific keyword arguments, including any teeplot options. Each
+        mapping results in one `tee` call. Consumed lazily.
+    *args : Any
+        Positional arguments forwarded to every plotting function call.
+    teeplot_max_workers : int, optional
+        Number of worker processes. Defaults to number of processors.
+    **kwargs : Any
+        Keyword arguments, including any teeplot options, shared by every
+        `tee` call. Overridden by plot-specific kwargs.
+
+    Yields
+    ------
+    TeeResult
+        Outcome of each plot, in order of completion.
+
+    Notes
+    -----
+    Plotter return values are not sent back from worker processes.
+    `teeplot_async`, `teeplot_callback`, and `teeplot_show` are ignored.
+    Outputs stored to a `teeplot_sink` stay in worker processes, so are
+    lost.
+    """
+    max_workers = teeplot_max_workers or os.cpu_count() or 1
+    with futures.ProcessPoolExecutor(
+        max_workers, initializer=_init_worker,
+    ) as pool:
+        pending = {}
+
+        def collect(
+            return_when: str,
+        ) -> typing.Iterator[TeeResult]:
+            done, __ = futures.wait(pending, return_when=return_when)
+            for future in done:
+                index, task_kwargs, jobs = pending.pop(future)
+                error = future.exception()
+                yield TeeResult(
+                    index=index,
+                    kwargs=task_kwargs,
+                    paths=[out_path for out_path, __ in jobs],
+                    elapsed=0.0 if error else future.result(),
+                    error=error,
+                )
+
+        for index, task_kwargs in enumerate(kwargs_iterable):
+            task_kwargs = dict(task_kwargs)
+            merged_kwargs = {**kwargs, **task_kwargs}
+            try:
+                jobs = _plan_tee(plotter, merged_kwargs)
+            except Exception as e:
+                yield TeeResult(index, task_kwargs, [], 0.0, e)
+                continue
+
+            future = pool.submit(
+                _tee_many_worker, plotter, args, merged_kwargs, jobs,
+            )
+            pending[future] = (index, task_kwargs, jobs)
+            # bound tasks in flight, so kwargs_iterable is consumed lazily
+            while len(pending) >= 2 * max_workers:
+                yield from collect(futures.FIRST_COMPLETED)
+
+        while pending:
+            yield from collect(futures.FIRST_COMPLETED)
+
+
+def _render_frame(fig: "matplotlib.figure.Figure") -> "PIL.Image.Image":
+    """Draw `fig` and get its pixels, at figure dpi."""
+    from PIL import Image
+
+    canvas = fig.canvas
+    if hasattr(canvas, "buffer_rgba"):  # agg-based canvas, draw in place
+        canvas.draw()
+        pixels = canvas.buffer_rgba()
+        height, width = pixels.shape[:2]
+        return Image.frombuffer(
+            "RGBA", (width, height), pixels, "raw", "RGBA", 0, 1,
+        )
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=fig.dpi)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+_tee_frames_options = frozenset(
+    {
+        "teeplot_dpi",
+        "teeplot_figsize",
+        "teeplot_max_name_length",
+        "teeplot_oncollision",
+        "teeplot_outattrs",
+        "teeplot_outdir",
+        "teeplot_outexclude",
+        "teeplot_outinclude",
+        "teeplot_postprocess",
+        "teeplot_rc_context",
+        "teeplot_subdir",
+        "teeplot_verbose",
+    },
+)
+
+
+def tee_frames(
+    plotter: typing.Callable[..., typing.Any],
+    frames: typing.Iterable[typing.Mapping[str, typing.Any]],
+    *args: typing.Any,
+    teeplot_format: typext.Literal[".gif", ".png"] = ".gif",
+    teeplot_fps: float = 10.0,
+    teeplot_loop: typing.Optional[int] = 0,
+    teeplot_update: typing.Optional[typing.Callable[..., typing.Any]] = None,
+    **kwargs: typing.Any,
+) -> typing.List[str]:
+    """Render a series of frames onto a single figure, streaming each frame
+    into an animation (or numbered images) as it is drawn.
+
+    The series is named like a `tee` output, from shared kwargs only, so a
+    whole time series gets one semantic filename. Frames are encoded and
+    written as they are rendered, so memory use doesn't grow with the
+    number of frames.
+
+    Parameters
+    ----------
+    plotter : Callable[..., Any]
+        The plotting function, drawing onto the current figure.
+    frames : Iterable[Mapping[str, Any]]
+        Frame-specific keyword arguments, one mapping per frame. Consumed
+        lazily. Not included in output filename.
+    *args : Any
+        Positional arguments forwarded to every plotting function call.
+    teeplot_format : Literal[".gif", ".png"], default ".gif"
+        Output format. Frames are written as a single animated GIF or as
+        numbered PNG images, named with an added "frame" attr.
+    teeplot_fps : float, default 10.0
+        Frames per second of GIF animation.
+    teeplot_loop : Optional[int], default 0
+        Number of times GIF animation repeats, with 0 repeating forever. If
+        None, animation plays once.
+    teeplot_update : Optional[Callable[..., Any]], optional
+        Function updating artists in place for each frame after the first,
+        called with the plotter return value as a positional arg and
+        frame-specific kwargs, e.g., `lambda teed, y: teed[0].set_ydata(y)`.
+
+        If None, the figure is cleared and `plotter` is called again for
+        each frame.
+    **kwargs : Any
+        Keyword arguments shared by every frame, including teeplot options
+        `teeplot_dpi`, `teeplot_figsize`, `teeplot_max_name_length`,
+        `teeplot_oncollision`, `teeplot_outattrs`, `teeplot_outdir`,
+        `teeplot_outexclude`, `teeplot_outinclude`, `teeplot_postprocess`,
+        `teeplot_rc_context`, `teeplot_subdir`, and `teeplot_verbose`, as
+        for `tee`. Overridden by frame-specific kwargs.
+
+        If `teeplot_dpi` isn't provided, frames are rendered at figure dpi.
+        Postprocess is applied after each `plotter` call.
+
+    Returns
+    -------
+    List[str]
+        Paths written; the animation, or each numbered image.
+
+    Notes
+    -----
+    Plotters that create their own figures (e.g., seaborn figure-level
+    functions) are supported, but each new figure replaces the last rather
+    than being reused.
+
+    Under draft mode, nothing is plotted or written.
+    """
+    unsupported = sorted(
+        k for k in kwargs
+        if k.startswith("teeplot_") and k not in _tee_frames_options
+    )
+    if unsupported:
+        raise TypeError(f"tee_frames doesn't support {', '.join(unsupported)}")
+    if teeplot_format not in (".gif", ".png"):
+        raise ValueError(
+            f"teeplot_format must be '.gif' or '.png', not {teeplot_format}",
+        )
+    if _get_config().draftmode:
+        return []
+
+    options, plot_kwargs = _split_kwargs(kwargs)
+    oncollision_ = options["teeplot_oncollision"] or oncollision
+    postprocess = options["teeplot_postprocess"]
+    verbose = options["teeplot_verbose"]
+    make_namers = _make_namer_factory(
+        plotter,
+        teeplot_outattrs=options["teeplot_outattrs"],
+        teeplot_outexclude=options["teeplot_outexclude"],
+        teeplot_outinclude=options["teeplot_outinclude"],
+        teeplot_postprocess=postprocess,
+        teeplot_max_name_length=options["teeplot_max_name_length"],
+    )
+    out_folder = pathlib.Path(
+        options["teeplot_outdir"], options["teeplot_subdir"],
+    )
+    _makedirs(str(out_folder))
+    pather = _make_pather(out_folder, mkdir=True)
+
+    def claim(out_path: str) -> str:
+        count = registry.claim(out_path)
+        if count:
+            out_path = _handle_collision(
+                out_path, teeplot_format, count, oncollision_,
+            )
+        if verbose:
+            print(out_path)
+        return out_path
+
+    if teeplot_format == ".gif":
+        __, out_filenamer = make_namers(plot_kwargs)
+        writer = _frames.GifWriter(
+            claim(pather(out_filenamer(".gif"))),
+            fps=teeplot_fps,
+            loop=teeplot_loop,
+        )
+    else:
+
+        def frame_pather(index: int) -> str:
+            frame_attrs = {**plot_kwargs, "frame": f"{index:06d}"}
+            __, out_filenamer = make_namers(frame_attrs)
+            return claim(pather(out_filenamer(".png")))
+
+        writer = _frames.PngWriter(frame_pather)
+
+    plt = _pyplot()
+    with _maybe_rc_context(options["teeplot_rc_context"]):
+        fig = plt.figure(figsize=options["teeplot_figsize"])
+        try:
+            teed = None
+            for index, frame_kwargs in enumerate(frames):
+                frame_kwargs = dict(frame_kwargs)
+                if teeplot_update is not None and index:
+                    teeplot_update(teed, **frame_kwargs)
+                else:
+                    if index:  # redraw onto same figure
+                        fig.clear()
+                        plt.figure(fig.number)
+                    teed = plotter(*args, **{**plot_kwargs, **frame_kwargs})
+                    if plt.gcf() is not fig:  # plotter made its own figure
+                        plt.close(fig)
+                        fig = plt.gcf()
+                    if options["teeplot_figsize"] is not None:
+                        fig.set_size_inches(*options["teeplot_figsize"])
+                    if "teeplot_dpi" in kwargs:
+                        fig.set_dpi(options["teeplot_dpi"])
+
+                    if isinstance(postprocess, abc.Callable):
+                        _postprocess_invoker(postprocess)(teed)
+                    elif postprocess:
+                        _exec_postprocess(
+                            postprocess,
+                            {
+                                "kwargs": {**plot_kwargs, **frame_kwargs},
+                                "plt": plt,
+                                "teed": teed,
+                            },
+                        )
+
+                writer.add(_render_frame(fig))
+        finally:
+            writer.close()
+            plt.close(fig)
+
+    if teeplot_format == ".gif":
+        return [writer.path] if writer.num_frames else []
+    return writer.paths
+
+
+class ReplayResult(typing.NamedTuple):
+    """Outcome of re-rendering a recorded `tee` call via `teeplot.replay`."""
+
+    id: str
+    """Id of replayed entry, as listed by `python -m teeplot replay -n`."""
 
-_history = Counter()
+    paths: typing.List[str]
+    """Output paths written, or empty on error."""
 
+    elapsed: float
+    """Wall time spent loading, plotting, and saving in worker process, in
+    seconds."""
 
-# enable TrueType fonts
-# see https://gecco-2021.sigevo.org/Paper-Submission-Instructions
-@matplotlib.rc_context(
+    error: typing.Optional[BaseException]
+    """Exception raised while loading, plotting, or saving, if any."""
+
+
+_naming_options = frozenset(
     {
-        'pdf.fonttype': 42,
-        'ps.fonttype': 42,
+        "teeplot_max_name_length",
+        "teeplot_outattrs",
+        "teeplot_outdir",
+        "teeplot_outexclude",
+        "teeplot_outinclude",
+        "teeplot_postprocess",
+        "teeplot_subdir",
     },
 )
-def tee(
-    plotter: typing.Callable[..., typing.Any],
-    *args: typing.Any,
-    teeplot_callback: bool = False,
-    teeplot_dpi: int = 300,
-    teeplot_figsize: typing.Optional[typing.Tuple[float, float]] = None,
-    teeplot_oncollision: typing.Optional[
-        typext.Literal["error", "fix", "ignore", "warn"]] = None,
-    teeplot_outattrs: typing.Mapping[str, str] = types.MappingProxyType({}),
-    teeplot_outdir: str = "teeplots",
-    teeplot_outinclude: typing.Iterable[str] = tuple(),
-    teeplot_outexclude: typing.Iterable[str] = tuple(),
-    teeplot_postprocess: typing.Union[str, typing.Callable] = "",
-    teeplot_rc_context: typing.Mapping[str, typing.Any] = types.MappingProxyType({}),
-    teeplot_save: typing.Union[typing.Iterable[str], bool] = True,
-    teeplot_show: typing.Optional[bool] = None,
-    teeplot_subdir: str = '',
-    teeplot_transparent: bool = True,
-    teeplot_verbose: bool = True,
-    **kwargs: typing.Any
-) -> typing.Any:
-    """Executes a plotting function and saves the resulting plot to specified
-    formats using a descriptive filename automatically generated from plotting
-    function arguments.
+
+
+def _replay_jobs(
+    recorded_paths: typing.Sequence[str],
+    teeplot_save: typing.Any,
+) -> typing.Optional[typing.List[typing.Tuple[str, str]]]:
+    """Map formats to save onto recorded output paths, as `(path, ext)`
+    jobs, deriving paths of formats not recorded from recorded ones.
+
+    Returns None if a path can't be derived, e.g., as ext isn't named.
+    """
+    by_ext = {}
+    for out_path in recorded_paths:
+        for ext in save:
+            if out_path.endswith(f"ext={ext}"):
+                by_ext[ext] = out_path
+    if not by_ext:
+        return None
+    some_ext, some_path = next(iter(by_ext.items()))
+    prefix = some_path[:-len(some_ext)]
+    return [
+        (by_ext.get(ext, prefix + ext), ext)
+        for ext in save
+        if ext in _resolve_save(teeplot_save, False)
+    ]
+
+
+def _replay_worker(
+    outdir: str,
+    entry_id: str,
+    recorded_paths: typing.Sequence[str],
+    overrides: typing.Mapping[str, typing.Any],
+) -> typing.Tuple[typing.List[str], float]:
+    start = time.perf_counter()
+    plotter, args, kwargs, options = _get_replay_store(outdir).load(entry_id)
+    merged_kwargs = {
+        **kwargs,
+        **options,
+        **overrides,
+        "teeplot_record": False,
+        "teeplot_verbose": False,
+    }
+    # reuse recorded paths, including any collision renumbering, so outputs
+    # are overwritten in place rather than renumbered again
+    jobs = None
+    if not _naming_options.intersection(overrides):
+        jobs = _replay_jobs(
+            recorded_paths, merged_kwargs.get("teeplot_save", True),
+        )
+    if jobs is None:
+        jobs = _plan_tee(plotter, merged_kwargs, claim=False)
+    _tee_many_worker(plotter, args, merged_kwargs, jobs)
+    return [out_path for out_path, __ in jobs], time.perf_counter() - start
+
+
+def replay(
+    outdir: str = "teeplots",
+    patterns: typing.Sequence[str] = (),
+    *,
+    teeplot_max_workers: typing.Optional[int] = None,
+    **kwargs: typing.Any,
+) -> typing.Iterator[ReplayResult]:
+    """Re-render plots of `tee` calls recorded under `teeplot_record`, in a
+    pool of worker processes, yielding results as plots complete.
 
     Parameters
     ----------
-    plotter : Callable[..., Any]
-        The plotting function to execute.
-    *args : Any
-        Positional arguments forwarded to the plotting function.
-    teeplot_callback : bool, default False
-        If True, return a tuple with callback to dispatch plot save instead of
-        immediately saving plot after running plotter.
-    teeplot_dpi : int, default 300
-        Resolution for rasterized components of the saved plot in dots per inch.
+    outdir : str, default "teeplots"
+        Output directory calls were recorded within.
+    patterns : Sequence[str], optional
+        Glob patterns selecting calls to replay, by entry id or recorded
+        output path (e.g., "*viz=lineplot*"). Defaults to all recorded
+        calls.
+    teeplot_max_workers : int, optional
+        Number of worker processes. Defaults to number of processors.
+    **kwargs : Any
+        Teeplot options overriding those recorded, e.g., `teeplot_dpi=600`
+        or `teeplot_save={".pdf"}`.
 
-        Default is publication-quality 300 dpi.
-    teeplot_figsize : Tuple[float, float], optional
-        Size of the saved plot in inches as (width, height).
+    Yields
+    ------
+    ReplayResult
+        Outcome of each replayed call, in order of completion.
 
-        If provided, the current figure is resized after the plotter runs.
-    teeplot_oncollision : Literal["error", "fix", "ignore", "warn"], optional
-        Strategy for handling collisions between generated filenames.
+    Notes
+    -----
+    Replayed calls aren't recorded again. Outputs overwrite those
+    originally saved, including any renumbered under `teeplot_oncollision`
+    "fix", without registering them as collisions. If `teeplot_outdir` or
+    other naming options are overridden, outputs are instead named anew,
+    without collision renumbering.
 
-        Default "ignore" if executing in interactive mode, else default "warn".
-    teeplot_outattrs : Mapping[str, str], optional
-        Additional attributes to include in the output filename.
-    teeplot_outdir : str, default "teeplots"
-        Base directory for saving plots.
-    teeplot_outexclude : Iterable[str], default tuple()
-        Attributes to always exclude, if present, from the output filename.
+    Recorded calls are unpickled, which can execute arbitrary code, so
+    only replay from output directories you trust. Calls are only loaded
+    from the replay store's log, and side files only if referenced by
+    their logged call.
+    """
+    invalid = sorted(k for k in kwargs if not k.startswith("teeplot_"))
+    if invalid:
+        raise TypeError(f"replay overrides must be teeplot options, not {invalid}")
 
-        Under default settings, all kwargs with string values are included in
-        the output filename.
-    teeplot_outinclude : Iterable[str], default tuple()
-        Attributes to always include, if present, in the output filename.
+    entries = _get_replay_store(outdir).entries(patterns)
+    max_workers = teeplot_max_workers or os.cpu_count() or 1
+    with futures.ProcessPoolExecutor(
+        max_workers, initializer=_init_worker,
+    ) as pool:
+        pending = {
+            pool.submit(
+                _replay_worker, outdir, entry["id"], entry["paths"], kwargs,
+            ): entry
+            for entry in entries
+        }
+        for future in futures.as_completed(pending):
+            entry_id = pending[future]["id"]
+            error = future.exception()
+            if error is None:
+                paths, elapsed = future.result()
+                yield ReplayResult(entry_id, paths, elapsed, None)
+            else:
+                yield ReplayResult(entry_id, [], 0.0, error)
 
-        Under default settings, all kwargs with string values are included in
-        the output filename.
-    teeplot_postprocess : Union[str, Callable], default ""
-        Actions to perform on plot result before saving.
 
-        A `str` kwarg will be `exec`'ed, with `plt` and `sns` (if installed)
-        available, as well as the plotter return value as `teed`. If `str` value
-        ends with ';', the postprocess step will not be included in output filename.
+def _render_snapshot_worker(
+    snapshot_path: str,
+    sha256: str,
+    jobs: typing.Sequence[typing.Tuple[str, str]],
+    chains: typing.Mapping[str, typing.Sequence[typing.Callable[[bytes], bytes]]],
+) -> typing.List[str]:
+    snapshot = _snapshot.load(snapshot_path, sha256)
+    for out_path, ext in jobs:
+        _savefig_worker(
+            snapshot["figure"],
+            snapshot["rc"],
+            out_path,
+            ext,
+            chain=chains.get(ext, ()),
+            **snapshot["savefig_kwargs"],
+        )
+    return [out_path for out_path, __ in jobs]
 
-        A Callable kwarg will have invocation attempted first with the plotter
-        return value as the `teed` kwarg, second with the plotter return value
-        as  the `ax` kwarg, third with no args, and last with the plotter
-        return value as a positional arg.
-    teeplot_rc_context : Mapping[str, Any], optional
-        Mapping of matplotlib rcParams to apply via `matplotlib.rc_context`
-        around the plotter, postprocess, and save steps.
-    teeplot_save : Union[str, Iterable[str], bool], default True
-        File formats to save the plots in.
 
-        If `True`, defaults to global settings. If `False`, suppresses output
-        to all file formats.
-    teeplot_show : Optional[bool], optional
-        Should `plt.show()` be called?
+def render_missing(
+    formats: typing.Iterable[str],
+    teeplot_outdir: str = "teeplots",
+    teeplot_max_workers: typing.Optional[int] = None,
+) -> typing.List[str]:
+    """Render formats missing from plots within an output directory, from
+    figure snapshots saved under `teeplot_snapshot`, in a pool of worker
+    processes.
 
-        If default, call `plt.show()` if interactive environment detected (e.g.,
-        notebook).
-    teeplot_subdir : str, default ""
-        Subdirectory within `teeplot_outdir` to save plots.
-    teeplot_transparent : bool, default True
-        Save the plot with a transparent background.
-    teeplot_verbose : bool, default True
-        Print saved filenames if True.
-    **kwargs : Any
-        Additional keyword arguments forwarded to the plotting function.
+    Snapshots whose outputs already exist in all requested formats are
+    skipped without being loaded.
+
+    Snapshots are pickles, and loading them can execute arbitrary code, so
+    only render from output directories you trust. As a safeguard, only
+    snapshots that `tee` recorded in an output directory's snapshot index
+    are loaded, and only if unmodified since; other files named like
+    snapshots are ignored.
+
+    Parameters
+    ----------
+    formats : Iterable[str]
+        File formats to render, e.g., [".svg", ".eps"].
+    teeplot_outdir : str, default "teeplots"
+        Output directory to search for snapshots, including subdirectories.
+    teeplot_max_workers : int, optional
+        Number of worker processes. Defaults to number of processors.
 
     Returns
     -------
-    Union[Any, Tuple[Callable, Any]]
-        The result from the `plotter` function.
+    List[str]
+        Output paths written.
 
     Raises
     ------
-    RuntimeError
-        If a file collision occurs and `teeplot_oncollision` is "error".
     ValueError
-        For invalid format or `teeplot_oncollision` settings.
+        For unsupported formats, or indexed snapshots modified since written.
+    """
+    formats = [f".{ext.lstrip('.')}" for ext in formats]
+    for ext in formats:
+        if ext not in save:
+            raise ValueError(
+                f"format {ext} not supported, must be one of {[*save]}",
+            )
 
-    Notes
-    -----
-    - The output filename is generated based on the `plotter` function name and
-      provided attributes.
-    - Directories are created as needed based on specified output paths.
-    - Enforces TrueType fonts for PDF and PS formats.
+    chains = {ext: [*transforms.get(ext, ())] for ext in formats}
+    max_workers = teeplot_max_workers or os.cpu_count() or 1
+    written = []
+    with futures.ProcessPoolExecutor(
+        max_workers, initializer=_init_worker,
+    ) as pool:
+        pending = []
+        for snapshot_path, sha256 in _snapshot.find(teeplot_outdir):
+            prefix = snapshot_path[:-len(_snapshot.ext)]
+            jobs = [
+                (prefix + ext, ext)
+                for ext in formats
+                if not os.path.exists(prefix + ext)
+            ]
+            if jobs:
+                pending.append(
+                    pool.submit(
+                        _render_snapshot_worker,
+                        snapshot_path,
+                        sha256,
+                        jobs,
+                        chains,
+                    ),
+                )
+        for future in futures.as_completed(pending):
+            written.extend(future.result())
+    return written
+
+
+class PlannedOutput(typing.NamedTuple):
+    """Output file that `tee` would write, as determined by `teeplot.plan`."""
+
+    ext: str
+    """Format extension, e.g., ".png"."""
+
+    path: typing.Optional[str]
+    """Output path, with `teeplot_oncollision` "fix" numbering applied.
+
+    Not resolved, so None, for skipped formats.
     """
-    formats = copy.copy(save)
 
-    # incorporate environment variable settings
-    for format in [*formats]:
-        format_env_var = f"TEEPLOT_{format[1:].upper()}"
-        if format_env_var in os.environ:  # strip leading .
-            format_env_value = os.environ[format_env_var]
-            if format_env_value.lower() in ("none", "defer"):
-                formats[format] = None
-            else:
-                formats[format] = strtobool(format_env_value)
+    skipped: bool
+    """Whether format would not be saved, due to `teeplot_save` or
+    module-level or environment settings."""
 
-    if teeplot_save is None or teeplot_save is True:
-        # default formats
-        teeplot_save = set(filter(formats.__getitem__, formats))
-    elif (
-        teeplot_save is False
-        or strtobool(os.environ.get("TEEPLOT_DRAFTMODE", "F"))
-        or draftmode
-    ):
-        # remove all outputs
-        teeplot_save = set()
-    elif isinstance(teeplot_save, str):
-        if not teeplot_save in formats:
-            raise ValueError(
-                f"only {[*formats]} save formats are supported, "
-                f"not {teeplot_save}",
-            )
-        # remove explicitly disabled outputs
-        blacklist = set(k for k, v in formats.items() if v is False)
-        exclusions =  {teeplot_save} & blacklist
-        if teeplot_verbose and exclusions:
-            print(f"skipping {exclusions}")
-        teeplot_save = {teeplot_save} - exclusions
+    collisions: int
+    """Number of saves to output path already registered, including those
+    planned earlier within the same batch.
 
-    elif isinstance(teeplot_save, abc.Iterable):
-        if not {*teeplot_save} <= {*formats}:
-            raise ValueError(
-                f"only {[*formats]} save formats are supported, "
-                f"not {list({*teeplot_save} - {*formats})}",
-            )
-        # remove explicitly disabled outputs
-        blacklist = set(k for k, v in formats.items() if v is False)
-        exclusions =  set(teeplot_save) & blacklist
-        if teeplot_verbose and exclusions:
-            print(f"skipping {exclusions}")
-        teeplot_save = set(teeplot_save) - exclusions
-    else:
-        raise TypeError(
-            "teeplot_save kwarg must be str, bool, or iterable, "
-            f"not {type(teeplot_save)} {teeplot_save}",
-        )
+    If nonzero, `tee` would warn, raise, renumber, or overwrite according to
+    `teeplot_oncollision`.
+    """
 
-    if teeplot_oncollision is None:
-        teeplot_oncollision = oncollision
+    exists: bool
+    """Whether a file already exists at `path`. Always False for skipped
+    formats."""
 
-    if isinstance(teeplot_outinclude, str):
-        teeplot_outinclude = [teeplot_outinclude]
-    if isinstance(teeplot_outexclude, str):
-        teeplot_outexclude = [teeplot_outexclude]
 
-    # ----- end argument parsing
-    # ----- begin plotting
+def plan(
+    plotter: typing.Callable[..., typing.Any],
+    *args: typing.Any,
+    **kwargs: typing.Any,
+) -> typing.List[PlannedOutput]:
+    """Determine which files `tee` would write, without plotting.
 
-    with matplotlib.rc_context(teeplot_rc_context):
-        teed = plotter(*args, **{k: v for k, v in kwargs.items()})
+    Takes the same arguments as `tee`. Nothing is registered as saved, so
+    planning doesn't affect collision handling of subsequent `tee` calls.
 
-        if teeplot_figsize is not None:
-            plt.gcf().set_size_inches(*teeplot_figsize)
+    Returns
+    -------
+    List[PlannedOutput]
+        Output for each format, including skipped formats.
+    """
+    return plan_many(plotter, [kwargs], *args)[0]
 
-        if isinstance(teeplot_postprocess, abc.Callable):
-            while "make breakable":
-                try:
-                    teeplot_postprocess(teed=teed)  # first attempt
-                    break
-                except TypeError:
-                    pass
-                try:
-                    teeplot_postprocess(ax=teed)  # second attempt
-                    break
-                except TypeError:
-                    pass
-                try:
-                    teeplot_postprocess()  # third attempt
-                    break
-                except TypeError:
-                    pass
-                try:
-                    teeplot_postprocess(teed)  # fourth attempt
-                    break
-                except TypeError:
-                    pass
-                raise TypeError(  # give up
-                    f"teeplot_postprocess={teeplot_postprocess} threw TypeError "
-                    "or call signature incompatible with attempted invocations",
-                )
-        elif teeplot_postprocess:
-            if not isinstance(teeplot_postprocess, str):
-                raise TypeError(
-                    "teeplot_postprocess must be str or Callable, "
-                    f"not {type(teeplot_postprocess)} {teeplot_postprocess}"
-                )
-            try:
-                import seaborn as sns
-                import seaborn
-            except ModuleNotFoundError:
-                pass
-            exec(teeplot_postprocess)
-
-    incl = [*teeplot_outinclude]
-    attr_maker = lambda ext: {
-        **{
-            slugify(k) : slugify(str(v))
-            for k, v in kwargs.items()
-            if isinstance(v, str) or k in incl
-        },
-        **{
-            'viz' : slugify(plotter.__name__),
-            'ext' : ext,
-        },
-        **(
-            {"post": teeplot_postprocess.__name__}
-            if teeplot_postprocess and isinstance(teeplot_postprocess, abc.Callable)
-            else {"post": slugify(teeplot_postprocess)}
-            if teeplot_postprocess and not teeplot_postprocess.endswith(";")
-            else {}
-        ),
-        **teeplot_outattrs,
-    }
-    excl = [*teeplot_outexclude]
-    out_filenamer = lambda ext: kn.pack({
-        k : v
-        for k, v in attr_maker(ext).items()
-        if not k.startswith('_') and not k in excl
-    })
 
-    out_folder = pathlib.Path(teeplot_outdir, teeplot_subdir)
-    out_folder.mkdir(parents=True, exist_ok=True)
+def plan_many(
+    plotter: typing.Callable[..., typing.Any],
+    kwargs_iterable: typing.Iterable[typing.Mapping[str, typing.Any]],
+    *args: typing.Any,
+    **kwargs: typing.Any,
+) -> typing.List[typing.List[PlannedOutput]]:
+    """Determine which files a batch of `tee` calls would write, in order,
+    without plotting.
 
-    def save_callback():
-        with matplotlib.rc_context(teeplot_rc_context):
-            for ext in save:
+    Collisions between calls within the batch are accounted for, as if the
+    calls were made in a loop.
 
-                if ext not in teeplot_save:
-                    if teeplot_verbose > 1:
-                        print(f"skipping {out_path}")
-                    continue
+    Parameters
+    ----------
+    plotter : Callable[..., Any]
+        The plotting function, which is not called.
+    kwargs_iterable : Iterable[Mapping[str, Any]]
+        Call-specific keyword arguments, including any teeplot options.
+    *args : Any
+        Positional arguments shared by every call. They don't affect output
+        filenames.
+    **kwargs : Any
+        Keyword arguments, including any teeplot options, shared by every
+        call. Overridden by call-specific kwargs.
 
-                out_path = pathlib.Path(
-                    kn.chop(
-                        str(out_folder / out_filenamer(ext)),
-                        mkdir=True,
-                    ),
-                )
+    Returns
+    -------
+    List[List[PlannedOutput]]
+        Output for each format, including skipped formats, for each call.
+    """
+    planned = {}  # saves planned earlier within batch, by path
+    listings = {}  # filenames within directory, by directory
+    pathers = {}  # by output folder
+    factories = {}  # by naming options
+    naming_keys = (
+        "teeplot_outattrs",
+        "teeplot_outexclude",
+        "teeplot_outinclude",
+        "teeplot_postprocess",
+        "teeplot_max_name_length",
+    )
+    # outputs, with formats to resolve by position, by teeplot_save value
+    saves = {}
+    make_output = functools.partial(tuple.__new__, PlannedOutput)
 
-                if out_path in _history:
-                    if teeplot_oncollision == "error":
-                        raise RuntimeError(f"teeplot already created file {out_path}")
-                    elif teeplot_oncollision == "fix":
-                        count = _history[out_path]
-                        suffix = f"ext={ext}"
-                        assert str(out_path).endswith(suffix)
-                        out_path = str(out_path)[:-len(suffix)] + f"#={count}+" + suffix
-                    elif teeplot_oncollision == "ignore":
-                        pass
-                    elif teeplot_oncollision == "warn":
-                        warnings.warn(
-                            f"teeplot already created file {out_path}, overwriting it",
-                        )
-                    else:
-                        raise ValueError(
-                            "teeplot_oncollision must be one of 'error', 'fix', "
-                            f"'ignore', or 'warn', not {teeplot_oncollision}",
-                        )
-                _history[out_path] += 1
+    def exists(out_path: str) -> bool:
+        dirname, __, basename = out_path.rpartition(os.sep)
+        if dirname not in listings:
+            try:
+                listings[dirname] = set(os.listdir(dirname or "."))
+            except OSError:
+                listings[dirname] = set()
+        return basename in listings[dirname]
 
-                if teeplot_verbose:
-                    print(out_path)
-                plt.savefig(
-                    str(out_path),
-                    bbox_inches='tight',
-                    transparent=teeplot_transparent,
-                    dpi=teeplot_dpi,
-                    # see https://matplotlib.org/2.1.1/users/whats_new.html#reproducible-ps-pdf-and-svg-output
-                    **dict(
-                        metadata={
-                            key: None
-                            for key in {
-                                ".png": [],
-                                ".pdf": ["CreationDate"],
-                                ".svg": ["Date"],
-                            }.get(ext, [])
-                        },
-                    ) if ext != ".pgf" else {},
-                )
+    def resolve(options: typing.Mapping[str, typing.Any]) -> tuple:
+        """Get namer factory, pather, formats, and collision strategy for
+        teeplot `options`, shared between calls with the same options."""
+        naming_options = tuple(options[k] for k in naming_keys)
+        # key on identity, as options may be unhashable; cached factory
+        # holds references to options, so their ids aren't reused
+        factory_key = tuple(map(id, naming_options))
+        if factory_key not in factories:
+            factories[factory_key] = _make_namer_factory(
+                plotter, *naming_options,
+            ), naming_options
 
-            if teeplot_show or (teeplot_show is None and hasattr(sys, 'ps1')):
-                plt.show()
+        folder_key = options["teeplot_outdir"], options["teeplot_subdir"]
+        if folder_key not in pathers:
+            pathers[folder_key] = _make_pather(
+                pathlib.Path(*folder_key), mkdir=False,
+            )
 
-            return teed
+        teeplot_save = options["teeplot_save"]
+        save_key = (
+            teeplot_save
+            if teeplot_save is None or isinstance(teeplot_save, (bool, str))
+            else frozenset(teeplot_save)
+        )
+        if save_key not in saves:
+            resolved = _resolve_save(teeplot_save, False)
+            saves[save_key] = (  # skipped outputs are shared between calls
+                [make_output((ext, None, True, 0, False)) for ext in save],
+                [(i, ext) for i, ext in enumerate(save) if ext in resolved],
+            )
 
-    if teeplot_callback:
-        return save_callback, teed
-    else:
-        return save_callback()
+        teeplot_oncollision = options["teeplot_oncollision"] or oncollision
+        return (
+            factories[factory_key][0],
+            pathers[folder_key],
+            saves[save_key],
+            "fix" if teeplot_oncollision == "fix" else "ignore",
+        )
+
+    # resolve shared options once, for calls that don't override them
+    shared_options, shared_plot_kwargs = _split_kwargs(kwargs)
+    shared = resolve(shared_options)
+
+    plans = []
+    for call_kwargs in kwargs_iterable:
+        call_options, plot_kwargs = {}, {**shared_plot_kwargs}
+        for k, v in call_kwargs.items():
+            (call_options if k.startswith("teeplot_") else plot_kwargs)[k] = v
+        make_namers, pather, (outputs, formats), teeplot_oncollision = (
+            resolve({**shared_options, **call_options})
+            if call_options
+            else shared
+        )
+        __, out_filenamer = make_namers(plot_kwargs)
+
+        outputs = [*outputs]
+        for i, ext in formats:
+            out_path = pather(out_filenamer(ext))
+            num_planned = planned.get(out_path, 0)
+            planned[out_path] = num_planned + 1
+            count = registry.count(out_path) + num_planned
+            fixed_path = out_path
+            if count:  # only "fix" affects path, other strategies only report
+                fixed_path = _handle_collision(
+                    out_path, ext, count, teeplot_oncollision,
+                )
+            outputs[i] = make_output(
+                (ext, fixed_path, False, count, exists(fixed_path)),
+            )
+        plans.append(outputs)
+
+    return plans
 
 
 @contextmanager
@@ -383,6 +3151,9 @@ def teed(*args, **kwargs):
 
     Plot save is dispatched upon exiting the context. Return value is the
     plotter return value. See `teeplot.tee` for kwarg options.
+
+    Under `teeplot_async`, plot save is queued upon exiting the context; use
+    `teeplot.flush` to wait for it to be written.
     """
     if "teeplot_callback" in kwargs:
         raise ValueError(
@@ -408,6 +3179,9 @@ def teewrap(
     `teeplot_outattrs` like in `teeplot.tee` will cause printed attributes to be  
     the same across function calls. For printing attributes on a per-call basis, 
     see `teeplot_outinclude` in `teeplot.tee`.
+
+    Pass `teeplot_async=True` to queue plot saves in the background; use
+    `teeplot.flush` to wait for them to be written.
     """
     if not all(k.startswith("teeplot_") for k in teeplot_kwargs):
         raise ValueError(
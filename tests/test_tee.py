@@ -4,11 +4,21 @@
 `tee` tests for `teeplot` package.
 '''
 
+import collections
+import matplotlib
 from matplotlib import pyplot as plt
 import numpy as np
 from keyname import keyname as kn
+import io
+import json
 import os
+import pathlib
+import pickle
 import pytest
+import re
+import subprocess
+import sys
+import tarfile
 import seaborn as sns
 
 from teeplot import teeplot as tp
@@ -209,7 +219,9 @@ def test_oncollision_fix():
         )
 
 
-@pytest.mark.parametrize("format", [".png", ".pdf", ".pgf", ".ps", ".eps", ".svg"])
+@pytest.mark.parametrize(
+    "format", [".png", ".pdf", ".pgf", ".ps", ".eps", ".svg", ".svgz"],
+)
 def test_outformat(format):
 
     # adapted from https://seaborn.pydata.org/generated/seaborn.lineplot.html
@@ -276,6 +288,25 @@ def test_postprocess_str():
             os.path.join('teeplots', f'hue=region+post=teed-set-yscale-log+style=event+viz=lineplot+x=timepoint+y=signal+ext={ext}'),
         )
 
+
+def test_postprocess_str_nested_scope(tmp_path):
+
+    plt.figure()
+    tp.tee(
+        plt.plot,
+        [1, 2, 3],
+        teeplot_outdir=str(tmp_path),
+        teeplot_postprocess=(
+            "[plt.axvline(x, label=f'{teed[0].get_label()}') for x in range(3)];"
+        ),
+        teeplot_save={'.png'},
+    )
+
+    # comprehension scope sees plt and teed
+    assert len(plt.gca().get_lines()) == 4
+    assert os.path.exists(os.path.join(tmp_path, 'viz=plot+ext=.png'))
+
+
 def test_postprocess_hidden():
 
     tp.tee(
@@ -480,3 +511,1461 @@ def test_callback():
         assert os.path.exists(
             os.path.join('teeplots', f'hue=region+style=event+viz=lineplot+x=timepoint+y=signal+ext={ext}'),
         )
+
+
+@pytest.mark.filterwarnings("error:teeplot could not pickle figure")
+def test_parallel_formats():
+
+    np.random.seed(1)
+    x, y = np.random.normal(size=(2, 5000)).cumsum(axis=1)
+
+    for parallel in False, True:
+        plt.figure()
+        tp.tee(
+            sns.lineplot,
+            x=x,
+            y=y,
+            sort=False,
+            teeplot_outattrs={
+              'parallelformats' : str(parallel),
+            },
+            teeplot_subdir='mydirectory',
+            teeplot_parallel_formats=parallel,
+            teeplot_rc_context={'svg.hashsalt': 'parallelformats'},
+            teeplot_save={".pdf", ".png", ".svg"},
+        )
+
+    for ext in '.pdf', '.png', '.svg':
+        serial_path, parallel_path = (
+            os.path.join('teeplots', 'mydirectory', f'parallelformats={parallel}+viz=lineplot+ext={ext}')
+            for parallel in (False, True)
+        )
+        with open(serial_path, 'rb') as serial, open(parallel_path, 'rb') as parallel:
+            assert serial.read() == parallel.read()
+
+
+def test_async():
+
+    np.random.seed(1)
+    x, y = np.random.normal(size=(2, 5000)).cumsum(axis=1)
+
+    plt.figure()
+    tp.tee(
+        sns.lineplot,
+        x=x,
+        y=y,
+        sort=False,
+        teeplot_outattrs={
+          'async' : 'metadata',
+        },
+        teeplot_subdir='mydirectory',
+        teeplot_async=True,
+    )
+    tp.flush()
+
+    for ext in '.pdf', '.png':
+        assert os.path.exists(
+            os.path.join('teeplots', 'mydirectory', f'async=metadata+viz=lineplot+ext={ext}'),
+        )
+
+
+def test_async_error():
+
+    # a directory squatting on output path makes background save fail
+    os.makedirs(
+        os.path.join('teeplots', 'mydirectory', 'asyncerror=metadata+viz=plot+ext=.png'),
+        exist_ok=True,
+    )
+
+    plt.figure()
+    tp.tee(
+        plt.plot,
+        [1, 2, 3],
+        teeplot_outattrs={
+          'asyncerror' : 'metadata',
+        },
+        teeplot_subdir='mydirectory',
+        teeplot_save={".png"},
+        teeplot_async=True,
+    )
+    assert tp.wait()
+
+    with pytest.raises(OSError):
+        tp.tee(plt.plot, [1, 2, 3], teeplot_save=False)
+
+    tp.flush()  # error should have been cleared
+
+
+def test_async_max_pending(monkeypatch, tmp_path):
+
+    import threading
+    import time
+    from concurrent import futures
+
+    lock = threading.Lock()
+    running, peaks = [0], []
+
+    def savefig_worker(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            peaks[-1] = max(peaks[-1], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return 0.0, 0.0
+
+    pool = futures.ThreadPoolExecutor(max_workers=8)
+    monkeypatch.setattr(tp, '_get_format_pool', lambda: pool)
+    monkeypatch.setattr(tp, '_savefig_worker', savefig_worker)
+
+    # limit applies as changed between calls, not only as first used
+    for max_pending in 1, 3, 2:
+        monkeypatch.setattr(tp, 'async_max_pending', max_pending)
+        peaks.append(0)
+        plt.figure()
+        tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_async=True,
+            teeplot_outattrs={'max-pending': str(max_pending)},
+            teeplot_outdir=str(tmp_path),
+            teeplot_save={'.eps', '.pdf', '.png', '.ps', '.svg', '.svgz'},
+        )
+        tp.flush()
+    pool.shutdown()
+    assert peaks == [1, 3, 2]
+
+    monkeypatch.setattr(tp, 'async_max_pending', 0)
+    plt.figure()
+    with pytest.raises(ValueError, match='async_max_pending'):
+        tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_async=True,
+            teeplot_outdir=str(tmp_path),
+            teeplot_save={'.png'},
+        )
+
+
+# module global, as closure cell contents are fingerprinted by cache
+_cache_calls = []
+
+
+def test_cache(monkeypatch):
+
+    calls = _cache_calls
+    calls.clear()
+
+    def cacheplot(data, color):
+        _cache_calls.append(color)
+        plt.figure()
+        return plt.plot(data, color=color)
+
+    data = np.arange(10)
+    outdir = os.path.join('teeplots', 'cache')
+    tp.cache_clear(teeplot_outdir=outdir)
+
+    def cached_tee(**kwargs):
+        return tp.tee(
+            cacheplot,
+            data,
+            teeplot_cache=True,
+            teeplot_oncollision="ignore",
+            teeplot_outdir=outdir,
+            teeplot_save={".png"},
+            **kwargs,
+        )
+
+    registry = tp.MemoryRegistry()
+    monkeypatch.setattr(tp, 'registry', registry)
+    assert isinstance(cached_tee(color="red"), list)
+    assert isinstance(cached_tee(color="red"), tp.SkippedPlot)  # cache hit
+    assert calls == ["red"]
+    # hit registers nothing, as nothing is saved
+    assert registry.count(
+        os.path.join(outdir, 'color=red+viz=cacheplot+ext=.png'),
+    ) == 1
+
+    cached_tee(color="blue")
+    assert calls == ["red", "blue"]
+
+    cached_tee(color="blue", teeplot_dpi=72)  # teeplot option changed
+    assert calls == ["red", "blue", "blue"]
+
+    os.remove(os.path.join(outdir, 'color=red+viz=cacheplot+ext=.png'))
+    cached_tee(color="red")  # output missing
+    assert calls == ["red", "blue", "blue", "red"]
+
+    tp.cache_clear(teeplot_outdir=outdir)
+    cached_tee(color="red")
+    assert calls == ["red", "blue", "blue", "red", "red"]
+
+    assert tp.cache_evict(teeplot_outdir=outdir, max_entries=0) == 1
+    cached_tee(color="red")
+    assert len(calls) == 6
+
+
+def test_cache_datafordigest():
+
+    calls = _cache_calls
+    calls.clear()
+
+    class Opaque:
+        pass
+
+    def opaqueplot(data):
+        _cache_calls.append(data)
+        plt.figure()
+        return plt.plot([1, 2, 3])
+
+    outdir = os.path.join('teeplots', 'cache')
+
+    for outattrs in [{}, {}, {'_datafordigest': [1, 2, 3]}] * 2:
+        tp.tee(
+            opaqueplot,
+            Opaque(),
+            teeplot_cache=True,
+            teeplot_oncollision="ignore",
+            teeplot_outattrs=outattrs,
+            teeplot_outdir=outdir,
+            teeplot_save={".png"},
+        )
+
+    # opaque args are uncacheable, unless vouched for by _datafordigest
+    assert len(calls) == 5
+
+
+def test_cache_closures():
+
+    def make_plotter(data):
+        def closureplot():
+            _cache_calls.append(data)
+            plt.figure()
+            return plt.plot(data)
+
+        return closureplot
+
+    _cache_calls.clear()
+    outdir = os.path.join('teeplots', 'cache')
+    tp.cache_clear(teeplot_outdir=outdir)
+    for data in [1, 2, 3], [3, 2, 1], [3, 2, 1]:
+        tp.tee(
+            make_plotter(data),
+            teeplot_cache=True,
+            teeplot_oncollision="ignore",
+            teeplot_outdir=outdir,
+            teeplot_save={".png"},
+        )
+
+    # plotters differing only by captured data aren't conflated
+    assert _cache_calls == [[1, 2, 3], [3, 2, 1]]
+
+    def make_postprocess(color):
+        def closurepostprocess(teed):
+            for line in teed:
+                line.set_color(color)
+
+        return closurepostprocess
+
+    for color in "red", "blue", "blue":
+        tp.tee(
+            make_plotter([1, 2, 3]),
+            teeplot_cache=True,
+            teeplot_oncollision="ignore",
+            teeplot_outdir=outdir,
+            teeplot_postprocess=make_postprocess(color),
+            teeplot_save={".png"},
+        )
+
+    # likewise, postprocess closures
+    assert _cache_calls == [[1, 2, 3], [3, 2, 1], [1, 2, 3], [1, 2, 3]]
+
+
+def test_manifest():
+
+    outdir = os.path.join('teeplots', 'manifest')
+
+    for hue in 'region', 'event':
+        plt.figure()
+        tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            label=hue,
+            teeplot_manifest=True,
+            teeplot_outattrs={'_datafordigest': [1, 2, 3]},
+            teeplot_outdir=outdir,
+            teeplot_outexclude=['viz'],
+        )
+
+    found = tp.find(teeplot_outdir=outdir, label="region")
+    assert {entry['ext'] for entry in found} == {'.pdf', '.png'}
+    for entry in found:
+        assert entry['attrs'] == {
+            'label': 'region', 'viz': 'plot', 'ext': entry['ext'],
+        }
+        assert entry['path'] == os.path.join(
+            outdir, f'label=region+ext={entry["ext"]}',
+        )
+        assert entry['bytes'] == os.path.getsize(entry['path'])
+
+    assert len(tp.find(teeplot_outdir=outdir, viz="plot")) == 4
+    assert len(tp.find(teeplot_outdir=outdir, ext=".png")) == 2
+    assert tp.find(teeplot_outdir=outdir, label="nonexistent") == []
+
+
+def _claim_many(registry_path, n):
+    registry = tp.FileRegistry(registry_path)
+    return [registry.claim('teeplots/contended') for __ in range(n)]
+
+
+def test_registry_multiprocess():
+    from concurrent.futures import ProcessPoolExecutor
+
+    registry_path = os.path.join('teeplots', 'registry', 'multiprocess')
+    tp.FileRegistry(registry_path).clear()
+    with ProcessPoolExecutor(4) as pool:
+        claims = [
+            count
+            for counts in pool.map(_claim_many, [registry_path] * 8, [25] * 8)
+            for count in counts
+        ]
+
+    assert sorted(claims) == list(range(200))
+    assert tp.FileRegistry(registry_path).count('teeplots/contended') == 200
+
+
+def test_registry_bounded():
+
+    registry_path = os.path.join('teeplots', 'registry', 'bounded')
+    tp.FileRegistry(registry_path).clear()
+    memory = tp.MemoryRegistry(maxsize=10)
+    shared = tp.FileRegistry(registry_path, maxsize=10)
+    for i in range(100):
+        memory.claim(f'teeplots/{i % 50}')
+        assert shared.claim(f'teeplots/{i % 50}') == i // 50
+
+    assert len(memory) == 10
+    # forgotten counts are recovered from disk
+    assert shared.count('teeplots/0') == 2
+    assert shared.claim('teeplots/0') == 2
+
+
+def test_registry_oncollision_fix(monkeypatch):
+
+    registry_path = os.path.join('teeplots', 'registry', 'fix')
+    tp.FileRegistry(registry_path).clear()
+    for i in range(3):
+        # fresh registry object, as in separate worker processes
+        monkeypatch.setattr(tp, 'registry', tp.FileRegistry(registry_path))
+        tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_oncollision="fix",
+            teeplot_outattrs={'registry': 'fix'},
+            teeplot_save={".png"},
+            teeplot_subdir='mydirectory',
+        )
+
+    for suffix in '', '#=1+', '#=2+':
+        assert os.path.exists(
+            os.path.join('teeplots', 'mydirectory', f'registry=fix+viz=plot+{suffix}ext=.png'),
+        )
+
+
+def _sweep_plot(x, color, fail=False):
+    if fail:
+        raise ValueError("requested failure")
+    plt.plot(x, color=color)
+
+
+def test_tee_many():
+
+    kwargs_list = [
+        {'color': color, 'x': [1, 2, 3]}
+        for color in ['red', 'blue', 'red', 'green', 'red']
+    ] + [{'color': 'black', 'x': [1], 'fail': True}]
+    results = [*tp.tee_many(
+        _sweep_plot,
+        kwargs_list,
+        teeplot_max_workers=2,
+        teeplot_oncollision="fix",
+        teeplot_outattrs={'sweep': 'many'},
+        teeplot_save={".png"},
+        teeplot_subdir='mydirectory',
+    )]
+
+    assert sorted(result.index for result in results) == [*range(6)]
+    results.sort(key=lambda result: result.index)
+    for result, kwargs in zip(results[:5], kwargs_list):
+        assert result.error is None
+        assert result.kwargs == kwargs
+        assert result.elapsed > 0
+        assert all(os.path.exists(path) for path in result.paths)
+
+    # collisions numbered as if tee had been called in a loop
+    assert [os.path.basename(result.paths[0]) for result in results[:5]] == [
+        f'color={color}+sweep=many+viz=sweep-plot+{suffix}ext=.png'
+        for color, suffix in [
+            ('red', ''), ('blue', ''), ('red', '#=1+'), ('green', ''),
+            ('red', '#=2+'),
+        ]
+    ]
+    assert isinstance(results[5].error, ValueError)
+
+
+def test_plan():
+
+    kwargs = dict(
+        teeplot_outattrs={'planned': 'yes', '_hidden': 'attr'},
+        teeplot_outexclude='hue',
+        teeplot_save={".png", ".svg"},
+        teeplot_subdir='mydirectory',
+    )
+    def lineplot(x, y, hue):
+        plt.plot([1, 2, 3])
+
+    planned = tp.plan(lineplot, x='a', y='b', hue='c', **kwargs)
+    for output in planned:
+        if output.exists:  # from a previous test run
+            os.remove(output.path)
+
+    planned = tp.plan(lineplot, x='a', y='b', hue='c', **kwargs)
+    assert [output.ext for output in planned] == [*tp.save]
+    assert {
+        output.ext for output in planned if not output.skipped
+    } == {".png", ".svg"}
+    assert all(output.path is None for output in planned if output.skipped)
+    assert not any(output.exists for output in planned)
+
+    plt.figure()
+    tp.tee(lineplot, x='a', y='b', hue='c', **kwargs)
+    saved = {
+        os.path.join('teeplots', 'mydirectory', f'planned=yes+viz=lineplot+x=a+y=b+ext={ext}')
+        for ext in (".png", ".svg")
+    }
+    assert all(map(os.path.exists, saved))
+    planned = tp.plan(lineplot, x='a', y='b', hue='c', **kwargs)
+    assert {
+        output.path for output in planned if not output.skipped
+    } == saved
+    assert all(
+        output.exists and output.collisions == 1
+        for output in planned
+        if not output.skipped
+    )
+
+
+def test_plan_many():
+
+    plans = tp.plan_many(
+        plt.plot,
+        [{'color': color} for color in ['red', 'blue', 'red', 'red']],
+        teeplot_oncollision='fix',
+        teeplot_outattrs={'plan': 'many'},
+        teeplot_save={".png"},
+    )
+    paths = [
+        output.path
+        for outputs in plans
+        for output in outputs
+        if not output.skipped
+    ]
+    assert paths == [
+        os.path.join('teeplots', f'color={color}+plan=many+viz=plot+{suffix}ext=.png')
+        for color, suffix in [
+            ('red', ''), ('blue', ''), ('red', '#=1+'), ('red', '#=2+'),
+        ]
+    ]
+
+    # planning doesn't register saves
+    assert paths == [
+        output.path
+        for outputs in tp.plan_many(
+            plt.plot,
+            [{'color': color} for color in ['red', 'blue', 'red', 'red']],
+            teeplot_oncollision='fix',
+            teeplot_outattrs={'plan': 'many'},
+            teeplot_save={".png"},
+        )
+        for output in outputs
+        if not output.skipped
+    ]
+
+
+def test_hooks(monkeypatch):
+
+    events = []
+    metrics = tp.Metrics()
+    monkeypatch.setattr(tp, 'hooks', [events.append, metrics])
+    for ext in ".pdf", ".png":
+        plt.figure()
+        tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_oncollision='ignore',
+            teeplot_outattrs={'hooks': 'yes'},
+            teeplot_postprocess='plt.grid()',
+            teeplot_save={ext},
+            teeplot_show=True,
+        )
+
+    assert [event.phase for event in events] == [
+        'plot', 'postprocess', 'layout', 'encode', 'show',
+    ] * 2
+    assert all(event.duration >= 0 for event in events)
+    assert events[0].attrs['hooks'] == 'yes'
+    encode = events[3]
+    assert encode.ext == '.pdf'
+    assert encode.nbytes == os.path.getsize(encode.path)
+
+    summary = metrics.summary()
+    assert summary['plot', None]['count'] == 2
+    assert summary['encode', '.png']['bytes'] == events[8].nbytes
+    assert summary['layout', '.png']['p95'] >= summary['layout', '.png']['p50']
+    text = metrics.to_text()
+    assert 'teeplot_phase_seconds_count{phase="plot",ext=""} 2' in text
+    assert 'teeplot_bytes_written_total{ext=".pdf"}' in text
+
+
+def test_savefig_leaves_figure_untouched(tmp_path):
+    fig = plt.figure()
+    plt.plot([1, 2, 3])
+    user_get_tightbbox = fig.get_tightbbox
+    fig.get_tightbbox = user_get_tightbbox  # user's own instance attribute
+    callbacks = {
+        name: dict(registered)
+        for name, registered in fig.canvas.callbacks.callbacks.items()
+    }
+
+    save_time, layout_time = tp._savefig(
+        fig,
+        os.path.join(tmp_path, 'plot.png'),
+        '.png',
+        dpi=50,
+        transparent=False,
+    )
+    assert 0 < layout_time < save_time
+    assert fig.get_tightbbox is user_get_tightbbox
+    assert fig.canvas.callbacks.callbacks == callbacks
+
+
+def test_draftmode_no_io(monkeypatch, tmp_path):
+
+    monkeypatch.setattr(tp, 'draftmode', True)
+    outdir = tmp_path / 'draft'
+    res = tp.tee(plt.plot, [1, 2, 3], teeplot_outdir=str(outdir))
+    assert len(res) == 1  # plotter still called
+    assert not outdir.exists()
+
+
+def test_skip(monkeypatch, tmp_path):
+
+    calls = []
+    def plotter(*args, **kwargs):
+        calls.append(args)
+
+    outdir = tmp_path / 'skip'
+    res = tp.tee(
+        plotter, [1, 2, 3], teeplot_outdir=str(outdir), teeplot_save=False,
+        teeplot_show=False, teeplot_skip=True,
+    )
+    assert isinstance(res, tp.SkippedPlot)
+    assert not res
+    assert res.set_title('ignored') is res
+    saveit, handle = tp.tee(
+        plotter, teeplot_callback=True, teeplot_outdir=str(outdir),
+        teeplot_save=False, teeplot_show=False, teeplot_skip=True,
+    )
+    assert saveit() is handle
+    assert not calls
+    assert not outdir.exists()
+
+    # skip mode only skips if nothing would be saved
+    monkeypatch.setattr(tp, 'skipmode', True)
+    tp.tee(
+        plotter, [1, 2, 3], teeplot_oncollision='ignore',
+        teeplot_outattrs={'skip': 'no'}, teeplot_outdir=str(outdir),
+        teeplot_save={'.png'}, teeplot_show=False,
+    )
+    assert calls == [([1, 2, 3],)]
+    monkeypatch.setattr(tp, 'draftmode', True)
+    assert isinstance(tp.tee(plotter, teeplot_show=False), tp.SkippedPlot)
+    assert len(calls) == 1
+
+
+def test_lazy_imports():
+
+    # heavy dependencies shouldn't be imported until a plot is made
+    script = '''
+import sys
+import teeplot.teeplot as tp
+tp.plan(print, teeplot_save={".png"}, hello="world")
+heavy = "keyname", "matplotlib", "matplotlib.pyplot", "slugify"
+print(*[module for module in heavy if module in sys.modules])
+'''
+    res = subprocess.run(
+        [sys.executable, '-c', script],
+        capture_output=True, check=True, text=True,
+    )
+    # nor slugify, while names are already slugs
+    assert res.stdout.strip() == ''
+
+
+def test_thumbnail(tmp_path):
+
+    from PIL import Image
+
+    outdir = str(tmp_path)
+    for color in 'red', 'blue':
+        plt.figure(figsize=(4, 3))
+        tp.tee(
+            plt.plot,
+            [1, 3, 2],
+            color=color,
+            teeplot_outdir=outdir,
+            teeplot_save={'.pdf', '.png'},
+            teeplot_thumbnail=64,
+        )
+
+    thumb = os.path.join(outdir, 'color=red+viz=plot+ext=.thumb.png')
+    assert Image.open(thumb).size == (64, 48)
+
+    page = tp.contact_sheet(outdir, title='Thumbnails & Plots')
+    assert page == os.path.join(outdir, 'index.html')
+    with open(page) as file:
+        html = file.read()
+    assert 'Thumbnails &amp; Plots' in html
+    assert html.count('<figure>') == 2
+    assert '<img src="color=red+viz=plot+ext=.thumb.png"' in html
+    assert '<a href="color=red+viz=plot+ext=.pdf">' in html
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='requires resource')
+@pytest.mark.parametrize('save', [False, True])
+@pytest.mark.parametrize('lifecycle', ['close', 'recycle'])
+def test_lifecycle_memory(lifecycle, save, monkeypatch, tmp_path):
+
+    import resource
+
+    # ru_maxrss is in kilobytes on Linux, but bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+
+    registry = tp.MemoryRegistry()
+    monkeypatch.setattr(tp, 'registry', registry)
+
+    def plotter():
+        if lifecycle == 'close':
+            plt.figure(figsize=(2, 2))
+        plt.gcf().text(0.5, 0.5, 'teeplot')
+
+    def run(num_calls):
+        for __ in range(num_calls):
+            tp.tee(
+                plotter,
+                teeplot_close=lifecycle == 'close',
+                teeplot_dpi=10,
+                teeplot_oncollision='ignore',
+                teeplot_outdir=str(tmp_path),
+                teeplot_recycle=lifecycle == 'recycle',
+                teeplot_save={'.png'} if save else False,
+                teeplot_show=False,
+                teeplot_verbose=False,
+            )
+
+    plt.close('all')
+    run(100)  # warm up, so growth reflects steady state
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    run(1_000 if save else 10_000)  # encoding is comparatively slow
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    # without closing, 10k figures take hundreds of megabytes
+    assert after - before < 32 * 2 ** 20
+    assert len(plt.get_fignums()) <= tp.recycle_max_figures
+    # repeated saves to one path are registered once
+    assert len(registry) == (1 if save else 0)
+    if save:
+        assert os.listdir(tmp_path) == ['viz=plotter+ext=.png']
+    plt.close('all')
+
+
+def test_recycle():
+
+    plt.close('all')
+    fig = None
+    for __ in range(3):
+        ax = tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_figsize=(3, 2),
+            teeplot_recycle=True,
+            teeplot_save=False,
+            teeplot_show=False,
+        )[0].axes
+        assert fig is None or ax.figure is fig  # same figure, reused
+        assert len(ax.figure.axes) == 0  # cleared once saved
+        fig = ax.figure
+
+    assert plt.get_fignums() == [fig.number]
+    assert tuple(fig.get_size_inches()) == (3, 2)
+    plt.close('all')
+
+
+def test_rasterize_threshold(tmp_path):
+
+    np.random.seed(1)
+    x, y = np.random.normal(size=(2, 20_000)).cumsum(axis=1)
+    svgs, pngs = {}, {}
+    for threshold in None, 1_000:
+        plt.figure()
+        line, = tp.tee(
+            plt.plot,
+            x,
+            y,
+            teeplot_outattrs={'threshold': str(threshold)},
+            teeplot_outdir=str(tmp_path),
+            teeplot_rasterize_threshold=threshold,
+            teeplot_save={'.png', '.svg'},
+        )
+        assert not line.get_rasterized()  # restored once saved
+        stem = os.path.join(tmp_path, f'threshold={threshold}+viz=plot')
+        with open(f'{stem}+ext=.svg') as file:
+            svgs[threshold] = file.read()
+        pngs[threshold] = plt.imread(f'{stem}+ext=.png')
+
+    assert '<image' not in svgs[None]
+    assert '<image' in svgs[1_000]  # line rasterized
+    assert len(svgs[1_000]) < len(svgs[None])
+    assert np.array_equal(pngs[1_000], pngs[None])
+
+
+def test_transforms(monkeypatch, tmp_path):
+
+    import gzip
+
+    seen = []
+    def spy(data):
+        seen.append(data[:4])
+        return data
+
+    pngs = {}
+    for transformed in False, True:
+        monkeypatch.setattr(tp, 'transforms', {
+            '.png': [spy, tp.png_zlib(level=9)],
+            '.svgz': [tp.svg_gzip()],
+        } if transformed else {})
+        plt.figure()
+        tp.tee(
+            plt.plot,
+            [1, 3, 2],
+            teeplot_outattrs={'transformed': str(transformed)},
+            teeplot_outdir=str(tmp_path),
+            teeplot_save={'.pdf', '.png', '.svgz'},
+        )
+        stem = os.path.join(tmp_path, f'transformed={transformed}+viz=plot')
+        with open(f'{stem}+ext=.png', 'rb') as file:
+            assert (b'tEXt' not in file.read()) == transformed
+        pngs[transformed] = plt.imread(f'{stem}+ext=.png')
+
+    assert seen == [b'\x89PNG']  # receives encoded bytes
+    assert np.array_equal(pngs[True], pngs[False])  # lossless
+    with gzip.open(f'{stem}+ext=.svgz') as file:
+        svg = file.read()
+    assert svg.startswith(b'<?xml') and b'<metadata>' not in svg
+
+    # gzip-compressed bytes wouldn't match the .svg ext
+    with pytest.raises(ValueError):
+        tp.svg_gzip()(svg)
+
+
+@pytest.mark.parametrize('dispatch', ['serial', 'parallel', 'async'])
+def test_archive(dispatch, tmp_path):
+    archive = os.path.join(tmp_path, 'plots.tar')
+    outdir = os.path.join(tmp_path, 'teeplots')
+    for i in range(3):
+        plt.figure()
+        tp.tee(
+            plt.plot,
+            [1, i, 2],
+            teeplot_archive=archive,
+            teeplot_async=dispatch == 'async',
+            teeplot_outattrs={'i': str(i)},
+            teeplot_outdir=outdir,
+            teeplot_parallel_formats=dispatch == 'parallel',
+            teeplot_save={'.pdf', '.png'},
+        )
+    tp.flush()
+    assert not os.path.exists(outdir)  # no individual files
+
+    stored = tp.Archive(archive)
+    assert len(stored.names()) == 6
+    png = os.path.join(outdir, 'i=2+viz=plot+ext=.png')
+    assert png in stored
+    assert stored.read(png).startswith(b'\x89PNG')
+
+    with tarfile.open(archive) as tar:
+        assert sorted(tar.getnames()) == sorted(stored.names())
+
+    dest = os.path.join(tmp_path, 'extracted')
+    subprocess.run(
+        [sys.executable, '-m', 'teeplot', 'extract', '-C', dest, archive,
+         '*+ext=.png'],
+        check=True,
+    )
+    extracted = os.path.join(dest, os.path.relpath(png, os.sep))
+    with open(extracted, 'rb') as file:
+        assert file.read() == stored.read(png)
+    assert len([*pathlib.Path(dest).rglob('*.png')]) == 3
+
+
+def test_sink(monkeypatch, tmp_path):
+
+    import gzip
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tp, 'transforms', {'.svgz': [tp.svg_gzip()]})
+
+    sink = tp.MemorySink()
+    for __ in range(2):
+        plt.figure()
+        tp.tee(
+            plt.plot,
+            [1, 3, 2],
+            teeplot_async=True,
+            teeplot_manifest=True,
+            teeplot_oncollision='fix',
+            teeplot_save={'.png', '.svgz'},
+            teeplot_sink=sink,
+            teeplot_thumbnail=32,
+        )
+
+    assert os.listdir(tmp_path) == []  # no filesystem I/O
+    assert sorted(sink) == sorted(
+        os.path.join('teeplots', f'viz=plot+{num}ext={ext}')
+        for num in ('', '#=1+')
+        for ext in ('.png', '.svgz', '.thumb.png')
+    )
+    png = sink[os.path.join('teeplots', 'viz=plot+ext=.png')]
+    assert bytes(png[:8]) == b'\x89PNG\r\n\x1a\n'
+    svgz = sink[os.path.join('teeplots', 'viz=plot+ext=.svgz')]
+    assert gzip.decompress(svgz).startswith(b'<?xml')  # transformed
+
+    sink.clear()
+    assert len(sink) == 0
+
+
+def test_pdf_book(tmp_path):
+    path = os.path.join(tmp_path, 'report.pdf')
+    outdir = os.path.join(tmp_path, 'teeplots')
+    with tp.pdf_book(path, metadata={'Title': 'report'}) as book:
+        for i in range(3):
+            plt.figure()
+            tp.tee(
+                plt.plot,
+                [1, i, 2],
+                teeplot_outattrs={'i': str(i)},
+                teeplot_outdir=outdir,
+                teeplot_save={'.pdf', '.png'},
+            )
+    assert len(book) == 3
+
+    assert sorted(os.listdir(outdir)) == [  # pdfs not saved individually
+        f'i={i}+viz=plot+ext=.png' for i in range(3)
+    ]
+    with open(path, 'rb') as file:
+        data = file.read()
+    assert data.startswith(b'%PDF')
+    assert len(re.findall(rb'/Type /Page\b(?!s)', data)) == 3
+    assert data.count(b'/FontFile2') == 1  # font shared across pages
+
+    objects = dict(  # later revisions of an object override earlier ones
+        re.findall(rb'(?m)^(\d+) 0 obj\s*(.*?)\s*endobj', data, re.S),
+    )
+
+    def ref(obj, key):
+        return objects[re.search(rb'/%s (\d+) 0 R' % key, obj).group(1)]
+
+    root_ref = re.findall(rb'/Root (\d+) 0 R', data)[-1]
+    outlines = ref(objects[root_ref], b'Outlines')
+    assert b'/Type /Outlines' in outlines
+    assert b'/Count 3' in outlines
+    item, titles = ref(outlines, b'First'), []
+    while True:
+        assert re.search(rb'/Dest \[ \d+ 0 R /Fit \]', item)
+        titles.append(re.search(rb'/Title \((.*?)\)', item).group(1))
+        if b'/Next' not in item:
+            break
+        item = ref(item, b'Next')
+    assert titles == [f'i={i}+viz=plot'.encode() for i in range(3)]
+
+
+def test_pdf_book_outline_unsupported(tmp_path, monkeypatch):
+    monkeypatch.setattr(matplotlib, '__version__', '4.0.0')
+    path = os.path.join(tmp_path, 'report.pdf')
+    with pytest.warns(UserWarning, match="can't write PDF outline"):
+        with tp.pdf_book(path) as book:
+            plt.figure()
+            tp.tee(
+                plt.plot,
+                [1, 2, 3],
+                teeplot_outdir=str(tmp_path),
+                teeplot_save={'.pdf'},
+            )
+    assert len(book) == 1
+
+    with open(path, 'rb') as file:
+        data = file.read()
+    assert data.startswith(b'%PDF')
+    assert data.rstrip().endswith(b'%%EOF')
+    assert b'/Outlines' not in data
+
+
+def test_dedup(tmp_path):
+    outdir = str(tmp_path)
+
+    def run(**kwargs):
+        for i in range(4):
+            plt.figure()
+            tp.tee(
+                plt.plot,
+                [1, i % 2, 2],  # pairs of identical plots
+                teeplot_dedup=True,
+                teeplot_oncollision='ignore',
+                teeplot_outattrs={'i': str(i)},
+                teeplot_outdir=outdir,
+                teeplot_save={'.png', '.svg'},
+                **kwargs,
+            )
+        tp.flush()
+
+    run()
+    stats = tp.dedup_stats(outdir)
+    assert (stats['written'], stats['linked'], stats['unchanged']) == (4, 4, 0)
+    assert stats['bytes_avoided'] == stats['bytes_written']
+    paths = [*pathlib.Path(outdir).glob('i=*')]
+    mtimes = {path: path.stat().st_mtime_ns for path in paths}
+
+    run(teeplot_async=True)
+    stats = tp.dedup_stats(outdir)
+    assert (stats['written'], stats['linked'], stats['unchanged']) == (4, 4, 8)
+    assert {path: path.stat().st_mtime_ns for path in paths} == mtimes
+
+    # saving without dedup doesn't write through to linked outputs
+    twin = os.path.join(outdir, 'i=2+viz=plot+ext=.png')
+    with open(twin, 'rb') as file:
+        before = file.read()
+    plt.figure()
+    tp.tee(
+        plt.plot,
+        [3, 2, 1],
+        teeplot_oncollision='ignore',
+        teeplot_outattrs={'i': '0'},
+        teeplot_outdir=outdir,
+        teeplot_save={'.png'},
+    )
+    with open(twin, 'rb') as file:
+        assert file.read() == before
+
+
+def test_dedup_user_links(tmp_path):
+    outdir = str(tmp_path)
+    user_link = os.path.join(outdir, 'user-link.png')
+
+    def run(data):
+        plt.figure()
+        tp.tee(
+            plt.plot,
+            data,
+            teeplot_oncollision='ignore',
+            teeplot_outdir=outdir,
+            teeplot_save={'.png'},
+        )
+
+    run([1, 2, 3])
+    out_path = os.path.join(outdir, 'viz=plot+ext=.png')
+    os.link(out_path, user_link)
+
+    # saving without dedup writes through hard links not made by dedup
+    run([3, 2, 1])
+    assert os.path.samefile(out_path, user_link)
+    with open(out_path, 'rb') as file, open(user_link, 'rb') as link_file:
+        assert file.read() == link_file.read()
+
+
+def _packed_filename(
+    plotter, kwargs, ext, outattrs={}, outexclude=(), outinclude=(),
+    postprocess="",
+):
+    """Output filename as `tee` named it before fast-pathing `kn.pack`."""
+    from slugify import slugify
+
+    if isinstance(outinclude, str):
+        outinclude = [outinclude]
+
+    attrs = {
+        **{
+            slugify(k): slugify(str(v))
+            for k, v in kwargs.items()
+            if isinstance(v, str) or k in outinclude
+        },
+        'viz': slugify(plotter.__name__),
+        'ext': ext,
+        **(
+            {'post': postprocess.__name__}
+            if callable(postprocess)
+            else {'post': slugify(postprocess)}
+            if postprocess and not postprocess.endswith(';')
+            else {}
+        ),
+        **outattrs,
+    }
+    return kn.pack({
+        k: v
+        for k, v in attrs.items()
+        if not k.startswith('_') and k not in outexclude
+    })
+
+
+@pytest.mark.parametrize("chunk_size", [None, "24"])
+@pytest.mark.parametrize("ext", [".png", ".svgz"])
+@pytest.mark.parametrize(
+    "kwargs, options",
+    [
+        ({}, {}),
+        ({'hue': 'day', 'x': 'Total Bill!', 'data': [1, 2]}, {}),
+        ({'size': 3, 'alpha': None, 'hue': 'day'}, {'outinclude': ['size']}),
+        ({'size': 3, 'My Key': 'v'}, {'outinclude': 'size'}),
+        ({'viz': 'mine', 'ext': 'mine'}, {}),
+        ({'_hidden': 'x', 'hue': 'day'}, {'outattrs': {'_id': 7, 'n': 1}}),
+        ({'hue': 'day'}, {'outattrs': {'ext': '.foo', 'a': None}}),
+        ({'hue': 'day'}, {'outexclude': ['hue', 'ext']}),
+        ({}, {'outexclude': ['viz']}),
+        ({'hue': '{x}'}, {'outattrs': {'{k}': '{v}'}}),
+        ({'hue': 'day'}, {'postprocess': "plt.title('Hi There')"}),
+        ({'hue': 'day'}, {'postprocess': "plt.title('hidden');"}),
+        ({'hue': 'day'}, {'postprocess': plt.tight_layout}),
+        ({'a': 'x' * 150, 'b': 'y' * 150}, {'outattrs': {'c': 'z' * 90}}),
+        ({'a': 'x' * 190}, {}),
+    ],
+)
+def test_namer_matches_kn_pack(monkeypatch, chunk_size, ext, kwargs, options):
+    if chunk_size is not None:
+        monkeypatch.setenv("KEYNAME_CHOP_CHUNK_SIZE", chunk_size)
+    __, out_filenamer = tp._make_namers(
+        plt.plot,
+        kwargs,
+        teeplot_outattrs=options.get('outattrs', {}),
+        teeplot_outexclude=options.get('outexclude', ()),
+        teeplot_outinclude=options.get('outinclude', ()),
+        teeplot_postprocess=options.get('postprocess', ""),
+        teeplot_max_name_length=None,
+    )
+    filename = out_filenamer(ext)
+    assert filename == _packed_filename(
+        plt.plot,
+        kwargs,
+        ext,
+        outattrs=options.get('outattrs', {}),
+        outexclude=options.get('outexclude', ()),
+        outinclude=options.get('outinclude', ()),
+        postprocess=options.get('postprocess', ""),
+    )
+
+    out_folder = pathlib.Path("teeplots", "subdir")
+    pather = tp._make_pather(out_folder, mkdir=False)
+    assert pather(filename) == kn.chop(str(out_folder / filename))
+
+
+def test_max_name_length(tmp_path):
+    outdir = str(tmp_path)
+    columns = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width']
+
+    def pairplot(x_vars, y_vars, hue):
+        plt.plot([1, 2])
+
+    kwargs = dict(
+        x_vars=columns,
+        y_vars=columns[:2],
+        hue='species',
+        teeplot_outdir=outdir,
+        teeplot_outinclude=['x_vars', 'y_vars'],
+        teeplot_max_name_length=64,
+        teeplot_save={'.png'},
+    )
+    plt.figure()
+    tp.tee(pairplot, **kwargs)
+
+    filename, = [f for f in os.listdir(outdir) if not f.startswith('.')]
+    assert len(filename) <= 64 + len('+ext=.png')
+    assert 'sepal-length-sepal-width-petal' not in filename
+    assert tp.lookup_attrs(os.path.join(outdir, filename), outdir) == {
+        'ext': '.png',
+        'hue': 'species',
+        'viz': 'pairplot',
+        'x-vars': 'sepal-length-sepal-width-petal-length-petal-width',
+        'y-vars': 'sepal-length-sepal-width',
+    }
+
+    # names are the same in a fresh process
+    planned = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'from teeplot import teeplot as tp\n'
+            'def pairplot(x_vars, y_vars, hue): pass\n'
+            f'print(tp.plan(pairplot, **{kwargs!r})[3].path)',
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.strip()
+    assert planned == os.path.join(outdir, filename)
+
+
+def test_postprocess_callable_signature():
+    calls = []
+
+    def post_teed(teed):
+        calls.append(("teed", teed))
+
+    def post_ax(ax, extra=None):
+        calls.append(("ax", ax))
+
+    def post_none():
+        calls.append(("none", None))
+
+    def post_positional(result, /):
+        calls.append(("positional", result))
+
+    for post in post_teed, post_ax, post_none, post_positional:
+        teed = tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_postprocess=post,
+            teeplot_save=False,
+            teeplot_show=False,
+        )
+        assert calls[-1] == (post.__name__[5:], None if post is post_none else teed)
+    assert len(calls) == 4
+
+    with pytest.raises(TypeError, match="call signature incompatible"):
+        tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_postprocess=lambda a, b: calls.append("incompatible"),
+            teeplot_save=False,
+            teeplot_show=False,
+        )
+    assert calls[-1] != "incompatible"
+
+
+def test_postprocess_callable_runs_once():
+    calls = []
+
+    def post(teed):
+        calls.append(teed)
+        raise TypeError("raised within postprocess")
+
+    with pytest.raises(TypeError, match="raised within postprocess"):
+        tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_postprocess=post,
+            teeplot_save=False,
+            teeplot_show=False,
+        )
+    assert len(calls) == 1
+
+
+def test_postprocess_callable_released():
+    import gc
+    import weakref
+
+    class Captured:
+        pass
+
+    def make_post(captured, convention):
+        if convention == 'ax':
+            return lambda ax: ax[0].set_label(type(captured).__name__)
+        return lambda: plt.gca().set_title(type(captured).__name__)
+
+    refs = []
+    for convention in 'ax', 'noargs', 'ax':
+        captured = Captured()
+        refs.append(weakref.ref(captured))
+        teed = tp.tee(
+            plt.plot,
+            [1, 2, 3],
+            teeplot_postprocess=make_post(captured, convention),
+            teeplot_save=False,
+            teeplot_show=False,
+        )
+        # calling convention resolved per definition, not reused wrongly
+        if convention == 'ax':
+            assert teed[0].get_label() == 'Captured'
+        else:
+            assert plt.gca().get_title() == 'Captured'
+        del captured, teed
+        plt.close('all')
+
+    # postprocess closures, and what they capture, aren't kept alive
+    gc.collect()
+    assert [ref() for ref in refs] == [None] * 3
+
+
+def test_postprocess_convention_cache_lru(monkeypatch):
+    cache = collections.OrderedDict()
+    monkeypatch.setattr(tp, '_postprocess_convention_cache', cache)
+    # distinct code, so distinct cache keys
+    posts = [eval(f"lambda teed: {i}") for i in range(257)]
+    for post in posts[:256]:
+        tp._postprocess_invoker(post)
+    tp._postprocess_invoker(posts[0])  # hit, now most recently used
+    tp._postprocess_invoker(posts[256])  # evicts least recently used
+
+    assert len(cache) == 256
+    key = tp._postprocess_convention_key
+    assert key(posts[0]) in cache
+    assert key(posts[1]) not in cache
+    assert [*cache][-2:] == [key(posts[0]), key(posts[256])]
+    assert tp._postprocess_invoker(posts[1])(None) == 1
+
+
+def _frames_sineplot(phase):
+    x = np.linspace(0, 6, 50)
+    return plt.plot(x, np.sin(x + phase))
+
+
+def _frames_sineupdate(teed, phase):
+    x = teed[0].get_xdata()
+    teed[0].set_ydata(np.sin(x + phase))
+
+
+@pytest.mark.parametrize("update", [None, _frames_sineupdate])
+def test_tee_frames_gif(tmp_path, update):
+    from PIL import Image, ImageSequence
+
+    fignums = plt.get_fignums()
+    paths = tp.tee_frames(
+        _frames_sineplot,
+        ({"phase": phase} for phase in range(5)),
+        teeplot_fps=20,
+        teeplot_outattrs={"update": str(update is not None)},
+        teeplot_outdir=str(tmp_path),
+        teeplot_update=update,
+    )
+    assert paths == [
+        os.path.join(str(tmp_path), f"update={update is not None}+viz=frames-sineplot+ext=.gif"),
+    ]
+    with Image.open(paths[0]) as image:
+        assert image.n_frames == 5
+        assert image.info["duration"] == 50
+        assert image.info["loop"] == 0
+        frames = [
+            np.asarray(frame.convert("RGB"))
+            for frame in ImageSequence.Iterator(image)
+        ]
+    assert (frames[0] != frames[1]).any()
+    assert plt.get_fignums() == fignums
+
+
+def test_tee_frames_png(tmp_path):
+    paths = tp.tee_frames(
+        _frames_sineplot,
+        [{"phase": phase} for phase in range(3)],
+        teeplot_format=".png",
+        teeplot_outdir=str(tmp_path),
+        teeplot_postprocess="teed[0].set_color('red')",
+    )
+    assert paths == [
+        os.path.join(str(tmp_path), f"frame={i:06d}+post=teed-0-set-color-red+viz=frames-sineplot+ext=.png")
+        for i in range(3)
+    ]
+    assert all(map(os.path.exists, paths))
+
+
+def test_tee_frames_unsupported():
+    with pytest.raises(TypeError, match="teeplot_save"):
+        tp.tee_frames(_frames_sineplot, [{"phase": 0}], teeplot_save={".pdf"})
+
+
+def test_record_replay(tmp_path):
+    outdir = str(tmp_path)
+    data = np.arange(10_000.0)  # large enough to be stored as a side file
+    for __ in range(2):  # identical calls are recorded once
+        tp.tee(
+            plt.plot,
+            data,
+            teeplot_oncollision="ignore",
+            teeplot_outdir=outdir,
+            teeplot_record=True,
+            teeplot_save={".png"},
+        )
+        plt.close("all")
+
+    store = tp._get_replay_store(outdir)
+    entries = store.entries()
+    assert len(entries) == 1
+    assert entries[0]["plotter"] == "matplotlib.pyplot.plot"
+    assert len(os.listdir(store.data_dir)) == 1
+
+    results = [
+        *tp.replay(
+            outdir,
+            teeplot_dpi=20,
+            teeplot_max_workers=1,
+            teeplot_save={".png", ".svg"},
+        ),
+    ]
+    assert [result.error for result in results] == [None]
+    assert sorted(results[0].paths) == [
+        os.path.join(outdir, f"viz=plot+ext={ext}") for ext in (".png", ".svg")
+    ]
+    assert all(map(os.path.exists, results[0].paths))
+    assert len(store.entries()) == 1  # replays aren't recorded
+
+    listing = subprocess.run(
+        [sys.executable, "-m", "teeplot", "replay", "-n", outdir, "*.png"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert listing.stdout.split() == [
+        entries[0]["id"],
+        "matplotlib.pyplot.plot",
+        os.path.join(outdir, "viz=plot+ext=.png"),
+    ]
+
+
+def test_replay_side_files_must_be_recorded(tmp_path):
+    outdir = str(tmp_path)
+    tp.tee(
+        plt.plot,
+        np.arange(10_000.0),  # large enough to be stored as a side file
+        teeplot_outdir=outdir,
+        teeplot_record=True,
+        teeplot_save={".png"},
+    )
+    store = tp._replay.ReplayStore(outdir)
+    entry_id, = (entry["id"] for entry in store.entries())
+    plotter, args, __, __ = store.load(entry_id)
+    assert plotter is plt.plot
+    assert len(args[0]) == 10_000
+
+    # side files not referenced by the logged entry aren't loaded
+    log_path = os.path.join(store.path, "calls.jsonl")
+    with open(log_path) as file:
+        entry, = map(json.loads, file)
+    entry["side_files"] = []
+    with open(log_path, "w") as file:
+        file.write(json.dumps(entry) + "\n")
+    with pytest.raises(pickle.UnpicklingError, match="not recorded"):
+        tp._replay.ReplayStore(outdir).load(entry_id)
+
+    # nor are names escaping the store's data directory
+    unpickler = tp._replay._CallUnpickler(
+        io.BytesIO(), store, {"../evil.pickle"},
+    )
+    with pytest.raises(pickle.UnpicklingError, match="not recorded"):
+        unpickler.persistent_load(("pickle", "../evil.pickle"))
+
+
+def test_record_unpicklable(tmp_path):
+    with pytest.warns(UserWarning, match="could not record"):
+        tp.tee(
+            lambda: plt.plot([1, 2]),
+            teeplot_outdir=str(tmp_path),
+            teeplot_record=True,
+            teeplot_save={".png"},
+        )
+    assert tp._get_replay_store(str(tmp_path)).entries() == []
+
+
+def test_snapshot_render_missing(tmp_path):
+    outdir = str(tmp_path)
+    tp.tee(
+        plt.plot,
+        [1, 2, 3],
+        teeplot_outdir=outdir,
+        teeplot_postprocess="plt.title('snap')",
+        teeplot_save={".png"},
+        teeplot_snapshot=True,
+    )
+    prefix = os.path.join(outdir, "post=plt-title-snap+viz=plot+ext=")
+    assert os.path.exists(prefix + ".mplfig.gz")
+
+    written = tp.render_missing(
+        [".svg", "pdf", ".png"], teeplot_outdir=outdir, teeplot_max_workers=1,
+    )
+    assert sorted(written) == [prefix + ".pdf", prefix + ".svg"]
+    assert all(map(os.path.exists, written))
+
+    # formats already present are skipped
+    assert tp.render_missing([".svg"], teeplot_outdir=outdir) == []
+
+    with pytest.raises(ValueError):
+        tp.render_missing([".xyz"], teeplot_outdir=outdir)
+
+
+def test_snapshot_render_missing_untrusted(tmp_path):
+    outdir = os.path.join(tmp_path, "teeplots")
+    tp.tee(
+        plt.plot,
+        [1, 2, 3],
+        teeplot_outdir=outdir,
+        teeplot_save={".png"},
+        teeplot_snapshot=True,
+    )
+    snapshot_path = os.path.join(outdir, "viz=plot+ext=.mplfig.gz")
+    with open(snapshot_path, "rb") as file:
+        data = file.read()
+
+    # files named like snapshots, but not indexed, aren't loaded
+    stray_path = os.path.join(outdir, "viz=stray+ext=.mplfig.gz")
+    with open(stray_path, "wb") as file:
+        file.write(data)
+    outside_path = os.path.join(tmp_path, "viz=outside+ext=.mplfig.gz")
+    with open(outside_path, "wb") as file:
+        file.write(data)
+    with open(os.path.join(outdir, ".teeplot-snapshots.jsonl"), "a") as file:
+        file.write('{"path": "../viz=outside+ext=.mplfig.gz", "sha256": ""}\n')
+    written = tp.render_missing(
+        [".svg"], teeplot_outdir=outdir, teeplot_max_workers=1,
+    )
+    assert written == [os.path.join(outdir, "viz=plot+ext=.svg")]
+
+    # indexed snapshots modified since written aren't loaded
+    with open(snapshot_path, "wb") as file:
+        file.write(data + b"\0")
+    with pytest.raises(ValueError, match="modified"):
+        tp.render_missing([".pdf"], teeplot_outdir=outdir)
+
+
+def test_replay_overwrites_fixed_paths(tmp_path):
+    outdir = str(tmp_path)
+    for __ in range(2):  # second call is renumbered
+        tp.tee(
+            plt.plot,
+            [3, 1, 2],
+            teeplot_oncollision="fix",
+            teeplot_outattrs={"replay": "fix"},
+            teeplot_outdir=outdir,
+            teeplot_record=True,
+            teeplot_save={".png"},
+        )
+        plt.close("all")
+
+    before = sorted(os.listdir(outdir))
+    outputs = [name for name in before if name.endswith(".png")]
+    assert len(outputs) == 2
+    assert len(tp._get_replay_store(outdir).entries()) == 2
+    for name in outputs:
+        os.utime(os.path.join(outdir, name), ns=(0, 0))
+
+    results = [*tp.replay(outdir, teeplot_max_workers=1)]
+    assert [result.error for result in results] == [None, None]
+    assert sorted(
+        out_path for result in results for out_path in result.paths
+    ) == [os.path.join(outdir, name) for name in outputs]
+    assert sorted(os.listdir(outdir)) == before  # no new files
+    for name in outputs:
+        assert os.stat(os.path.join(outdir, name)).st_mtime_ns > 0
@@ -94,3 +94,42 @@ def test_callback():
         assert os.path.exists(
             os.path.join('teeplots', f'hue=region+viz=lineplot+x=timepoint+y=signal+ext={ext}'),
         )
+
+
+def test_async():
+
+    np.random.seed(1)
+    x, y = np.random.normal(size=(2, 5000)).cumsum(axis=1)
+
+    with tp.teed(
+        sns.lineplot,
+        x=x,
+        y=y,
+        sort=False,
+        teeplot_outattrs={
+          'async' : 'teedmetadata',
+        },
+        teeplot_subdir='mydirectory',
+        teeplot_async=True,
+    ) as ax:
+        ax.set_yscale('log')
+    tp.flush()
+
+    for ext in '.pdf', '.png':
+        assert os.path.exists(
+            os.path.join('teeplots', 'mydirectory', f'async=teedmetadata+viz=lineplot+ext={ext}'),
+        )
+
+
+def test_skip():
+
+    with tp.teed(
+        sns.lineplot,
+        x=[1, 2, 3],
+        teeplot_save=False,
+        teeplot_show=False,
+        teeplot_skip=True,
+    ) as ax:
+        ax.set_yscale('log')
+
+    assert isinstance(ax, tp.SkippedPlot)
@@ -94,3 +94,40 @@ def test_included_outattrs(a, b):
         assert os.path.exists(
             os.path.join('teeplots', f'a={a}+b={b}+hue=region+viz=lineplot+x=timepoint+y=signal+ext={ext}'.lower()),
         )
+
+
+def test_async():
+
+    np.random.seed(1)
+    x, y = np.random.normal(size=(2, 5000)).cumsum(axis=1)
+
+    @tp.teewrap(
+        teeplot_outattrs={
+          'async' : 'teewrapmetadata',
+        },
+        teeplot_subdir='mydirectory',
+        teeplot_async=True,
+    )
+    @functools.wraps(sns.lineplot)
+    def teed_lineplot_async(*args, **kwargs):
+        return sns.lineplot(*args, **kwargs)
+
+    teed_lineplot_async(x=x, y=y, sort=False)
+    tp.flush()
+
+    for ext in '.pdf', '.png':
+        assert os.path.exists(
+            os.path.join('teeplots', 'mydirectory', f'async=teewrapmetadata+viz=lineplot+ext={ext}'),
+        )
+
+
+def test_skip():
+
+    calls = []
+
+    @tp.teewrap(teeplot_save=False, teeplot_show=False, teeplot_skip=True)
+    def teed_lineplot_skip(*args, **kwargs):
+        calls.append(args)
+
+    assert isinstance(teed_lineplot_skip([1, 2, 3]), tp.SkippedPlot)
+    assert not calls